@@ -0,0 +1,120 @@
+import gc
+import tracemalloc
+from typing import Any, Dict, List
+
+from benchmarks.bench_submit_order import ORDER_PARAMS
+from benchmarks.common import (
+    INSTRUMENTS_INFO,
+    MARKETS_INFO,
+    StubHTTPServer,
+    algorand_signer,
+)
+from c3.account import Account
+from c3.signing.types import ZERO_LEASE, OrderSignatureRequest, RequestOperation
+from c3.utils.constants import LocalHostConstants
+
+GROUP = "allocations"
+
+ORDERS = 200
+REQUESTS = 10000
+
+
+def memory_result(name: str, value: float, unit: str) -> Dict[str, Any]:
+    # Same shape as run_benchmark results so the runner can compare them
+    return {
+        "name": name,
+        "group": GROUP,
+        "unit": unit,
+        "loops": 1,
+        "repeat": 1,
+        "min": value,
+        "median": value,
+        "mean": value,
+        "stdev": 0.0,
+    }
+
+
+def measure_live(factory, count: int):
+    """Blocks and bytes still allocated per object after creating `count` of them."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    blocks = sum(s.count_diff for s in stats)
+    size = sum(s.size_diff for s in stats)
+    del objects
+    return blocks / count, size / count
+
+
+def order_request(nonce: int) -> OrderSignatureRequest:
+    return OrderSignatureRequest(
+        op=RequestOperation.Order,
+        account=b"A6EHv/POEL4dcN0Y50vAmWfk1jCbpQ1fHdyGZBJVMbg=",
+        sell_slot_id=1,
+        buy_slot_id=3,
+        sell_amount=102833000,
+        buy_amount=10000000,
+        max_sell_amount_from_pool=0,
+        max_buy_amount_to_pool=0,
+        expires_on=1700854080,
+        nonce=nonce,
+        last_valid=0,
+        lease=ZERO_LEASE,
+    )
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    results = []
+
+    # The list holding the objects is part of the measurement, 8 bytes per entry
+    blocks, size = measure_live(order_request, REQUESTS)
+    results.append(memory_result("OrderSignatureRequest.blocks", blocks, "blocks"))
+    results.append(memory_result("OrderSignatureRequest.bytes", size, "bytes"))
+
+    with StubHTTPServer({"id": "stub-order-id"}) as server:
+        account = Account(
+            signer=algorand_signer(),
+            instrumentsInfo=INSTRUMENTS_INFO,
+            marketsInfo=MARKETS_INFO,
+            accountId="C3_BENCHMARK",
+            apiToken="token",
+            base_url=server.base_url,
+            constants=LocalHostConstants,
+        )
+        params = ORDER_PARAMS["limit-buy"]
+
+        # Warm up connection pool, lazy imports and caches
+        for _ in range(10):
+            account.submitOrder(params)
+
+        gc.collect()
+        tracemalloc.start()
+        peaks = []
+        before = tracemalloc.take_snapshot()
+        for _ in range(ORDERS):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            account.submitOrder(params)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        retained = after.compare_to(before, "filename")
+        peaks.sort()
+
+    results.append(
+        memory_result("submitOrder.peak_bytes", peaks[len(peaks) // 2], "bytes/op")
+    )
+    results.append(
+        memory_result(
+            "submitOrder.retained_bytes",
+            sum(s.size_diff for s in retained) / ORDERS,
+            "bytes/op",
+        )
+    )
+
+    return results
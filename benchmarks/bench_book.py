@@ -0,0 +1,91 @@
+import json
+from typing import Any, Dict, List
+
+from benchmarks.bench_websocket import WS_FRAMES_FIXTURE
+from benchmarks.common import load_fixture_lines, run_benchmark
+from c3.book import BookAnalytics, OrderBook
+from c3.marketdata import SIDE_ASK, SIDE_BID
+
+GROUP = "book"
+
+SESSION_REPEAT = 20
+DEPTH_LEVELS = 5
+DEPTH_BPS = (10, 50)
+
+
+def recompute_metrics(book: OrderBook) -> Dict[str, float]:
+    """The metrics of BookAnalytics summed from the whole book."""
+    bids = book.top(SIDE_BID, book.depth(SIDE_BID))
+    asks = book.top(SIDE_ASK, book.depth(SIDE_ASK))
+    (bid, bid_size), (ask, ask_size) = bids[0], asks[0]
+    bid_depth = sum(size for _, size in bids[:DEPTH_LEVELS])
+    ask_depth = sum(size for _, size in asks[:DEPTH_LEVELS])
+    metrics = {
+        "spread": ask - bid,
+        "mid": (bid + ask) / 2,
+        "microprice": (bid * ask_size + ask * bid_size) / (bid_size + ask_size),
+        "imbalance": (bid_depth - ask_depth) / (bid_depth + ask_depth),
+    }
+    for bps in DEPTH_BPS:
+        bid_limit = bid * (1 - bps / 10000)
+        ask_limit = ask * (1 + bps / 10000)
+        metrics[f"bid_depth_{bps}bps"] = sum(s for p, s in bids if p >= bid_limit)
+        metrics[f"ask_depth_{bps}bps"] = sum(s for p, s in asks if p <= ask_limit)
+    return metrics
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    deltas = [
+        message["data"]
+        for message in map(json.loads, load_fixture_lines(WS_FRAMES_FIXTURE))
+        if message["subject"] == "bookDelta"
+    ] * SESSION_REPEAT
+
+    def book_only():
+        books = {}
+        for data in deltas:
+            book = books.get(data["marketId"])
+            if book is None:
+                book = books[data["marketId"]] = OrderBook(data["marketId"])
+            book.apply(data)
+
+    def recomputed():
+        books = {}
+        for data in deltas:
+            book = books.get(data["marketId"])
+            if book is None:
+                book = books[data["marketId"]] = OrderBook(data["marketId"])
+            book.apply(data)
+            recompute_metrics(book)
+
+    def incremental():
+        analytics = BookAnalytics(DEPTH_LEVELS, DEPTH_BPS)
+        for data in deltas:
+            analytics.on_book_delta(data)
+            analytics.metrics(data["marketId"])
+
+    def subscribed():
+        analytics = BookAnalytics(DEPTH_LEVELS, DEPTH_BPS)
+        analytics.subscribe(lambda market_id, metrics: None, {"microprice": 0.01})
+        for data in deltas:
+            analytics.on_book_delta(data)
+
+    results = []
+    for name, fn in [
+        ("OrderBook.apply", book_only),
+        ("recomputed metrics", recomputed),
+        ("BookAnalytics", incremental),
+        ("BookAnalytics.subscribe", subscribed),
+    ]:
+        result = run_benchmark(
+            f"{name}[{len(deltas)} deltas]", fn, repeat=repeat, group=GROUP
+        )
+        result["deltas"] = len(deltas)
+        result["per_delta_ns"] = result["median"] / len(deltas)
+        results.append(result)
+
+    # Cost of the metrics on top of keeping the book, per delta
+    book_ns = results[0]["per_delta_ns"]
+    for result in results[1:]:
+        result["overhead_per_delta_ns"] = result["per_delta_ns"] - book_ns
+    return results
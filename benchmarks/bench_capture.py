@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+from typing import Any, Dict, List
+
+from benchmarks.bench_websocket import WS_FRAMES_FIXTURE
+from benchmarks.common import load_fixture_lines, run_benchmark
+from c3.capture import BOOK_DELTA, ColumnarCapture, load, np
+
+GROUP = "capture"
+
+# The fixture is repeated to get enough bookDelta rows to load back
+SESSION_REPEAT = 50
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    if np is None:
+        print("numpy is not installed, skipping the capture benchmarks")
+        return []
+
+    messages = [
+        json.loads(frame) for frame in load_fixture_lines(WS_FRAMES_FIXTURE)
+    ] * SESSION_REPEAT
+    handlers = {
+        "level1": "on_level1",
+        "bookDelta": "on_book_delta",
+        "trades": "on_trades",
+    }
+    events = [
+        (handlers[m["subject"]], m["data"])
+        for m in messages
+        if m["subject"] in handlers
+    ]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+
+        def capture_all():
+            capture = ColumnarCapture(os.path.join(directory, "capture"))
+            for handler, data in events:
+                getattr(capture, handler)(data)
+            return capture
+
+        result = run_benchmark(
+            f"ColumnarCapture[{len(events)} events]",
+            capture_all,
+            repeat=repeat,
+            group=GROUP,
+        )
+        result["events"] = len(events)
+        results.append(result)
+
+        store = os.path.join(directory, "store")
+        capture = ColumnarCapture(store)
+        for handler, data in events:
+            getattr(capture, handler)(data)
+        capture.close()
+        rows = len(load(store, BOOK_DELTA, "ETH-USDC"))
+
+        # The same rows stored as JSON lines, which is what capture replaces
+        lines_path = os.path.join(directory, "bookDelta.jsonl")
+        with open(lines_path, "w") as f:
+            for m in messages:
+                if m["subject"] == "bookDelta" and m["data"]["marketId"] == "ETH-USDC":
+                    f.write(json.dumps(m["data"]) + "\n")
+
+        def load_json_lines():
+            with open(lines_path) as f:
+                for line in f:
+                    json.loads(line)
+
+        for name, fn in [
+            ("load.npy", lambda: load(store, BOOK_DELTA, "ETH-USDC")["price"].sum()),
+            ("load.jsonl", load_json_lines),
+        ]:
+            result = run_benchmark(
+                f"{name}[bookDelta,{rows} rows]", fn, repeat=repeat, group=GROUP
+            )
+            result["rows"] = rows
+            results.append(result)
+
+    return results
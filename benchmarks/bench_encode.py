@@ -0,0 +1,172 @@
+from typing import Any, Dict, List
+
+from algosdk import encoding
+
+from benchmarks.common import (
+    INSTRUMENTS_INFO,
+    MARKETS_INFO,
+    algorand_signer,
+    run_benchmark,
+)
+from c3.account import Account
+from c3.signing.encode import encode_user_operation, encode_user_operation_base
+from c3.signing.types import (
+    AccountMoveSignatureRequest,
+    BorrowSignatureRequest,
+    CancelSignatureRequest,
+    CERedeemRequest,
+    DelegateSignatureRequest,
+    LendSignatureRequest,
+    LiquidateSignatureRequest,
+    LoginSignatureRequest,
+    OrderSignatureRequest,
+    RepaySignatureRequest,
+    RequestOperation,
+    WithdrawSignatureRequest,
+    XChainAddress,
+)
+from c3.utils.constants import LocalHostConstants
+from c3.utils.utils import amountToContract
+
+GROUP = "encode"
+
+
+def signature_requests(account: bytes) -> Dict[RequestOperation, Any]:
+    """One representative request per RequestOperation supported by the encoder.
+
+    RequestOperation.Deposit has no client side encoding and is not included.
+    """
+    single_asset = dict(
+        account=account, slot_id=0, amount=1234, lease=bytearray(32), last_valid=0
+    )
+
+    return {
+        RequestOperation.Login: LoginSignatureRequest(
+            op=RequestOperation.Login,
+            nonce="Welcome to C3:\n\nClick to sign and accept the C3 Terms of Service (https://c3.io/tos)\n\nMjY3ODgtMTcwMDQ2MTU1NzY2NC1V77+977+9NGHvv71fFe+",
+        ),
+        RequestOperation.Order: OrderSignatureRequest(
+            op=RequestOperation.Order,
+            account=account,
+            sell_slot_id=4,
+            buy_slot_id=3,
+            sell_amount=20283300000,
+            buy_amount=10000000,
+            max_sell_amount_from_pool=0,
+            max_buy_amount_to_pool=0,
+            expires_on=1700854080,
+            nonce=1700767680908,
+            last_valid=0,
+            lease=bytearray(32),
+        ),
+        RequestOperation.Cancel: CancelSignatureRequest(
+            op=RequestOperation.Cancel,
+            all_orders_until=1861920000000,
+        ),
+        RequestOperation.Withdraw: WithdrawSignatureRequest(
+            op=RequestOperation.Withdraw,
+            receiver=XChainAddress(
+                chain_id=8,
+                address=encoding.decode_address(
+                    "AOQQPP7TZYIL4HLQ3UMOOS6ATFT6JVRQTOSQ2XY53SDGIESVGG4MPFYUMQ"
+                ),
+            ),
+            max_borrow=0,
+            max_fees=10,
+            **single_asset,
+        ),
+        RequestOperation.Lend: LendSignatureRequest(
+            op=RequestOperation.Lend, **single_asset
+        ),
+        RequestOperation.Redeem: CERedeemRequest(
+            op=RequestOperation.Redeem, **single_asset
+        ),
+        RequestOperation.Borrow: BorrowSignatureRequest(
+            op=RequestOperation.Borrow, **single_asset
+        ),
+        RequestOperation.Repay: RepaySignatureRequest(
+            op=RequestOperation.Repay, **single_asset
+        ),
+        RequestOperation.Liquidate: LiquidateSignatureRequest(
+            op=RequestOperation.Liquidate,
+            account=account,
+            target=account,
+            cash={0: 1234},
+            pool={0: 1234},
+        ),
+        RequestOperation.Delegate: DelegateSignatureRequest(
+            op=RequestOperation.Delegate,
+            account=account,
+            delegate=account,
+            creation=123456,
+            expiration=432100,
+        ),
+        RequestOperation.AccountMove: AccountMoveSignatureRequest(
+            op=RequestOperation.AccountMove,
+            account=account,
+            target=account,
+            cash={0: 1234},
+            pool={0: 1234},
+        ),
+    }
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    signer = algorand_signer()
+    results = []
+
+    for op, request in signature_requests(signer.base64address()).items():
+        # NOTE: Liquidate, Delegate and AccountMove requests carry no lease or
+        # last_valid, so only their operation body can be encoded
+        if op in (RequestOperation.Login, RequestOperation.Cancel) or hasattr(
+            request, "lease"
+        ):
+            encode = encode_user_operation
+        else:
+            encode = encode_user_operation_base
+
+        results.append(
+            run_benchmark(
+                f"{encode.__name__}[{op.value}]",
+                lambda request=request, encode=encode: encode(request),
+                repeat=repeat,
+                group=GROUP,
+            )
+        )
+
+    account = Account(
+        signer=signer,
+        instrumentsInfo=INSTRUMENTS_INFO,
+        marketsInfo=MARKETS_INFO,
+        accountId="C3_BENCHMARK",
+        apiToken="token",
+        constants=LocalHostConstants,
+    )
+    order = signature_requests(signer.base64address())[RequestOperation.Order]
+    results.append(
+        run_benchmark(
+            "generateOrderId",
+            lambda: account.generateOrderId(order),
+            repeat=repeat,
+            group=GROUP,
+        )
+    )
+
+    results.append(
+        run_benchmark(
+            "amountToContract[str]",
+            lambda: amountToContract("1028.33", 6),
+            repeat=repeat,
+            group=GROUP,
+        )
+    )
+    results.append(
+        run_benchmark(
+            "amountToContract[int]",
+            lambda: amountToContract(12345, 8),
+            repeat=repeat,
+            group=GROUP,
+        )
+    )
+
+    return results
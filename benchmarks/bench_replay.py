@@ -0,0 +1,62 @@
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.bench_websocket import WS_FRAMES_FIXTURE
+from benchmarks.common import load_fixture_lines, run_benchmark
+from c3.recorder import ReplayWebSocketClient, SessionRecorder, read_session
+
+GROUP = "replay"
+
+# The fixture is repeated to get a session of a few MB
+SESSION_REPEAT = 20
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    frames = load_fixture_lines(WS_FRAMES_FIXTURE) * SESSION_REPEAT
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Hot path cost only, the writer thread is not started here
+        def record_all():
+            recorder = SessionRecorder(directory)
+            for frame in frames:
+                recorder.record(frame)
+
+        result = run_benchmark(
+            f"SessionRecorder.record[{len(frames)} frames]",
+            record_all,
+            repeat=repeat,
+            group=GROUP,
+        )
+        result["frames"] = len(frames)
+        results.append(result)
+
+        session = os.path.join(directory, "session")
+        with SessionRecorder(session) as recorder:
+            start = time.time_ns()
+            for i, frame in enumerate(frames):
+                recorder.record(frame, start + i * 1000)
+        session_bytes = recorder.bytes
+
+        def read_all():
+            for _ in read_session(session):
+                pass
+
+        def replay_all():
+            asyncio.run(ReplayWebSocketClient(session).replay())
+
+        for name, fn in [("read_session", read_all), ("replay", replay_all)]:
+            result = run_benchmark(
+                f"{name}[{len(frames)} frames]", fn, repeat=repeat, group=GROUP
+            )
+            seconds = result["median"] / 1e9
+            result["frames"] = len(frames)
+            result["bytes"] = session_bytes
+            result["frames_per_second"] = len(frames) / seconds
+            result["mb_per_second"] = session_bytes / seconds / 1e6
+            results.append(result)
+
+    return results
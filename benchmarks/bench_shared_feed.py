@@ -0,0 +1,48 @@
+import os
+from typing import Any, Dict, List
+
+from benchmarks.common import run_benchmark
+from c3.marketdata import SIDE_BID
+from c3.shared_feed import KIND_BOOK_DELTA, SharedFeedPublisher, SharedFeedReader
+
+GROUP = "sharedFeed"
+
+BATCH = 1000
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    results = []
+    with SharedFeedPublisher(f"c3bench-{os.getpid()}") as publisher:
+        with SharedFeedReader(publisher.name) as reader:
+
+            def publish_batch():
+                for i in range(BATCH):
+                    publisher.publish(
+                        KIND_BOOK_DELTA,
+                        b"ETH-USDC",
+                        1700767680021,
+                        i,
+                        SIDE_BID,
+                        1028.21,
+                        1.5,
+                    )
+
+            def publish_and_poll():
+                publish_batch()
+                reader.poll()
+
+            for name, fn in [
+                ("publish", publish_batch),
+                ("publish+poll", publish_and_poll),
+            ]:
+                reader.poll()
+                results.append(
+                    run_benchmark(
+                        f"SharedFeed.{name}[{BATCH} updates]",
+                        fn,
+                        repeat=repeat,
+                        group=GROUP,
+                    )
+                )
+
+    return results
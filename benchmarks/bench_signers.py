@@ -0,0 +1,36 @@
+from typing import Any, Dict, List
+
+from benchmarks.bench_encode import signature_requests
+from benchmarks.common import algorand_signer, evm_signer, run_benchmark
+from c3.signing.encode import encode_user_operation
+from c3.signing.types import RequestOperation
+
+GROUP = "sign"
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    results = []
+
+    for label, signer in (("algorand", algorand_signer()), ("evm", evm_signer())):
+        requests = signature_requests(signer.base64address())
+        for op in (RequestOperation.Order, RequestOperation.Cancel):
+            message = encode_user_operation(requests[op])
+            results.append(
+                run_benchmark(
+                    f"{label}.sign_message[{op.value}]",
+                    lambda signer=signer, message=message: signer.sign_message(message),
+                    repeat=repeat,
+                    group=GROUP,
+                )
+            )
+
+        results.append(
+            run_benchmark(
+                f"{label}.address",
+                signer.address,
+                repeat=repeat,
+                group=GROUP,
+            )
+        )
+
+    return results
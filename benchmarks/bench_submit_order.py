@@ -0,0 +1,135 @@
+import json
+from typing import Any, Dict, List
+
+from benchmarks.common import (
+    INSTRUMENTS_INFO,
+    MARKETS_INFO,
+    StubHTTPServer,
+    algorand_signer,
+    evm_signer,
+    run_benchmark,
+)
+from c3.account import Account
+from c3.utils.constants import LocalHostConstants
+from c3.utils.serialization import OrderPayloadEncoder, json_dumps
+from c3.validation import OrderValidator
+
+GROUP = "submitOrder"
+
+ORDER_PARAMS = {
+    "limit-buy": {
+        "marketId": "ETH-USDC",
+        "type": "limit",
+        "side": "buy",
+        "amount": "0.1",
+        "price": "1028.33",
+    },
+    "limit-sell": {
+        "marketId": "ALGO-USDC",
+        "type": "limit",
+        "side": "sell",
+        "amount": "100",
+        "price": "0.1741",
+    },
+}
+
+
+# A 20 level ladder on each side of ETH-USDC
+LADDER = [
+    {
+        "marketId": "ETH-USDC",
+        "type": "limit",
+        "side": side,
+        "amount": "0.05",
+        "price": f"{1028.33 + sign * level * 0.05:.2f}",
+    }
+    for side, sign in (("buy", -1), ("sell", 1))
+    for level in range(1, 21)
+]
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    results = []
+
+    validator = OrderValidator(INSTRUMENTS_INFO, MARKETS_INFO)
+    for order_kind, params in ORDER_PARAMS.items():
+        results.append(
+            run_benchmark(
+                f"OrderValidator.validate[{order_kind}]",
+                lambda params=params: validator.validate(params),
+                repeat=repeat,
+                group=GROUP,
+            )
+        )
+    results.append(
+        run_benchmark(
+            f"OrderValidator.validate_batch[{len(LADDER)} orders]",
+            lambda: validator.validate_batch(LADDER),
+            repeat=repeat,
+            group=GROUP,
+        )
+    )
+
+    with StubHTTPServer({"id": "stub-order-id"}) as server:
+        for label, signer in (("algorand", algorand_signer()), ("evm", evm_signer())):
+            account = Account(
+                signer=signer,
+                instrumentsInfo=INSTRUMENTS_INFO,
+                marketsInfo=MARKETS_INFO,
+                accountId="C3_BENCHMARK",
+                apiToken="token",
+                base_url=server.base_url,
+                constants=LocalHostConstants,
+            )
+
+            for order_kind, params in ORDER_PARAMS.items():
+                results.append(
+                    run_benchmark(
+                        f"submitOrder[{label},{order_kind}]",
+                        lambda account=account, params=params: account.submitOrder(
+                            params
+                        ),
+                        repeat=repeat,
+                        group=GROUP,
+                    )
+                )
+
+            # What a PresignCache hit costs: the ticket is already signed
+            payload = account.prepareOrder(ORDER_PARAMS["limit-buy"])
+            results.append(
+                run_benchmark(
+                    f"submitOrder[{label},limit-buy,presigned]",
+                    lambda account=account, payload=payload: account.postOrder(payload),
+                    repeat=repeat,
+                    group=GROUP,
+                )
+            )
+
+            results.append(
+                run_benchmark(
+                    f"cancelOrders[{label}]",
+                    lambda account=account: account.cancelOrders(
+                        ["ldnZvNSTVzSiy4nEmTnf3mgkKOyiV4iBGwHSyLNQMTE="]
+                    ),
+                    repeat=repeat,
+                    group=GROUP,
+                )
+            )
+
+    # Request body of an order: what requests' json= did, and what is sent now
+    encoder = OrderPayloadEncoder()
+    for name, fn in [
+        ("json.dumps", json.dumps),
+        ("json_dumps", json_dumps),
+        ("OrderPayloadEncoder", encoder.encode),
+    ]:
+        results.append(
+            run_benchmark(
+                f"orderPayload[{name}]",
+                lambda fn=fn: fn(payload),
+                repeat=repeat,
+                group=GROUP,
+            )
+        )
+
+    return results
@@ -0,0 +1,92 @@
+import queue
+import statistics
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import run_benchmark
+from c3.websocket_threaded import SpscQueue, ThreadedWebSocketClient
+
+GROUP = "threadedWebSocket"
+
+BATCH = 1000
+LATENCY_EVENTS = 2000
+
+LEVEL1 = {
+    "marketId": "ETH-USDC",
+    "timestamp": 1700767680021,
+    "bestBid": {"price": "1028.21", "size": "1.5"},
+    "bestAsk": {"price": "1028.35", "size": "0.7"},
+}
+
+
+def _consume(get: Callable[[], Any], counter: List[int]):
+    while True:
+        if get() is None:
+            return
+        counter[0] += 1
+
+
+def _handoff(name: str, put: Callable[[Any], None], get, repeat: int):
+    """Throughput of a producer putting BATCH items for a consumer thread."""
+    counter = [0]
+    consumer = threading.Thread(target=_consume, args=(get, counter), daemon=True)
+    consumer.start()
+
+    def batch():
+        target = counter[0] + BATCH
+        for _ in range(BATCH):
+            put(LEVEL1)
+        while counter[0] < target:
+            time.sleep(0)
+
+    result = run_benchmark(
+        f"{name}.handoff[{BATCH} events]", batch, repeat=repeat, group=GROUP
+    )
+    put(None)
+    consumer.join()
+    return result
+
+
+def _latency(repeat: int) -> List[Dict[str, Any]]:
+    """Time from the loop thread dispatching an event to the consumer taking it."""
+    client = ThreadedWebSocketClient("http://localhost:3000/", "C3_BENCHMARK", "token")
+    samples = {"p50": [], "p99": []}
+    for _ in range(repeat):
+        stream = client.events()
+        consumer = threading.Thread(target=lambda: [None for _ in stream], daemon=True)
+        consumer.start()
+        for _ in range(LATENCY_EVENTS):
+            client._dispatch("level1", (LEVEL1,), 0.0)
+            # Paced, so every event finds the consumer waiting
+            time.sleep(0.0001)
+        client.remove_stream(stream)
+        consumer.join()
+        samples["p50"].append(stream.latency_us.percentile(50))
+        samples["p99"].append(stream.latency_us.percentile(99))
+
+    return [
+        {
+            "name": f"ThreadedWebSocketClient.handoff_latency[{stat}]",
+            "group": GROUP,
+            "unit": "us",
+            "loops": LATENCY_EVENTS,
+            "repeat": repeat,
+            "min": min(values),
+            "median": statistics.median(values),
+            "mean": statistics.fmean(values),
+            "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+        }
+        for stat, values in samples.items()
+    ]
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    spsc = SpscQueue(BATCH * 4)
+    # Reference point: the lock based queue of the standard library
+    locked = queue.Queue(BATCH * 4)
+    return [
+        _handoff("SpscQueue", spsc.put, spsc.get, repeat),
+        _handoff("queue.Queue", locked.put, locked.get, repeat),
+        *_latency(repeat),
+    ]
@@ -0,0 +1,49 @@
+import os
+from typing import Any, Dict, List
+
+from benchmarks.common import load_fixture_lines, run_benchmark
+from c3.utils.serialization import _stdlib_loads, orjson
+from c3.websocket import WebSocketClient
+
+GROUP = "websocket"
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+WS_FRAMES_FIXTURE = os.path.join(FIXTURES_DIR, "ws_frames.jsonl")
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    frames = load_fixture_lines(WS_FRAMES_FIXTURE)
+    inputs = {
+        "str": frames,
+        # What websockets hands over when frames are not decoded to str
+        "bytes": [frame.encode("utf-8") for frame in frames],
+    }
+
+    parsers = {"json": _stdlib_loads}
+    if orjson is not None:
+        parsers["orjson"] = orjson.loads
+
+    results = []
+    for parser_name, loads in parsers.items():
+        # No listeners are registered, so this measures decoding and routing only.
+        client = WebSocketClient(
+            "http://localhost:3000/", "C3_BENCHMARK", "token", loads=loads
+        )
+
+        for input_name, messages in inputs.items():
+
+            def handle_all(messages=messages):
+                for message in messages:
+                    client.handle_message(message)
+
+            result = run_benchmark(
+                f"handle_message[{parser_name},{input_name},{len(frames)} frames]",
+                handle_all,
+                repeat=repeat,
+                group=GROUP,
+            )
+            result["frames"] = len(frames)
+            result["bytes"] = sum(len(frame) for frame in inputs["bytes"])
+            results.append(result)
+
+    return results
@@ -0,0 +1,148 @@
+import json
+import platform
+import statistics
+import threading
+import time
+import timeit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+
+from c3.signing.signers import AlgorandMessageSigner, EVMMessageSigner
+
+# Same key as tests/encoding_test.py, derived from master key = bytes(range(32))
+ALGORAND_PRIVATE_KEY = "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+EVM_PRIVATE_KEY = "0x" + "11" * 32
+
+INSTRUMENTS_INFO = {
+    "ALGO": {"asaId": 0, "asaName": "Algorand", "asaDecimals": 6, "slotId": 0},
+    "USDC": {"asaId": 31566704, "asaName": "USDC", "asaDecimals": 6, "slotId": 1},
+    "ETH": {"asaId": 887406851, "asaName": "Ethereum", "asaDecimals": 8, "slotId": 3},
+}
+
+MARKETS_INFO = {
+    "ALGO-USDC": {
+        "baseInstrument": {"id": "ALGO"},
+        "quoteInstrument": {"id": "USDC"},
+        "priceIncrement": "0.0001",
+        "quantityIncrement": "1",
+        "minQuantity": "1",
+        "maxQuantity": "1000000",
+    },
+    "ETH-USDC": {
+        "baseInstrument": {"id": "ETH"},
+        "quoteInstrument": {"id": "USDC"},
+        "priceIncrement": "0.01",
+        "quantityIncrement": "0.0001",
+        "minQuantity": "0.001",
+        "maxQuantity": "1000",
+    },
+}
+
+
+def algorand_signer() -> AlgorandMessageSigner:
+    return AlgorandMessageSigner(ALGORAND_PRIVATE_KEY)
+
+
+def evm_signer() -> EVMMessageSigner:
+    return EVMMessageSigner(EVM_PRIVATE_KEY)
+
+
+def run_benchmark(
+    name: str, fn: Callable[[], Any], repeat: int = 5, group: str = None
+) -> Dict[str, Any]:
+    """Times `fn` with timeit and returns a JSON serializable result.
+
+    The loop count is picked with `Timer.autorange` (>= 0.2s per repeat), then
+    the measurement is repeated `repeat` times. All times are in ns per call.
+    """
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    samples = [t / loops * 1e9 for t in timer.repeat(repeat=repeat, number=loops)]
+
+    return {
+        "name": name,
+        "group": group,
+        "unit": "ns/op",
+        "loops": loops,
+        "repeat": repeat,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": int(time.time()),
+    }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps the connection alive so the benchmark measures the SDK
+    # and not the TCP handshake.
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        body = self.server.response_body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+    do_DELETE = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubHTTPServer:
+    """Local HTTP server that answers every request with the same JSON body.
+
+    Usage:
+        with StubHTTPServer({"id": "order-id"}) as server:
+            account = Account(..., base_url=server.base_url)
+    """
+
+    def __init__(self, response: Any = None, host: str = "127.0.0.1", port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.response_body = json.dumps(response or {}).encode("utf-8")
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def load_fixture_lines(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
@@ -0,0 +1,159 @@
+"""Load test of the SDK against the in-process mock exchange.
+
+Measures sustained order rate, cancel latency and websocket reconnect time.
+
+    python -m benchmarks.load_mock_exchange --threads 8 --duration 10
+    python -m benchmarks.load_mock_exchange --latency 0.002 --failure-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from algosdk.account import generate_account
+
+from benchmarks.common import algorand_signer, machine_info
+from c3.c3exchange import C3Exchange
+from c3.signing.signers import AlgorandMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.utils.constants import LocalHostConstants
+from c3.websocket import WebSocketClient
+
+ORDER_PARAMS = {
+    "marketId": "ETH-USDC",
+    "type": "limit",
+    "side": "buy",
+    "amount": "0.1",
+    "price": "1028.33",
+}
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    if len(samples) == 1:
+        return {"p50": samples[0], "p90": samples[0], "p99": samples[0]}
+
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50": cuts[49],
+        "p90": cuts[89],
+        "p99": cuts[98],
+        "max": max(samples),
+    }
+
+
+def order_load(server: MockC3Exchange, threads: int, duration: float) -> Dict[str, Any]:
+    c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+
+    # One Account and signer per thread: requests.Session is not thread safe and
+    # Accounts of the same signer would hand out colliding nonces
+    accounts = [
+        c3_client.login(AlgorandMessageSigner(generate_account()[0]))
+        for _ in range(threads)
+    ]
+    order_latencies, cancel_latencies, errors = [], [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(account):
+        local_orders, local_cancels, local_errors = [], [], 0
+        while time.perf_counter() < deadline:
+            try:
+                start = time.perf_counter()
+                order = account.submitOrder(ORDER_PARAMS)
+                local_orders.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                account.cancelOrders([order["id"]])
+                local_cancels.append(time.perf_counter() - start)
+            except Exception:
+                local_errors += 1
+
+        with lock:
+            order_latencies.extend(local_orders)
+            cancel_latencies.extend(local_cancels)
+            errors.append(local_errors)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, accounts))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "threads": threads,
+        "duration": elapsed,
+        "orders": len(order_latencies),
+        "cancels": len(cancel_latencies),
+        "errors": sum(errors),
+        "orders_per_second": len(order_latencies) / elapsed,
+        "order_latency_s": percentiles(order_latencies),
+        "cancel_latency_s": percentiles(cancel_latencies),
+    }
+
+
+async def reconnect_load(server: MockC3Exchange, reconnects: int) -> Dict[str, Any]:
+    c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+    account = c3_client.login(algorand_signer())
+    client = WebSocketClient(server.base_url, account.accountId, account.apiToken)
+
+    async def wait_connections(count: int, timeout: float = 30):
+        deadline = time.perf_counter() + timeout
+        while server.ws_connections < count or not server.websockets:
+            if time.perf_counter() > deadline:
+                raise TimeoutError("websocket did not reconnect")
+            await asyncio.sleep(0.01)
+
+    client.start()
+    samples = []
+    try:
+        await wait_connections(1)
+        for _ in range(reconnects):
+            connections = server.ws_connections
+            start = time.perf_counter()
+            server.drop_websockets()
+            await wait_connections(connections + 1)
+            samples.append(time.perf_counter() - start)
+    finally:
+        client.stop()
+
+    return {"reconnects": len(samples), "reconnect_time_s": percentiles(samples)}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="C3 SDK load test on a mock exchange")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--reconnects", type=int, default=0)
+    parser.add_argument("--no-verify", action="store_true")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = {"machine": machine_info(), "config": vars(args)}
+    with MockC3Exchange(
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        verify_signatures=not args.no_verify,
+        seed=0,
+    ) as server:
+        report["orders"] = order_load(server, args.threads, args.duration)
+        if args.reconnects:
+            report["websocket"] = asyncio.run(reconnect_load(server, args.reconnects))
+        report["server_stats"] = dict(server.stats)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
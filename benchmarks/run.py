@@ -0,0 +1,140 @@
+"""Offline benchmark runner.
+
+Runs the benchmark modules, writes the results as JSON and optionally compares
+them against a stored baseline. Nothing here talks to a real C3 server.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --baseline baseline.json --threshold 0.15
+    python -m benchmarks.run --only encode,sign --save-baseline baseline.json
+"""
+import argparse
+import importlib
+import json
+import sys
+from typing import Any, Dict, List
+
+from benchmarks.common import machine_info
+
+BENCHMARK_MODULES = {
+    "encode": "benchmarks.bench_encode",
+    "sign": "benchmarks.bench_signers",
+    "submitOrder": "benchmarks.bench_submit_order",
+    "websocket": "benchmarks.bench_websocket",
+    "allocations": "benchmarks.bench_allocations",
+    "replay": "benchmarks.bench_replay",
+    "capture": "benchmarks.bench_capture",
+    "sharedFeed": "benchmarks.bench_shared_feed",
+    "threadedWebSocket": "benchmarks.bench_threaded_websocket",
+    "book": "benchmarks.bench_book",
+}
+
+DEFAULT_THRESHOLD = 0.10
+
+
+def run_benchmarks(groups: List[str], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for group in groups:
+        module = importlib.import_module(BENCHMARK_MODULES[group])
+        for result in module.run(repeat=repeat):
+            print(f"{result['name']:<50} {result['median']:>14.1f} {result['unit']}")
+            results.append(result)
+    return results
+
+
+def compare(
+    results: List[Dict[str, Any]],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    metric: str = "median",
+) -> List[Dict[str, Any]]:
+    """Compares results with a baseline report.
+
+    Args:
+        results: Benchmark results of the current run.
+        baseline: A report previously written by this runner.
+        threshold: Allowed relative slowdown, 0.10 means 10%.
+        metric: Statistic used for the comparison.
+
+    Returns:
+        List[Dict[str, Any]]: One entry per benchmark present in both runs,
+            with a `regression` flag.
+    """
+    baseline_results = {r["name"]: r for r in baseline.get("results", [])}
+
+    comparison = []
+    for result in results:
+        previous = baseline_results.get(result["name"])
+        if previous is None:
+            continue
+
+        ratio = result[metric] / previous[metric] if previous[metric] else 1.0
+        comparison.append(
+            {
+                "name": result["name"],
+                "baseline": previous[metric],
+                "current": result[metric],
+                "ratio": ratio,
+                "regression": ratio > 1.0 + threshold,
+            }
+        )
+
+    return comparison
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="C3 SDK offline benchmarks")
+    parser.add_argument(
+        "--only",
+        default=",".join(BENCHMARK_MODULES),
+        help="comma separated groups: " + ", ".join(BENCHMARK_MODULES),
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="baseline JSON report to compare with")
+    parser.add_argument("--save-baseline", help="write results as a new baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed relative slowdown before flagging a regression",
+    )
+    args = parser.parse_args(argv)
+
+    groups = [g.strip() for g in args.only.split(",") if g.strip()]
+    unknown = [g for g in groups if g not in BENCHMARK_MODULES]
+    if unknown:
+        parser.error(f"unknown benchmark groups: {', '.join(unknown)}")
+
+    report = {
+        "machine": machine_info(),
+        "results": run_benchmarks(groups, args.repeat),
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        report["comparison"] = compare(report["results"], baseline, args.threshold)
+        report["threshold"] = args.threshold
+
+        for entry in report["comparison"]:
+            flag = "REGRESSION" if entry["regression"] else "ok"
+            print(f"{entry['name']:<50} x{entry['ratio']:.3f} {flag}")
+        regressions = [e for e in report["comparison"] if e["regression"]]
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if regressions:
+        print(
+            f"{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,36 @@
 import base64
+import threading
 import time
 from decimal import Decimal
-from typing import Any, Dict
-
-from Crypto.Hash import SHA512
+from typing import TYPE_CHECKING, Any, Dict
 
 from c3.api import ApiClient
+from c3.history import (
+    DEFAULT_PAGE_SIZE,
+    ORDER_HISTORY_PATH,
+    TRADE_HISTORY_PATH,
+    HistoryCursor,
+    HistoryPager,
+)
 from c3.signing.encode import encode_user_operation, encode_user_operation_base
 from c3.signing.signers import MessageSigner, base64address
 from c3.signing.types import (
+    ZERO_LEASE,
     CancelSignatureRequest,
     OrderSignatureRequest,
     RequestOperation,
 )
+from c3.tracing import ENCODE, SEND, SIGN, VALIDATE, OrderLifecycleTracer, OrderTrace
 from c3.utils.constants import Constants, MainnetConstants, get_constants
+from c3.utils.lazy import lazy_import
+from c3.utils.serialization import OrderPayloadEncoder, json_dumps
 from c3.utils.utils import amountToContract
+from c3.validation import OrderValidator
+
+SHA512 = lazy_import("Crypto.Hash.SHA512")
+
+if TYPE_CHECKING:
+    import requests
 
 
 class Account(ApiClient):
@@ -28,8 +44,14 @@ class Account(ApiClient):
         base_url: str = MainnetConstants.API_URL,
         constants: Constants = None,
         primaryAccountAddress: str = None,
+        tracer: OrderLifecycleTracer = None,
+        validator: OrderValidator = None,
+        session: "requests.Session" = None,
+        thread_safe: bool = False,
+        validate: bool = False,
     ):
-        super().__init__(base_url)
+        # NOTE: With thread_safe every thread sends its requests on its own session
+        super().__init__(base_url, session, thread_local_sessions=thread_safe)
 
         self.accountId = accountId
         self.signer = signer
@@ -46,15 +68,26 @@ class Account(ApiClient):
 
         self.instrumentsInfo = instrumentsInfo
         self.marketsInfo = marketsInfo
+        # NOTE: Pre-trade checks are opt-in, with a validator or validate=True.
+        # Without them orders go to the exchange as given.
+        if validator is None and validate:
+            validator = OrderValidator(instrumentsInfo, marketsInfo)
+        self.validator = validator
 
         self.lastNonceStored = int(round(time.time() * 1000))
+        self._nonceLock = threading.Lock()
+
+        # NOTE: Stamps every submitted order when set, see c3.tracing
+        self.tracer = tracer
 
+        self.orderEncoder = OrderPayloadEncoder()
+
+        self.setApiToken(apiToken)
+
+    def setApiToken(self, apiToken: str):
+        """Authenticates the following requests with a new login token."""
         self.apiToken = apiToken
-        self.session.headers.update(
-            {
-                "Authorization": f"Bearer {self.apiToken}",
-            }
-        )
+        self.headers["Authorization"] = f"Bearer {self.apiToken}"
 
     def generateOrderId(self, order_signature_request: OrderSignatureRequest):
         encodedOrder = encode_user_operation_base(order_signature_request)
@@ -69,6 +102,72 @@ class Account(ApiClient):
     def getBalance(self):
         return self.get(f"v1/accounts/{self.accountId}/balance")
 
+    def _history(
+        self,
+        path: str,
+        time_field: str,
+        params: Dict[str, Any],
+        pageSize: int,
+        cursor: HistoryCursor,
+        prefetch: bool,
+    ) -> HistoryPager:
+        url = f"v1/accounts/{self.accountId}/{path}"
+        return HistoryPager(
+            lambda pageParams: self.get(url, pageParams),
+            params,
+            time_field,
+            page_size=pageSize,
+            cursor=cursor,
+            prefetch=prefetch,
+        )
+
+    def orderHistory(
+        self,
+        marketId: str = None,
+        since: int = None,
+        until: int = None,
+        pageSize: int = DEFAULT_PAGE_SIZE,
+        cursor: HistoryCursor = None,
+        prefetch: bool = True,
+    ) -> HistoryPager:
+        """Orders of the account by creation time, oldest first.
+
+        Iterate the returned pager with `for` or `async for`. Pages are
+        requested as the orders are consumed, the next one while the
+        current one is processed.
+
+        Args:
+            marketId: Only orders of this market.
+            since: Only orders created at or after this time, in ms.
+            until: Only orders created at or before this time, in ms.
+            pageSize: Orders per request.
+            cursor: Resume from the `cursor` of a previous pager, replaces since.
+            prefetch: Fetch the next page ahead.
+        """
+        if cursor is None and since is not None:
+            cursor = HistoryCursor(since)
+        params = {"marketId": marketId, "to": until}
+        return self._history(
+            ORDER_HISTORY_PATH, "createdOn", params, pageSize, cursor, prefetch
+        )
+
+    def tradeHistory(
+        self,
+        marketId: str = None,
+        since: int = None,
+        until: int = None,
+        pageSize: int = DEFAULT_PAGE_SIZE,
+        cursor: HistoryCursor = None,
+        prefetch: bool = True,
+    ) -> HistoryPager:
+        """Fills of the account's orders, oldest first. See orderHistory."""
+        if cursor is None and since is not None:
+            cursor = HistoryCursor(since)
+        params = {"marketId": marketId, "to": until}
+        return self._history(
+            TRADE_HISTORY_PATH, "timestamp", params, pageSize, cursor, prefetch
+        )
+
     def submitOrder(self, orderParams: Dict[str, Any]):
         """
         Submits a new order to the trading system based on the specified parameters.
@@ -96,15 +195,64 @@ class Account(ApiClient):
         Returns:
             str: The response from the order submission, typically including the order id.
 
+        Raises:
+            OrderValidationError: With validation enabled, the order breaks a
+                rule of its market. Nothing was sent.
+
         Note:
             The method increments 'lastNonceStored' for each order and calculates
             expiration time if not specified. It also encodes and signs the order
             before submission. Ensure that all necessary keys are provided in
             'orderParams' to avoid errors.
         """
+        trace = (
+            self.tracer.begin(orderParams["marketId"], orderParams.get("clientOrderId"))
+            if self.tracer is not None
+            else None
+        )
+
+        try:
+            orderPayload = self.prepareOrder(orderParams, trace=trace)
+            return self.postOrder(orderPayload, trace)
+        except Exception:
+            # NOTE: Failed orders get no event, their trace is never looked up
+            if trace is not None:
+                self.tracer.discard(trace)
+            raise
+
+    def reserveNonces(self, count: int) -> range:
+        """Takes `count` consecutive nonces that no other order will use."""
+        with self._nonceLock:
+            start = self.lastNonceStored
+            self.lastNonceStored += count
+        return range(start, start + count)
+
+    def prepareOrder(
+        self,
+        orderParams: Dict[str, Any],
+        nonce: int = None,
+        trace: OrderTrace = None,
+    ) -> Dict[str, Any]:
+        """Validates, encodes and signs an order without sending it.
 
+        Args:
+            orderParams (Dict[str, Any]): Same as for submitOrder.
+            nonce (int, optional): Nonce of the settlement ticket, from
+                reserveNonces. A new one is taken when not given.
+            trace (OrderTrace, optional): Trace stamped at every stage.
+
+        Returns:
+            Dict[str, Any]: Payload for postOrder.
+        """
         marketId = orderParams["marketId"]
 
+        if self.validator is not None:
+            errors = self.validator.errors(orderParams)
+            if errors:
+                raise errors[0]
+        if trace is not None:
+            trace.stamp(VALIDATE)
+
         baseId = self.marketsInfo[marketId]["baseInstrument"]["id"]
         quoteId = self.marketsInfo[marketId]["quoteInstrument"]["id"]
 
@@ -183,15 +331,13 @@ class Account(ApiClient):
 
         values = _getBuySellValues(orderData)
 
-        # to-do
-        # validateOrder(orderParams)
-
         # one day if not specified
         expires_on = orderParams.get("expiresOn", int(time.time()) + 86400)
         client_order_id = orderParams.get("clientOrderId", "")
 
-        order_nonce = self.lastNonceStored
-        self.lastNonceStored += 1
+        if nonce is None:
+            nonce = self.reserveNonces(1).start
+        order_nonce = nonce
 
         order_signature_request = OrderSignatureRequest(
             op=RequestOperation.Order,
@@ -206,11 +352,15 @@ class Account(ApiClient):
             nonce=order_nonce,
             # NOTE: For orders, these should be zero
             last_valid=0,
-            lease=bytearray(32),
+            lease=ZERO_LEASE,
         )
 
         encoded_order = encode_user_operation(order_signature_request)
+        if trace is not None:
+            trace.stamp(ENCODE)
         signature = self.signer.sign_message(encoded_order)
+        if trace is not None:
+            trace.stamp(SIGN)
 
         orderPayload = {
             "marketId": marketId,
@@ -235,9 +385,31 @@ class Account(ApiClient):
             },
         }
 
-        orderResponse = self.post(
-            f"v1/accounts/{self.accountId}/markets/{marketId}/orders", orderPayload
+        return orderPayload
+
+    def postOrder(self, orderPayload: Dict[str, Any], trace: OrderTrace = None):
+        """Sends an order payload built by prepareOrder.
+
+        Returns:
+            str: The response from the order submission, typically including the order id.
+        """
+        url = f"v1/accounts/{self.accountId}/markets/{orderPayload['marketId']}/orders"
+        # A custom serializer gets the payload itself
+        body = (
+            self.orderEncoder.encode(orderPayload)
+            if self.serializer is json_dumps
+            else orderPayload
         )
+        if trace is None:
+            return self.post(url, body)
+
+        trace.stamp(SEND)
+        try:
+            orderResponse = self.post(url, body)
+        except BaseException:
+            self.tracer.on_error(trace)
+            raise
+        self.tracer.on_response(trace, orderResponse)
 
         return orderResponse
 
@@ -268,6 +440,11 @@ class Account(ApiClient):
         return cancelResponse
 
     def cancelOrders(self, orderIds: list):
+        """Cancels orders by id.
+
+        The ids are sent as query parameters of a DELETE, as the API takes
+        them, so long lists are not gzip compressed even with gzip_threshold.
+        """
         cancelSignatureRequest = CancelSignatureRequest(
             op=RequestOperation.Cancel,
             orders=orderIds,
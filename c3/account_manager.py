@@ -0,0 +1,158 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Union
+
+from c3.account import Account
+from c3.c3exchange import C3Exchange
+from c3.signing.signers import MessageSigner
+from c3.utils.lazy import lazy_import
+from c3.validation import OrderValidator
+
+requests = lazy_import("requests")
+
+LoginSpec = Union[MessageSigner, Dict[str, Any]]
+
+
+class AccountManager:
+    """Many accounts and delegates behind one connection pool.
+
+    Accounts log in concurrently and share the exchange's metadata, and with
+    validate=True one order validator. requests.Session is not thread-safe,
+    so every worker thread sends its requests, logins included, on a session
+    of its own. All of these sessions mount one HTTPAdapter, and so share its
+    connection pool of max_workers connections per host. Orders go to the
+    account given by name, or to the account the market is routed to.
+    Actions over all accounts run concurrently and return their results by
+    account name. A failed account does not stop the others, its exception
+    is returned in place of the result.
+
+    Args:
+        exchange: Exchange the accounts log in to.
+        max_workers: Requests in flight at once.
+        validate: Check orders against the exchange metadata before signing.
+    """
+
+    def __init__(
+        self, exchange: C3Exchange, max_workers: int = 16, validate: bool = False
+    ) -> None:
+        self.exchange = exchange
+        self.validate = validate
+        self.adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_workers)
+        exchange.enable_thread_local_sessions(self.adapter)
+        self.executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="c3-accounts"
+        )
+        self._validator = None
+        self._lock = threading.Lock()
+
+        self.accounts: Dict[str, Account] = {}
+        self.routes: Dict[str, str] = {}
+
+    @property
+    def validator(self) -> OrderValidator:
+        with self._lock:
+            if self._validator is None:
+                self._validator = OrderValidator(
+                    self.exchange.instrumentsInfo, self.exchange.marketsInfo
+                )
+            return self._validator
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def __getitem__(self, name: str) -> Account:
+        return self.accounts[name]
+
+    def _login(self, spec: LoginSpec) -> Account:
+        kwargs = spec if isinstance(spec, dict) else {"signer": spec}
+        validator = self.validator if self.validate else None
+        account = self.exchange.login(**kwargs, validator=validator)
+        account.enable_thread_local_sessions(self.adapter)
+        return account
+
+    def login_all(self, logins: Dict[str, LoginSpec]) -> Dict[str, Exception]:
+        """Logs in every account concurrently.
+
+        Args:
+            logins: Signer, or keyword arguments of C3Exchange.login (e.g.
+                signer, primaryAccountId, primaryAccountAddress,
+                token_store), by account name.
+
+        Returns:
+            Dict[str, Exception]: Errors of the logins that failed.
+        """
+        results = self.map(self._login, logins.items())
+        errors = {}
+        for name, result in results.items():
+            if isinstance(result, Exception):
+                errors[name] = result
+            else:
+                self.accounts[name] = result
+        return errors
+
+    def add(self, name: str, account: Account):
+        self.accounts[name] = account
+
+    def route(self, marketId: str, name: str):
+        """Sends orders of the market without an explicit account to `name`."""
+        if name not in self.accounts:
+            raise KeyError(f"Unknown account {name}")
+        self.routes[marketId] = name
+
+    def account_for(self, marketId: str, name: str = None) -> Account:
+        name = name if name is not None else self.routes.get(marketId)
+        if name is None:
+            raise KeyError(f"No account given or routed for market {marketId}")
+        return self.accounts[name]
+
+    def submitOrder(self, orderParams: Dict[str, Any], account: str = None):
+        return self.account_for(orderParams["marketId"], account).submitOrder(
+            orderParams
+        )
+
+    def map(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable = None,
+    ) -> Dict[str, Any]:
+        """Runs fn concurrently on the item of every (key, item) pair, or on every account.
+
+        Returns:
+            Dict[str, Any]: Result or raised exception, by key.
+        """
+        if items is None:
+            items = self.accounts.items()
+        futures = {name: self.executor.submit(fn, item) for name, item in items}
+        results = {}
+        for name, future in futures.items():
+            error = future.exception()
+            results[name] = error if error is not None else future.result()
+        return results
+
+    def balances(self) -> Dict[str, Any]:
+        """Balances of every account, fetched concurrently."""
+        return self.map(lambda account: account.getBalance())
+
+    def cancel_all(self, markets: Iterable[str] = None) -> Dict[str, Any]:
+        """Cancels every order of every account in the given markets, or all markets.
+
+        Returns:
+            Dict[str, Any]: Cancel responses by account name and market.
+        """
+        markets = list(markets if markets is not None else self.exchange.marketsInfo)
+        pairs = [(name, marketId) for name in self.accounts for marketId in markets]
+        results = self.map(
+            lambda pair: self.accounts[pair[0]].cancelMarketOrders(pair[1]),
+            ((pair, pair) for pair in pairs),
+        )
+        cancelled: Dict[str, Dict[str, Any]] = {}
+        for (name, marketId), result in results.items():
+            cancelled.setdefault(name, {})[marketId] = result
+        return cancelled
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for account in self.accounts.values():
+            account.close()
+        self.exchange.close()
+        self.adapter.close()
@@ -1,24 +1,141 @@
-from typing import Any
-
-import requests
-from requests.exceptions import HTTPError
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional, Set, Tuple
 
 from c3.utils.constants import MainnetConstants
+from c3.utils.lazy import lazy_import
+from c3.utils.serialization import json_dumps
+
+gzip = lazy_import("gzip")
+requests = lazy_import("requests")
+
+# Fast enough for the request path, most of the gain is in the first levels
+GZIP_LEVEL = 5
+
+
+class _ThreadSession:
+    """Holds the session of one thread, it is dropped when the thread exits."""
+
+    __slots__ = ("session", "__weakref__")
+
+    def __init__(self, session: "requests.Session"):
+        self.session = session
+
+
+def _close_thread_session(
+    sessions: Set["requests.Session"],
+    lock: threading.Lock,
+    session: "requests.Session",
+    shared: "requests.adapters.HTTPAdapter" = None,
+):
+    with lock:
+        sessions.discard(session)
+    # NOTE: Like session.close(), but a shared adapter stays open for the
+    # sessions of the other threads
+    for adapter in session.adapters.values():
+        if adapter is not shared:
+            adapter.close()
 
 
 class ApiClient:
     def __init__(
         self,
         base_url=MainnetConstants.API_URL,
+        session: "requests.Session" = None,
+        thread_local_sessions: bool = False,
+        serializer: Callable[[Any], bytes] = None,
+        gzip_threshold: int = None,
     ) -> None:
         self.base_url = base_url
+        # NOTE: Request bodies are serialized here, not by requests' json=,
+        # so a faster serializer (orjson by default when installed) is used
+        self.serializer = serializer if serializer is not None else json_dumps
+        # Bodies of at least this many bytes are sent gzip compressed, None
+        # never compresses. Only set it for servers that accept gzip bodies.
+        # DELETE requests (cancels) carry no body and are never compressed.
+        self.gzip_threshold: Optional[int] = gzip_threshold
+
+        # NOTE: Clients may share one session (and its connection pool), so
+        # their own headers are sent with every request instead of set on it
+        self._session = session if session is not None else requests.Session()
+        self.headers: Dict[str, str] = {
+            "Content-Type": "application/json",
+        }
+
+        # requests.Session is not thread-safe, with thread_local_sessions
+        # every thread calling the client gets a session of its own
+        self._local = threading.local() if thread_local_sessions else None
+        self._thread_sessions: Set["requests.Session"] = set()
+        self._sessions_lock = threading.Lock()
+        # Mounted on every thread's session, so they share one connection pool
+        self._adapter: Optional["requests.adapters.HTTPAdapter"] = None
+
+    @property
+    def session(self) -> "requests.Session":
+        if self._local is None:
+            return self._session
+
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = _ThreadSession(requests.Session())
+            if self._adapter is not None:
+                holder.session.mount("http://", self._adapter)
+                holder.session.mount("https://", self._adapter)
+            self._local.holder = holder
+            with self._sessions_lock:
+                self._thread_sessions.add(holder.session)
+            # NOTE: The thread's locals, and so the holder, go away when the
+            # thread exits, which closes the session and its connections
+            weakref.finalize(
+                holder,
+                _close_thread_session,
+                self._thread_sessions,
+                self._sessions_lock,
+                holder.session,
+                self._adapter,
+            )
+        return holder.session
+
+    @session.setter
+    def session(self, session: "requests.Session"):
+        self._session = session
+
+    def enable_thread_local_sessions(
+        self, adapter: "requests.adapters.HTTPAdapter" = None
+    ):
+        """Gives every thread calling the client a session of its own from now on.
+
+        Args:
+            adapter: Mounted on the sessions made from now on, so that they
+                share its connection pool. Closing it is up to the caller.
+        """
+        if self._local is None:
+            self._local = threading.local()
+        if adapter is not None:
+            self._adapter = adapter
+
+    def close(self):
+        """Closes the connections of the client's sessions."""
+        self._session.close()
+        with self._sessions_lock:
+            sessions = list(self._thread_sessions)
+        for session in sessions:
+            _close_thread_session(
+                self._thread_sessions, self._sessions_lock, session, self._adapter
+            )
+
+    def _body(self, payload: Any) -> Tuple[bytes, Dict[str, str]]:
+        """Serialized request body, payloads already in bytes are sent as they are."""
+        if isinstance(payload, (bytes, bytearray)):
+            body = payload
+        else:
+            body = self.serializer(payload)
 
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "Content-Type": "application/json",
-            }
-        )
+        headers = self.headers
+        if self.gzip_threshold is not None and len(body) >= self.gzip_threshold:
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            headers = {**headers, "Content-Encoding": "gzip"}
+        return body, headers
 
     def get(self, url_path: str, params: Any = None) -> Any:
         url = self.base_url + url_path
@@ -27,6 +144,7 @@ class ApiClient:
             response = self.session.get(
                 url,
                 params=params,
+                headers=self.headers,
             )
             response.raise_for_status()
 
@@ -34,7 +152,7 @@ class ApiClient:
                 return response.json()
             except ValueError:
                 return {"error": f"Could not parse JSON: {response.text}"}
-        except HTTPError as http_err:
+        except requests.HTTPError as http_err:
             # Raise a new exception that includes the response text
             raise Exception(
                 f"HTTP Error: {http_err} - Response Text: {response.text}"
@@ -52,7 +170,8 @@ class ApiClient:
         url = self.base_url + url_path
 
         try:
-            response = self.session.post(url, json=payload)
+            body, headers = self._body(payload)
+            response = self.session.post(url, data=body, headers=headers)
             # This will raise an HTTPError if the response was unsuccessful
             response.raise_for_status()
 
@@ -60,7 +179,7 @@ class ApiClient:
                 return response.json()
             except ValueError:
                 return {"error": f"Could not parse JSON: {response.text}"}
-        except HTTPError as http_err:
+        except requests.HTTPError as http_err:
             # Raise a new exception that includes the response text
             raise Exception(
                 f"HTTP Error: {http_err} - Response Text: {response.text}"
@@ -75,18 +194,18 @@ class ApiClient:
         raise
 
     def delete(self, url_path: str, payload: Any = {}) -> Any:
-        print(payload)
+        """Sends the payload as query parameters, gzip_threshold does not apply."""
         url = self.base_url + url_path
 
         try:
-            response = self.session.delete(url, params=payload)
+            response = self.session.delete(url, params=payload, headers=self.headers)
             response.raise_for_status()
 
             try:
                 return response.json()
             except ValueError:
                 return {"error": f"Could not parse JSON: {response.text}"}
-        except HTTPError as http_err:
+        except requests.HTTPError as http_err:
             raise Exception(
                 f"HTTP Error: {http_err} - Response Text: {response.text}"
             ) from http_err
@@ -0,0 +1,236 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from c3.marketdata import market_of
+from c3.websocket import WebSocketClient, WebSocketClientEvent
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+SECOND = 1000
+MINUTE = 60 * SECOND
+HOUR = 60 * MINUTE
+
+DEFAULT_RESOLUTIONS = (SECOND, MINUTE)
+DEFAULT_CAPACITY = 1024
+
+# (name, numpy format) of every bar column
+BAR_FIELDS = [
+    ("start", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+    ("buy_volume", "<f8"),
+    ("notional", "<f8"),
+    ("vwap", "<f8"),
+    ("trades", "<i8"),
+]
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Trade bars need numpy, install it with `pip install numpy`")
+
+
+class BarSeries:
+    """OHLCV bars of one market and resolution in a fixed size ring.
+
+    The bar being built is kept in plain attributes, so a trade costs a few
+    comparisons and additions. It is written to the columns when the next
+    bar starts or when the bars are read. Every row is stored twice,
+    `capacity` rows apart, so the most recent `capacity` bars are always one
+    contiguous slice and `view` never copies.
+
+    Bars start at multiples of the resolution, periods without trades have
+    no bar. Trades older than the current bar update their bar if it is
+    still in the ring and are counted in `late` otherwise.
+
+    Args:
+        resolution: Bar length in milliseconds.
+        capacity: Number of bars kept.
+    """
+
+    def __init__(self, resolution: int, capacity: int = DEFAULT_CAPACITY) -> None:
+        _require_numpy()
+        self.resolution = resolution
+        self.capacity = capacity
+        self.columns: Dict[str, "np.ndarray"] = {
+            name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in BAR_FIELDS
+        }
+        # Bars started so far, the current one is number count - 1
+        self.count = 0
+        self.late = 0
+        self._dirty = False
+
+        self.start = -1
+        self.open = self.high = self.low = self.close = 0.0
+        self.volume = self.buy_volume = self.notional = 0.0
+        self.trades = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def _row(self) -> Tuple:
+        vwap = self.notional / self.volume if self.volume else self.close
+        return (
+            self.start,
+            self.open,
+            self.high,
+            self.low,
+            self.close,
+            self.volume,
+            self.buy_volume,
+            self.notional,
+            vwap,
+            self.trades,
+        )
+
+    def _store(self, slot: int, row: Tuple):
+        mirror = slot + self.capacity
+        for (name, _), value in zip(BAR_FIELDS, row):
+            column = self.columns[name]
+            column[slot] = value
+            column[mirror] = value
+
+    def _sync(self):
+        if self._dirty:
+            self._store((self.count - 1) % self.capacity, self._row())
+            self._dirty = False
+
+    def add(self, timestamp: int, price: float, size: float, buy: bool = False):
+        start = timestamp - timestamp % self.resolution
+        if start != self.start:
+            if start < self.start:
+                self._add_late(start, price, size, buy)
+                return
+            self._sync()
+            self.count += 1
+            self.start = start
+            self.open = self.high = self.low = self.close = price
+            self.volume = size
+            self.buy_volume = size if buy else 0.0
+            self.notional = price * size
+            self.trades = 1
+            self._dirty = True
+            return
+
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += size
+        if buy:
+            self.buy_volume += size
+        self.notional += price * size
+        self.trades += 1
+        self._dirty = True
+
+    def _add_late(self, start: int, price: float, size: float, buy: bool):
+        # NOTE: Closed bars are only in the columns, walk back from the newest
+        starts = self.columns["start"]
+        for age in range(1, len(self)):
+            slot = (self.count - 1 - age) % self.capacity
+            if starts[slot] < start:
+                break
+            if starts[slot] == start:
+                bar = {name: column[slot] for name, column in self.columns.items()}
+                bar["high"] = max(bar["high"], price)
+                bar["low"] = min(bar["low"], price)
+                bar["volume"] += size
+                if buy:
+                    bar["buy_volume"] += size
+                bar["notional"] += price * size
+                bar["vwap"] = bar["notional"] / bar["volume"]
+                bar["trades"] += 1
+                self._store(slot, tuple(bar[name] for name, _ in BAR_FIELDS))
+                return
+        self.late += 1
+
+    def view(self, n: int = None) -> Dict[str, "np.ndarray"]:
+        """The last `n` bars (all kept bars by default), oldest first.
+
+        Returns:
+            Dict[str, np.ndarray]: Column name to a read-only view of the
+                ring. Rows change when the ring wraps around, copy them to
+                keep them longer than `capacity` bars.
+        """
+        self._sync()
+        n = len(self) if n is None else min(n, len(self))
+        end = (self.count - 1) % self.capacity + 1 + self.capacity
+        first = end - n
+        views = {}
+        for name, column in self.columns.items():
+            view = column[first:end]
+            view.flags.writeable = False
+            views[name] = view
+        return views
+
+    def last(self) -> Optional[Dict[str, Any]]:
+        """The bar being built, None before the first trade."""
+        if self.count == 0:
+            return None
+        return dict(zip((name for name, _ in BAR_FIELDS), self._row()))
+
+
+class BarAggregator:
+    """Builds bars of several resolutions from Trades events, per market.
+
+    Args:
+        resolutions: Bar lengths in milliseconds.
+        capacity: Bars kept per market and resolution.
+    """
+
+    def __init__(
+        self,
+        resolutions: Iterable[int] = DEFAULT_RESOLUTIONS,
+        capacity: int = DEFAULT_CAPACITY,
+    ) -> None:
+        _require_numpy()
+        self.resolutions = tuple(resolutions)
+        self.capacity = capacity
+        self.markets: Dict[str, List[BarSeries]] = {}
+
+    def _market(self, market_id: str) -> List[BarSeries]:
+        series = self.markets.get(market_id)
+        if series is None:
+            series = [BarSeries(r, self.capacity) for r in self.resolutions]
+            self.markets[market_id] = series
+        return series
+
+    def add_trade(
+        self, market_id: str, timestamp: int, price: float, size: float, buy: bool
+    ):
+        for series in self._market(market_id):
+            series.add(timestamp, price, size, buy)
+
+    def on_trades(self, data: List[Dict[str, Any]]):
+        market_id = market_of(data)
+        if market_id is None:
+            return
+        market = self._market(market_id)
+        for trade in data:
+            timestamp = trade["timestamp"]
+            price = float(trade["price"])
+            size = float(trade["size"])
+            buy = trade["side"] == "buy"
+            for series in market:
+                series.add(timestamp, price, size, buy)
+
+    def attach(self, client: WebSocketClient):
+        async def on_trades(data):
+            self.on_trades(data)
+
+        client.on(WebSocketClientEvent.Trades, on_trades)
+
+    def series(self, market_id: str, resolution: int) -> BarSeries:
+        return self._market(market_id)[self.resolutions.index(resolution)]
+
+    def bars(
+        self, market_id: str, resolution: int, n: int = None
+    ) -> Dict[str, "np.ndarray"]:
+        """Views of the last `n` bars of a market, see BarSeries.view."""
+        return self.series(market_id, resolution).view(n)
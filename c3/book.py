@@ -0,0 +1,373 @@
+"""Local order books built from bookDelta events, with incremental metrics.
+
+`OrderBook` keeps the levels of one market. `BookAnalytics` keeps a book per
+market and updates spread, microprice, top-N imbalance and depth within a
+distance of the touch as levels change, instead of recomputing them from
+the whole book on every delta. Subscribers are called when a metric moved
+by more than their threshold.
+"""
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from c3.marketdata import NAN, SIDE_ASK, SIDE_BID, PriceLevel, market_of
+from c3.websocket import WebSocketClient, WebSocketClientEvent
+
+DEFAULT_DEPTH_LEVELS = 5
+DEFAULT_DEPTH_BPS = (10, 50)
+# Deltas between exact recomputations of the running sums, bounds float drift
+DEFAULT_RESYNC_EVERY = 10000
+
+MetricsCallback = Callable[[str, Dict[str, float]], Any]
+
+
+class OrderBook:
+    """Price levels of one market, kept sorted best first on both sides.
+
+    Bid prices are stored negated, so the best level of either side is at
+    rank 0 and ranks can be compared the same way on both sides.
+    """
+
+    def __init__(self, market_id: str) -> None:
+        self.market_id = market_id
+        self.levels: Tuple[Dict[float, float], Dict[float, float]] = ({}, {})
+        self._keys: Tuple[List[float], List[float]] = ([], [])
+        self.seq = -1
+        self.timestamp = 0
+
+    def __len__(self) -> int:
+        return len(self._keys[SIDE_BID]) + len(self._keys[SIDE_ASK])
+
+    def set(self, side: int, price: float, size: float) -> Tuple[int, float]:
+        """Sets the size of a level, a size of 0 removes it.
+
+        Returns:
+            Tuple[int, float]: Rank of the level (before it was removed, or
+                after it was inserted) and its previous size. The rank is -1
+                when a missing level was removed, which changes nothing.
+        """
+        levels = self.levels[side]
+        keys = self._keys[side]
+        key = -price if side == SIDE_BID else price
+        old = levels.get(price, 0.0)
+        if size > 0:
+            levels[price] = size
+            rank = bisect_left(keys, key)
+            if not old:
+                keys.insert(rank, key)
+        elif old:
+            del levels[price]
+            rank = bisect_left(keys, key)
+            del keys[rank]
+        else:
+            rank = -1
+        return rank, old
+
+    def depth(self, side: int) -> int:
+        return len(self._keys[side])
+
+    def price(self, side: int, rank: int) -> float:
+        keys = self._keys[side]
+        if rank >= len(keys):
+            return NAN
+        return -keys[rank] if side == SIDE_BID else keys[rank]
+
+    def size(self, side: int, rank: int) -> float:
+        price = self.price(side, rank)
+        return 0.0 if price != price else self.levels[side][price]
+
+    def best(self, side: int) -> PriceLevel:
+        price = self.price(side, 0)
+        return price, (NAN if price != price else self.levels[side][price])
+
+    def top(self, side: int, n: int) -> List[PriceLevel]:
+        levels = self.levels[side]
+        prices = self._keys[side][:n]
+        if side == SIDE_BID:
+            prices = [-key for key in prices]
+        return [(price, levels[price]) for price in prices]
+
+    def iter_levels(self, side: int) -> Iterator[PriceLevel]:
+        """Levels of a side, best first."""
+        levels = self.levels[side]
+        if side == SIDE_BID:
+            for key in self._keys[side]:
+                yield -key, levels[-key]
+        else:
+            for key in self._keys[side]:
+                yield key, levels[key]
+
+    def apply(self, data: Dict[str, Any]):
+        """Applies the levels of a bookDelta payload."""
+        for price, size in data.get("bids", ()):
+            self.set(SIDE_BID, float(price), float(size))
+        for price, size in data.get("asks", ()):
+            self.set(SIDE_ASK, float(price), float(size))
+        self.seq = data.get("seq", self.seq)
+        self.timestamp = data.get("timestamp", self.timestamp)
+
+    def clear(self):
+        for side in (SIDE_BID, SIDE_ASK):
+            self.levels[side].clear()
+            self._keys[side].clear()
+
+
+class Subscription:
+    """Calls back when any watched metric moved by at least its threshold.
+
+    Moves are measured against the values of the last call, so slow drifts
+    are reported once they add up to the threshold.
+    """
+
+    def __init__(
+        self,
+        callback: MetricsCallback,
+        thresholds: Dict[str, float],
+        market_id: str = None,
+    ) -> None:
+        self.callback = callback
+        self.thresholds = thresholds
+        self.market_id = market_id
+        self.last: Dict[str, Dict[str, float]] = {}
+        self.calls = 0
+
+    def check(self, market_id: str, metrics: Dict[str, float]) -> bool:
+        last = self.last.get(market_id)
+        if last is not None:
+            for name, threshold in self.thresholds.items():
+                new, old = metrics[name], last[name]
+                if new != new or old != old:
+                    # NOTE: NaN means an empty side, only report it appearing or going
+                    if (new != new) != (old != old):
+                        break
+                elif abs(new - old) >= threshold:
+                    break
+            else:
+                return False
+
+        self.last[market_id] = metrics
+        self.calls += 1
+        self.callback(market_id, metrics)
+        return True
+
+
+class _MarketState:
+    __slots__ = ("book", "top", "bands", "touch", "limits", "deltas")
+
+    def __init__(self, market_id: str, band_count: int) -> None:
+        self.book = OrderBook(market_id)
+        # Size of the best N levels, per side
+        self.top = [0.0, 0.0]
+        # Size within every distance of the touch, per side
+        self.bands = ([0.0] * band_count, [0.0] * band_count)
+        # Touch price the bands were summed for, and the band limits as
+        # book keys (negated for bids), so a level is in a band if key <= limit
+        self.touch = [NAN, NAN]
+        self.limits: Tuple[List[float], List[float]] = ([], [])
+        self.deltas = 0
+
+
+class BookAnalytics:
+    """Order books of several markets with metrics kept up to date per delta.
+
+    Every changed level adjusts the running sums in O(log levels): the size
+    of the best `depth_levels` levels of each side, and the size within each
+    of `depth_bps` basis points of the touch. Band sums of a side are only
+    summed again when its best price moves. Spread, mid and microprice come
+    from the best levels.
+
+    Metric names: best_bid, best_ask, spread, mid, microprice, imbalance,
+    bid_depth, ask_depth (size of the best `depth_levels` levels) and
+    bid_depth_{bps}bps, ask_depth_{bps}bps for every distance.
+
+    Args:
+        depth_levels: Levels per side of `imbalance` and the depths.
+        depth_bps: Distances from the touch, in basis points, to sum size in.
+        resync_every: Deltas of a market between exact recomputations of the
+            running sums.
+    """
+
+    def __init__(
+        self,
+        depth_levels: int = DEFAULT_DEPTH_LEVELS,
+        depth_bps: Iterable[float] = DEFAULT_DEPTH_BPS,
+        resync_every: int = DEFAULT_RESYNC_EVERY,
+    ) -> None:
+        self.depth_levels = depth_levels
+        self.depth_bps = tuple(depth_bps)
+        self.resync_every = resync_every
+        self.markets: Dict[str, _MarketState] = {}
+        self.subscriptions: List[Subscription] = []
+        self._band_names = [
+            (f"bid_depth_{bps:g}bps", f"ask_depth_{bps:g}bps") for bps in self.depth_bps
+        ]
+
+    def book(self, market_id: str) -> Optional[OrderBook]:
+        state = self.markets.get(market_id)
+        return state.book if state is not None else None
+
+    def _state(self, market_id: str) -> _MarketState:
+        state = self.markets.get(market_id)
+        if state is None:
+            state = _MarketState(market_id, len(self.depth_bps))
+            self.markets[market_id] = state
+        return state
+
+    def _sum_bands(self, state: _MarketState, side: int):
+        book = state.book
+        touch = book.price(side, 0)
+        state.touch[side] = touch
+        bands = state.bands[side]
+        limits = state.limits[side]
+        limits.clear()
+        if touch != touch:
+            bands[:] = [0.0] * len(bands)
+            return
+
+        for i, bps in enumerate(self.depth_bps):
+            if side == SIDE_BID:
+                limit = -touch * (1 - bps / 10000)
+            else:
+                limit = touch * (1 + bps / 10000)
+            limits.append(limit)
+            total = 0.0
+            for price, size in book.iter_levels(side):
+                if (-price if side == SIDE_BID else price) > limit:
+                    break
+                total += size
+            bands[i] = total
+
+    def resync(self, state: _MarketState):
+        """Recomputes the running sums of a market from its book."""
+        for side in (SIDE_BID, SIDE_ASK):
+            top = state.book.top(side, self.depth_levels)
+            state.top[side] = sum(size for _, size in top)
+            self._sum_bands(state, side)
+
+    def _set_level(self, state: _MarketState, side: int, price: float, size: float):
+        book = state.book
+        rank, old = book.set(side, price, size)
+        if rank < 0:
+            return
+
+        n = self.depth_levels
+        if old and size:
+            if rank < n:
+                state.top[side] += size - old
+        elif size:
+            # Inserted, pushes the level at rank n out of the top
+            if rank < n:
+                state.top[side] += size - book.size(side, n)
+        elif rank < n:
+            # Removed, pulls the level now at rank n - 1 into the top
+            state.top[side] += book.size(side, n - 1) - old
+
+        key = -price if side == SIDE_BID else price
+        for i, limit in enumerate(state.limits[side]):
+            if key <= limit:
+                state.bands[side][i] += size - old
+
+    def on_book_delta(self, data: Dict[str, Any]):
+        market_id = market_of(data)
+        state = self._state(market_id)
+        for price, size in data.get("bids", ()):
+            self._set_level(state, SIDE_BID, float(price), float(size))
+        for price, size in data.get("asks", ()):
+            self._set_level(state, SIDE_ASK, float(price), float(size))
+        book = state.book
+        book.seq = data.get("seq", book.seq)
+        book.timestamp = data.get("timestamp", book.timestamp)
+
+        state.deltas += 1
+        if state.deltas % self.resync_every == 0:
+            self.resync(state)
+        else:
+            # NOTE: Band limits follow the touch, a moved touch means summing again
+            for side in (SIDE_BID, SIDE_ASK):
+                if book.price(side, 0) != state.touch[side]:
+                    self._sum_bands(state, side)
+
+        if self.subscriptions:
+            metrics = None
+            for subscription in self.subscriptions:
+                if subscription.market_id in (None, market_id):
+                    if metrics is None:
+                        metrics = self.metrics(market_id)
+                    subscription.check(market_id, metrics)
+
+    def metrics(self, market_id: str) -> Dict[str, float]:
+        """Current metrics of a market, NaN where a side is empty."""
+        state = self.markets[market_id]
+        book = state.book
+        bid, bid_size = book.best(SIDE_BID)
+        ask, ask_size = book.best(SIDE_ASK)
+        bid_depth, ask_depth = state.top
+        depth = bid_depth + ask_depth
+        touch_size = bid_size + ask_size
+
+        metrics = {
+            "timestamp": book.timestamp,
+            "best_bid": bid,
+            "best_ask": ask,
+            "spread": ask - bid,
+            "mid": (bid + ask) / 2,
+            "microprice": (bid * ask_size + ask * bid_size) / touch_size
+            if touch_size > 0
+            else NAN,
+            "imbalance": (bid_depth - ask_depth) / depth if depth > 0 else NAN,
+            "bid_depth": bid_depth,
+            "ask_depth": ask_depth,
+        }
+        bid_bands, ask_bands = state.bands
+        for i, (bid_name, ask_name) in enumerate(self._band_names):
+            metrics[bid_name] = bid_bands[i]
+            metrics[ask_name] = ask_bands[i]
+        return metrics
+
+    def subscribe(
+        self,
+        callback: MetricsCallback,
+        thresholds: Dict[str, float],
+        market_id: str = None,
+    ) -> Subscription:
+        """Calls `callback(market_id, metrics)` when a metric moves enough.
+
+        Args:
+            callback: Called with the market and all its metrics.
+            thresholds: Smallest move, in the metric's unit, worth a call,
+                by metric name. Other metrics never trigger a call.
+            market_id: Only watch this market, all markets if None.
+        """
+        unknown = set(thresholds) - set(self._metric_names())
+        if unknown:
+            raise ValueError(f"Unknown metrics {sorted(unknown)}")
+        subscription = Subscription(callback, thresholds, market_id)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.remove(subscription)
+
+    def _metric_names(self) -> List[str]:
+        names = ["best_bid", "best_ask", "spread", "mid", "microprice", "imbalance"]
+        names += ["bid_depth", "ask_depth"]
+        for bid_name, ask_name in self._band_names:
+            names += [bid_name, ask_name]
+        return names
+
+    def clear(self):
+        """Forgets every book, e.g. when deltas were missed."""
+        self.markets.clear()
+        for subscription in self.subscriptions:
+            subscription.last.clear()
+
+    def attach(self, client: WebSocketClient):
+        """Follows the bookDelta events of a client, starting over on reconnects."""
+
+        async def on_book_delta(data):
+            self.on_book_delta(data)
+
+        async def on_connect(*args):
+            self.clear()
+
+        client.on(WebSocketClientEvent.bookDelta, on_book_delta)
+        client.on(WebSocketClientEvent.Connect, on_connect)
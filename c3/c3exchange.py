@@ -1,11 +1,19 @@
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict
 
 from c3.account import Account
 from c3.api import ApiClient
 from c3.signing.encode import encode_user_operation
 from c3.signing.signers import AlgorandMessageSigner, EVMMessageSigner, MessageSigner
 from c3.signing.types import LoginSignatureRequest, RequestOperation
+from c3.token_store import TokenRefresher, TokenStore
 from c3.utils.constants import Constants, MainnetConstants, get_constants
+from c3.utils.lazy import lazy_import
+from c3.validation import OrderValidator
+
+futures = lazy_import("concurrent.futures")
+
+if TYPE_CHECKING:
+    import requests
 
 
 class C3Exchange(ApiClient):
@@ -20,11 +28,74 @@ class C3Exchange(ApiClient):
         super().__init__(base_url)
 
         self.Constants = constants if constants is not None else get_constants(base_url)
-        self.instrumentsInfo = (
-            instrumentsInfo if instrumentsInfo is not None else self._getInstruments()
+
+        # NOTE: Instruments and markets load in the background, concurrently with
+        # each other and with login. The first read of either waits for it.
+        self._instrumentsInfo = self._marketsInfo = None
+        if instrumentsInfo is None or marketsInfo is None:
+            # requests.Session is not thread-safe, the fetches and login each
+            # get a session of their own
+            self.enable_thread_local_sessions()
+            executor = futures.ThreadPoolExecutor(2, thread_name_prefix="c3-bootstrap")
+            if instrumentsInfo is None:
+                self._instrumentsInfo = executor.submit(self._getInstruments)
+            if marketsInfo is None:
+                self._marketsInfo = executor.submit(self._getMarkets)
+            executor.shutdown(wait=False)
+        if instrumentsInfo is not None:
+            self.instrumentsInfo = instrumentsInfo
+        if marketsInfo is not None:
+            self.marketsInfo = marketsInfo
+
+    @property
+    def instrumentsInfo(self) -> Dict[str, Any]:
+        if isinstance(self._instrumentsInfo, futures.Future):
+            self._instrumentsInfo = self._instrumentsInfo.result()
+        return self._instrumentsInfo
+
+    @instrumentsInfo.setter
+    def instrumentsInfo(self, value: Dict[str, Any]):
+        self._instrumentsInfo = value
+
+    @property
+    def marketsInfo(self) -> Dict[str, Any]:
+        if isinstance(self._marketsInfo, futures.Future):
+            self._marketsInfo = self._marketsInfo.result()
+        return self._marketsInfo
+
+    @marketsInfo.setter
+    def marketsInfo(self, value: Dict[str, Any]):
+        self._marketsInfo = value
+
+    def _chainId(self, signer: MessageSigner, chainId: int = None) -> int:
+        if isinstance(signer, AlgorandMessageSigner):
+            return self.Constants.ALGORAND_CHAIN_ID
+        elif isinstance(signer, EVMMessageSigner):
+            return self.Constants.ETH_CHAIN_ID
+        return chainId
+
+    def _check_token_store(self, signer: MessageSigner, token_store: TokenStore):
+        # NOTE: The store of another signer would log this one in as its owner
+        if token_store is not None and token_store.address != signer.address():
+            raise ValueError(
+                f"Token store of {token_store.address} used for {signer.address()}"
+            )
+
+    def _login(self, signer: MessageSigner, chainId: int) -> Dict[str, Any]:
+        address = signer.address()
+
+        loginStartResponse = self.get(
+            "v1/login/start", {"chainId": chainId, "address": address}
         )
-        self.marketsInfo = (
-            marketsInfo if marketsInfo is not None else self._getMarkets()
+        nonce = loginStartResponse["nonce"]
+
+        loginData = LoginSignatureRequest(op=RequestOperation.Login, nonce=nonce)
+        loginDataEncoded = encode_user_operation(loginData)
+        signature = signer.sign_message(loginDataEncoded)
+
+        return self.post(
+            "v1/login/complete",
+            {"chainId": chainId, "address": address, "signature": signature},
         )
 
     def login(
@@ -33,36 +104,55 @@ class C3Exchange(ApiClient):
         chainId: int = None,
         primaryAccountId: str = None,
         primaryAccountAddress: str = None,
+        token_store: TokenStore = None,
+        refresh_margin: float = 60,
+        session: "requests.Session" = None,
+        validator: OrderValidator = None,
+        thread_safe: bool = False,
+        validate: bool = False,
     ) -> Account:
         """Auth to C3 Exchange
 
         Args:
             signer (MessageSigner): eth_account or algosdk account
             chainId (int, optional): Womrhole chain id.
+            token_store (TokenStore, optional): Reuses the token of a previous
+                login while it is valid, and stores the token of a new one.
+                Must be a store of the signer.
+            refresh_margin (float, optional): Stored tokens expiring within
+                this many seconds are not reused.
+            session (requests.Session, optional): Session the account sends its
+                requests with, e.g. one shared by many accounts.
+            validator (OrderValidator, optional): Pre-trade checks run before
+                every order is signed.
+            thread_safe (bool, optional): Give every thread using the account
+                its own session, see Account.
+            validate (bool, optional): Check orders against the exchange
+                metadata before signing them, when no validator is given.
+                Off by default, invalid orders are then rejected by the
+                exchange.
 
         Returns:
             Account: C3 Account Client
         """
-        if isinstance(signer, AlgorandMessageSigner):
-            chainId = self.Constants.ALGORAND_CHAIN_ID
-        elif isinstance(signer, EVMMessageSigner):
-            chainId = self.Constants.ETH_CHAIN_ID
+        chainId = self._chainId(signer, chainId)
+        self._check_token_store(signer, token_store)
 
-        address = signer.address()
-
-        loginStartResponse = self.get(
-            "v1/login/start", {"chainId": chainId, "address": address}
+        loginCompleteResponse = (
+            token_store.load(self.base_url, chainId, min_ttl=refresh_margin)
+            if token_store is not None
+            else None
         )
-        nonce = loginStartResponse["nonce"]
+        if loginCompleteResponse is None:
+            loginCompleteResponse = self._login(signer, chainId)
+            if token_store is not None:
+                token_store.save(
+                    self.base_url,
+                    chainId,
+                    loginCompleteResponse["accountId"],
+                    loginCompleteResponse["token"],
+                )
 
-        loginData = LoginSignatureRequest(op=RequestOperation.Login, nonce=nonce)
-        loginDataEncoded = encode_user_operation(loginData)
-        signature = signer.sign_message(loginDataEncoded)
-
-        loginCompleteResponse = self.post(
-            "v1/login/complete",
-            {"chainId": chainId, "address": address, "signature": signature},
-        )
         # to-do also pass the base64address of the primary account for signing operations
         if primaryAccountId and primaryAccountAddress:
             accountId = primaryAccountId
@@ -80,8 +170,32 @@ class C3Exchange(ApiClient):
             base_url=self.base_url,
             constants=self.Constants,
             primaryAccountAddress=primaryAccountAddress,
+            validator=validator,
+            session=session,
+            thread_safe=thread_safe,
+            validate=validate,
         )
 
+    def refreshLogin(self, account: Account, token_store: TokenStore = None):
+        """Logs the account's signer in again and switches the account to the new token."""
+        chainId = self._chainId(account.signer)
+        self._check_token_store(account.signer, token_store)
+        loginCompleteResponse = self._login(account.signer, chainId)
+        token = loginCompleteResponse["token"]
+        if token_store is not None:
+            token_store.save(
+                self.base_url, chainId, loginCompleteResponse["accountId"], token
+            )
+
+        account.setApiToken(token)
+        return token
+
+    def keepLoggedIn(
+        self, account: Account, token_store: TokenStore = None, margin: float = 60
+    ) -> TokenRefresher:
+        """Refreshes the account's token `margin` seconds before it expires, until stopped."""
+        return TokenRefresher(self, account, token_store, margin).start()
+
     def _getInstruments(self) -> Dict[str, Any]:
         instrumentsResponse = self.get("v1/instruments")
         instrumentsDict = {
@@ -0,0 +1,236 @@
+import calendar
+import glob
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from c3.marketdata import (
+    BOOK_DELTA_FIELDS,
+    LEVEL1_FIELDS,
+    TRADE_FIELDS,
+    book_delta_rows,
+    level1_row,
+    market_of,
+    trade_rows,
+)
+from c3.websocket import WebSocketClient, WebSocketClientEvent
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+LEVEL1 = "level1"
+BOOK_DELTA = "bookDelta"
+TRADES = "trades"
+
+KIND_FIELDS = {
+    LEVEL1: LEVEL1_FIELDS,
+    BOOK_DELTA: BOOK_DELTA_FIELDS,
+    TRADES: TRADE_FIELDS,
+}
+
+DEFAULT_CHUNK_ROWS = 65536
+DEFAULT_ROTATE_SECONDS = 3600
+
+WINDOW_FORMAT = "%Y%m%dT%H%M%S"
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "Columnar capture needs numpy, install it with `pip install numpy`"
+        )
+
+
+class ColumnBuffer:
+    """Preallocated structured array of one partition, written out as .npy chunks.
+
+    Args:
+        directory: Partition directory, chunks are named chunk-000000.npy, ...
+        dtype: Row dtype.
+        chunk_rows: Rows per chunk file.
+    """
+
+    def __init__(self, directory: str, dtype, chunk_rows: int) -> None:
+        self.directory = directory
+        self.rows = np.empty(chunk_rows, dtype=dtype)
+        self.size = 0
+        # NOTE: An out of order event can reopen a window that already has chunks
+        self.chunks = len(glob.glob(os.path.join(directory, "chunk-*.npy")))
+
+    def append(self, row: Tuple):
+        self.rows[self.size] = row
+        self.size += 1
+        if self.size == len(self.rows):
+            self.flush()
+
+    def extend(self, rows: List[Tuple]):
+        # NOTE: One slice assignment converts a whole batch, far faster than row by row
+        while rows:
+            space = len(self.rows) - self.size
+            batch, rows = rows[:space], rows[space:]
+            start, end = self.size, self.size + len(batch)
+            self.rows[start:end] = batch
+            self.size = end
+            if self.size == len(self.rows):
+                self.flush()
+
+    def flush(self) -> Optional[str]:
+        if self.size == 0:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"chunk-{self.chunks:06d}.npy")
+        # NOTE: Write to a temporary name so readers never map a partial chunk
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, self.rows[: self.size])
+        os.replace(tmp_path, path)
+        self.chunks += 1
+        self.size = 0
+        return path
+
+
+class ColumnarCapture:
+    """Captures level1, bookDelta and trades events into typed columns.
+
+    Rows are partitioned by kind, market and time window:
+    `{directory}/{kind}/{market}/{window start}/chunk-NNNNNN.npy`. Windows
+    are `rotate_seconds` long and use the event timestamps.
+
+    Args:
+        directory: Root directory of the capture.
+        chunk_rows: Rows buffered per partition before a chunk is written.
+        rotate_seconds: Length of a time partition.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        rotate_seconds: int = DEFAULT_ROTATE_SECONDS,
+    ) -> None:
+        _require_numpy()
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.rotate_ms = rotate_seconds * 1000
+        self.dtypes = {kind: np.dtype(fields) for kind, fields in KIND_FIELDS.items()}
+
+        # (kind, market) -> (window, buffer)
+        self.buffers: Dict[Tuple[str, str], Tuple[int, ColumnBuffer]] = {}
+        self.rows = 0
+        self.chunks: List[str] = []
+
+    def attach(self, client: WebSocketClient):
+        """Registers the capture as listener of a websocket client."""
+
+        async def on_level1(data):
+            self.on_level1(data)
+
+        async def on_book_delta(data):
+            self.on_book_delta(data)
+
+        async def on_trades(data):
+            self.on_trades(data)
+
+        client.on(WebSocketClientEvent.Level1, on_level1)
+        client.on(WebSocketClientEvent.bookDelta, on_book_delta)
+        client.on(WebSocketClientEvent.Trades, on_trades)
+
+    def on_level1(self, data: Dict[str, Any]):
+        row = level1_row(data)
+        self.rows += 1
+        self._buffer(LEVEL1, data["marketId"], row[0]).append(row)
+
+    def on_book_delta(self, data: Dict[str, Any]):
+        rows = list(book_delta_rows(data))
+        self._buffer(BOOK_DELTA, data["marketId"], data["timestamp"]).extend(rows)
+        self.rows += len(rows)
+
+    def on_trades(self, data: List[Dict[str, Any]]):
+        if not data:
+            return
+        market = market_of(data)
+        for row in trade_rows(data):
+            self._buffer(TRADES, market, row[0]).append(row)
+            self.rows += 1
+
+    def _buffer(self, kind: str, market: str, timestamp: int) -> ColumnBuffer:
+        window = timestamp - timestamp % self.rotate_ms
+        key = (kind, market)
+        current = self.buffers.get(key)
+        if current is not None and current[0] == window:
+            return current[1]
+
+        if current is not None:
+            self._flush(current[1])
+        buffer = ColumnBuffer(
+            partition_path(self.directory, kind, market, window),
+            self.dtypes[kind],
+            self.chunk_rows,
+        )
+        self.buffers[key] = (window, buffer)
+        return buffer
+
+    def _flush(self, buffer: ColumnBuffer):
+        path = buffer.flush()
+        if path is not None:
+            self.chunks.append(path)
+
+    def flush(self):
+        """Writes every partially filled buffer as a chunk."""
+        for _, buffer in self.buffers.values():
+            self._flush(buffer)
+
+    def close(self):
+        self.flush()
+        self.buffers.clear()
+
+
+def partition_path(directory: str, kind: str, market: str, window_ms: int) -> str:
+    window = time.strftime(WINDOW_FORMAT, time.gmtime(window_ms // 1000))
+    return os.path.join(directory, kind, market, window)
+
+
+def chunk_paths(
+    directory: str, kind: str, market: str, end_ms: int = None
+) -> List[str]:
+    """Chunk files of a market in time order, skipping windows that start at or
+    after `end_ms`."""
+    paths = []
+    for partition in sorted(glob.glob(os.path.join(directory, kind, market, "*"))):
+        window = time.strptime(os.path.basename(partition), WINDOW_FORMAT)
+        if end_ms is not None and calendar.timegm(window) * 1000 >= end_ms:
+            continue
+        paths.extend(sorted(glob.glob(os.path.join(partition, "chunk-*.npy"))))
+    return paths
+
+
+def load_chunks(paths: Iterable[str]) -> List[Any]:
+    """Memory maps the chunks, nothing is read until the columns are used."""
+    _require_numpy()
+    return [np.load(path, mmap_mode="r") for path in paths]
+
+
+def load(
+    directory: str,
+    kind: str,
+    market: str,
+    start_ms: int = None,
+    end_ms: int = None,
+):
+    """Loads the captured rows of a market as one structured array."""
+    _require_numpy()
+    chunks = load_chunks(chunk_paths(directory, kind, market, end_ms))
+    if not chunks:
+        return np.empty(0, dtype=KIND_FIELDS[kind])
+    rows = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+    if start_ms is not None or end_ms is not None:
+        timestamps = rows["timestamp"]
+        mask = np.ones(len(rows), dtype=bool)
+        if start_ms is not None:
+            mask &= timestamps >= start_ms
+        if end_ms is not None:
+            mask &= timestamps < end_ms
+        rows = rows[mask]
+    return rows
@@ -0,0 +1,428 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from c3.account import Account
+from c3.signing.encode import encode_user_operation_base
+from c3.signing.signers import MessageSigner
+from c3.signing.types import DelegateSignatureRequest, RequestOperation
+
+DEFAULT_LIFETIME = 86400
+DEFAULT_RENEW_BEFORE = 3600
+# Keys this close to their delegation expiry take no new orders
+DEFAULT_MARGIN = 60
+# Nonce streams per millisecond, the most keys a pool can have is one less
+NONCE_STRIDE = 64
+
+# Account of the delegated key in a signing worker process
+_worker_account: Optional[Account] = None
+
+
+class _NonceStreams:
+    """Nonce streams of the delegated keys of one account in this process.
+
+    Stream r holds the nonces equal to r modulo NONCE_STRIDE, and is used by
+    one live key at a time. A key taking a stream another key released
+    starts above the last nonce of that key.
+    """
+
+    def __init__(self) -> None:
+        self.free = list(range(1, NONCE_STRIDE))
+        # stream -> first millisecond slot its previous key did not use
+        self.next_slot: Dict[int, int] = {}
+
+
+_streams: Dict[str, _NonceStreams] = {}
+_streams_lock = threading.Lock()
+
+
+def _take_streams(accountId: str, count: int) -> List[Tuple[int, int]]:
+    """Takes `count` free streams of the account, with the first nonce of each."""
+    now = int(round(time.time() * 1000))
+    with _streams_lock:
+        streams = _streams.setdefault(accountId, _NonceStreams())
+        if count > len(streams.free):
+            raise ValueError(
+                f"{len(streams.free)} more delegated keys can sign for {accountId}"
+            )
+        taken = [streams.free.pop(0) for _ in range(count)]
+        return [
+            (stream, max(now, streams.next_slot.get(stream, 0)) * NONCE_STRIDE + stream)
+            for stream in taken
+        ]
+
+
+def _release_stream(accountId: str, stream: int, next_nonce: int):
+    with _streams_lock:
+        streams = _streams[accountId]
+        streams.next_slot[stream] = next_nonce // NONCE_STRIDE
+        streams.free.append(stream)
+        streams.free.sort()
+
+
+def _init_signing_worker(
+    signer, instrumentsInfo, marketsInfo, accountId, base_url, constants, base64address
+):
+    global _worker_account
+    _worker_account = Account(
+        signer=signer,
+        instrumentsInfo=instrumentsInfo,
+        marketsInfo=marketsInfo,
+        accountId=accountId,
+        base_url=base_url,
+        constants=constants,
+    )
+    _worker_account.base64address = base64address
+    # Orders were validated by the pool before they were sent here
+    _worker_account.validator = None
+
+
+def _sign_orders(orders: List[Tuple[Dict[str, Any], int]]) -> List[Any]:
+    payloads = []
+    for orderParams, nonce in orders:
+        try:
+            payloads.append(_worker_account.prepareOrder(orderParams, nonce=nonce))
+        except Exception as e:
+            # NOTE: Not every exception pickles, the message is enough here
+            payloads.append(RuntimeError(f"{e!r}"))
+    return payloads
+
+
+class DelegateKey:
+    """One delegated signing key of a DelegatePool.
+
+    Every key signs and posts with its own Account, sharing the token and
+    metadata of the primary account, and takes nonces from its own
+    stream: start, start + step, start + 2 * step, ... The streams of the
+    live keys of an account are disjoint, so keys never wait on each other
+    for a nonce and never reuse one.
+    """
+
+    __slots__ = (
+        "index",
+        "stream",
+        "account",
+        "delegation",
+        "expiration",
+        "signed",
+        "process",
+        "_next_nonce",
+        "_step",
+        "_lock",
+    )
+
+    def __init__(
+        self, index: int, stream: int, account: Account, first_nonce: int, step: int
+    ):
+        self.index = index
+        self.stream = stream
+        self.account = account
+        self.delegation: Optional[Dict[str, Any]] = None
+        self.expiration = 0
+        self.signed = 0
+        self.process: Optional[ProcessPoolExecutor] = None
+        self._next_nonce = first_nonce
+        self._step = step
+        self._lock = threading.Lock()
+
+    @property
+    def address(self) -> str:
+        return self.account.address
+
+    def countSigned(self, count: int):
+        with self._lock:
+            self.signed += count
+
+    def reserveNonces(self, count: int) -> range:
+        with self._lock:
+            start = self._next_nonce
+            self._next_nonce += count * self._step
+        return range(start, start + count * self._step, self._step)
+
+    def nextNonce(self) -> int:
+        with self._lock:
+            return self._next_nonce
+
+
+class DelegatePool:
+    """Spreads the orders of one account over several delegated signing keys.
+
+    The primary account's signer signs a DelegateSignatureRequest for every
+    key, which `register` hands to the exchange. Orders are then signed by
+    the keys in round robin, and batches are signed on all keys in parallel.
+    Encoding an order is mostly Python, so for signing to actually run in
+    parallel each key needs its own worker process (`processes=True`).
+    Keys are renewed `renew_before` seconds ahead of their expiry, and stop
+    taking orders when they are about to expire. Order expiries are capped
+    at the delegation expiry.
+
+    Args:
+        account: Logged in primary account, its signer grants the delegations.
+        signers: Delegated signing keys.
+        lifetime: Seconds a delegation is valid for.
+        renew_before: Seconds before expiry that `renew` renews a key.
+        margin: Seconds before expiry a key stops signing orders.
+        register: Called with every signed delegation, should submit it to
+            the exchange. Delegations are only kept in `delegations` if None.
+        max_workers: Signing threads, one per key by default.
+        processes: Sign the batches of every key in a worker process.
+    """
+
+    def __init__(
+        self,
+        account: Account,
+        signers: List[MessageSigner],
+        lifetime: int = DEFAULT_LIFETIME,
+        renew_before: int = DEFAULT_RENEW_BEFORE,
+        margin: int = DEFAULT_MARGIN,
+        register: Callable[[Dict[str, Any]], Any] = None,
+        max_workers: int = None,
+        processes: bool = False,
+    ) -> None:
+        if not signers:
+            raise ValueError("A delegate pool needs at least one signer")
+        if len(signers) >= NONCE_STRIDE:
+            raise ValueError(
+                f"A delegate pool takes at most {NONCE_STRIDE - 1} signers"
+            )
+        self.account = account
+        self.lifetime = lifetime
+        self.renew_before = renew_before
+        self.margin = margin
+        self.register = register
+        self.processes = processes
+        self.executor = ThreadPoolExecutor(
+            max_workers or len(signers), thread_name_prefix="c3-delegates"
+        )
+
+        # NOTE: Every key takes a stream of nonces equal to its stream
+        # number modulo NONCE_STRIDE, above the millisecond timestamps the
+        # primary account uses itself. Streams are shared by all the pools of
+        # the account in this process and given back by close, so pools of
+        # any size, made at any time, never reuse each other's nonces.
+        streams = _take_streams(account.accountId, len(signers))
+        self.keys = [
+            DelegateKey(
+                i, stream, self._delegateAccount(signer), first_nonce, NONCE_STRIDE
+            )
+            for i, (signer, (stream, first_nonce)) in enumerate(zip(signers, streams))
+        ]
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+        try:
+            self.renew()
+        except Exception:
+            self.close()
+            raise
+
+    def _delegateAccount(self, signer: MessageSigner) -> Account:
+        account = self.account
+        delegateAccount = Account(
+            signer=signer,
+            instrumentsInfo=account.instrumentsInfo,
+            marketsInfo=account.marketsInfo,
+            accountId=account.accountId,
+            apiToken=account.apiToken,
+            base_url=account.base_url,
+            constants=account.Constants,
+            tracer=account.tracer,
+            validator=account.validator,
+            # NOTE: Keys post from the pool's threads, each on its own session
+            thread_safe=True,
+        )
+        # Orders are for the primary account, token refreshes apply to all keys
+        delegateAccount.base64address = account.base64address
+        delegateAccount.headers = account.headers
+        delegateAccount.serializer = account.serializer
+        delegateAccount.gzip_threshold = account.gzip_threshold
+        # NOTE: Orders are validated once by the pool, see _params
+        delegateAccount.validator = None
+        return delegateAccount
+
+    def _signing_process(self, key: DelegateKey) -> ProcessPoolExecutor:
+        if key.process is None:
+            account = self.account
+            key.process = ProcessPoolExecutor(
+                1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_signing_worker,
+                initargs=(
+                    key.account.signer,
+                    account.instrumentsInfo,
+                    account.marketsInfo,
+                    account.accountId,
+                    account.base_url,
+                    account.Constants,
+                    account.base64address,
+                ),
+            )
+        return key.process
+
+    def delegate(self, key: DelegateKey, now: int = None) -> Dict[str, Any]:
+        """Signs a new delegation of a key with the primary signer."""
+        creation = int(time.time()) if now is None else now
+        expiration = creation + self.lifetime
+        request = DelegateSignatureRequest(
+            op=RequestOperation.Delegate,
+            account=self.account.base64address,
+            delegate=key.account.signer.base64address(),
+            creation=creation,
+            expiration=expiration,
+        )
+        # NOTE: A delegation is signed as the bare operation, without the
+        # lease header of the other requests
+        signature = self.account.signer.sign_message(
+            encode_user_operation_base(request)
+        )
+        delegation = {
+            "delegate": key.address,
+            "creation": creation,
+            "expiration": expiration,
+            "creator": self.account.address,
+            "signature": signature,
+        }
+        if self.register is not None:
+            self.register(delegation)
+
+        key.delegation = delegation
+        key.expiration = expiration
+        return delegation
+
+    def renew(self, now: int = None) -> List[Dict[str, Any]]:
+        """Delegates again every key that expires within renew_before.
+
+        Returns:
+            List[Dict[str, Any]]: The new delegations.
+        """
+        now = int(time.time()) if now is None else now
+        return [
+            self.delegate(key, now)
+            for key in self.keys
+            if key.expiration - now <= self.renew_before
+        ]
+
+    def delegations(self) -> List[Dict[str, Any]]:
+        return [key.delegation for key in self.keys]
+
+    def active_keys(self, now: float = None) -> List[DelegateKey]:
+        now = time.time() if now is None else now
+        return [key for key in self.keys if key.expiration - now > self.margin]
+
+    def _next_key(self) -> DelegateKey:
+        keys = self.active_keys()
+        if not keys:
+            raise RuntimeError("Every delegated key is expired, renew the pool")
+        with self._lock:
+            key = keys[self._cursor % len(keys)]
+            self._cursor += 1
+        return key
+
+    def _params(self, key: DelegateKey, orderParams: Dict[str, Any]):
+        if self.account.validator is not None:
+            self.account.validator.validate(orderParams)
+        expiresOn = min(
+            orderParams.get("expiresOn", int(time.time()) + 86400), key.expiration
+        )
+        return {**orderParams, "expiresOn": expiresOn}, key.reserveNonces(1).start
+
+    def _prepare(self, key: DelegateKey, orderParams: Dict[str, Any]):
+        orderParams, nonce = self._params(key, orderParams)
+        payload = key.account.prepareOrder(orderParams, nonce=nonce)
+        key.countSigned(1)
+        return payload
+
+    def _sign(self, key: DelegateKey, orders: List[Tuple[Dict[str, Any], int]]):
+        if self.processes:
+            payloads = self._signing_process(key).submit(_sign_orders, orders).result()
+        else:
+            payloads = []
+            for orderParams, nonce in orders:
+                try:
+                    payloads.append(key.account.prepareOrder(orderParams, nonce=nonce))
+                except Exception as e:
+                    payloads.append(e)
+        key.countSigned(sum(not isinstance(p, Exception) for p in payloads))
+        return payloads
+
+    def prepareOrder(self, orderParams: Dict[str, Any]) -> Dict[str, Any]:
+        return self._prepare(self._next_key(), orderParams)
+
+    def submitOrder(self, orderParams: Dict[str, Any]):
+        return self.account.postOrder(self.prepareOrder(orderParams))
+
+    def _run_batch(self, orders: List[Dict[str, Any]], post: bool) -> List[Any]:
+        keys = self.active_keys()
+        if not keys:
+            raise RuntimeError("Every delegated key is expired, renew the pool")
+
+        def work(key: DelegateKey, indexes: List[int]):
+            results: Dict[int, Any] = {}
+            orders_of_key = []
+            for index in indexes:
+                try:
+                    orders_of_key.append((index, self._params(key, orders[index])))
+                except Exception as e:
+                    results[index] = e
+
+            payloads = self._sign(key, [params for _, params in orders_of_key])
+            for (index, _), payload in zip(orders_of_key, payloads):
+                if post and not isinstance(payload, Exception):
+                    try:
+                        payload = key.account.postOrder(payload)
+                    except Exception as e:
+                        payload = e
+                results[index] = payload
+            return results
+
+        # Each key signs its share of the batch in order, keys run in parallel
+        shares = [list(range(i, len(orders), len(keys))) for i in range(len(keys))]
+        futures = [
+            self.executor.submit(work, key, indexes)
+            for key, indexes in zip(keys, shares)
+            if indexes
+        ]
+        results: List[Any] = [None] * len(orders)
+        for future in futures:
+            for index, value in future.result().items():
+                results[index] = value
+        return results
+
+    def prepareOrders(self, orders: List[Dict[str, Any]]) -> List[Any]:
+        """Signs a batch on all active keys in parallel.
+
+        Returns:
+            List[Any]: Payload, or the exception raised, of every order.
+        """
+        return self._run_batch(orders, post=False)
+
+    def submitOrders(self, orders: List[Dict[str, Any]]) -> List[Any]:
+        """Signs and sends a batch on all active keys in parallel.
+
+        Returns:
+            List[Any]: Response, or the exception raised, of every order.
+        """
+        return self._run_batch(orders, post=True)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "delegate": key.address,
+                "signed": key.signed,
+                "expiration": key.expiration,
+            }
+            for key in self.keys
+        ]
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for key in self.keys:
+            key.account.close()
+            if key.process is not None:
+                key.process.shutdown(wait=True)
+                key.process = None
+            if key.stream is not None:
+                _release_stream(self.account.accountId, key.stream, key.nextNonce())
+                key.stream = None
@@ -0,0 +1,386 @@
+"""Local SQLite copy of an account's orders and fills.
+
+    store = FillsStore("fills.sqlite", account)
+    store.sync()             # only what was added since the last sync
+    store.attach(ws_client)  # then follow the websocket
+    store.trades(marketId="ETH-USDC", since=start_ms)
+
+Trades are append only and keyed by id, so records seen both by a sync and
+on the websocket are stored once. Orders keep the last state received, with
+filledSize never lowered and raised to the sum of their stored fills.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from c3.account import Account
+from c3.history import HistoryCursor
+from c3.utils.serialization import json_loads
+from c3.websocket import WebSocketClient, WebSocketClientEvent
+
+logger = logging.getLogger("fills-store")
+
+DEFAULT_SYNC_PAGE_SIZE = 500
+
+ORDERS = "orders"
+TRADES = "trades"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    marketId TEXT NOT NULL,
+    status TEXT,
+    createdOn INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_market_time ON orders (marketId, createdOn);
+CREATE INDEX IF NOT EXISTS orders_time ON orders (createdOn);
+CREATE INDEX IF NOT EXISTS orders_status ON orders (status);
+
+CREATE TABLE IF NOT EXISTS trades (
+    id TEXT PRIMARY KEY,
+    orderId TEXT,
+    marketId TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trades_market_time ON trades (marketId, timestamp);
+CREATE INDEX IF NOT EXISTS trades_time ON trades (timestamp);
+CREATE INDEX IF NOT EXISTS trades_order ON trades (orderId);
+
+CREATE TABLE IF NOT EXISTS checkpoints (
+    stream TEXT PRIMARY KEY,
+    since INTEGER,
+    offset INTEGER NOT NULL
+);
+"""
+
+
+class FillsStore:
+    """Orders and fills of one account in SQLite, synced incrementally.
+
+    `sync` pages through the history endpoints from the last checkpoint and
+    commits every page together with the new checkpoint, so an interrupted
+    sync resumes where it stopped. `attach` applies openOrders, cancels and
+    trades events of a websocket as they arrive, in order, on a writer
+    thread so commits never block the event loop. The connection is shared
+    between threads behind a lock.
+
+    Args:
+        path: Database file, ":memory:" for a temporary store.
+        account: Logged in account whose history is stored.
+    """
+
+    def __init__(self, path: str, account: Account) -> None:
+        self.path = path
+        self.account = account
+        self.account_id = account.accountId
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            # NOTE: Readers in other connections do not block the writer
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        # Websocket events are written here, one at a time and in order
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="c3-fills-store")
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        with self._lock:
+            self.db.close()
+
+    def _write(self, apply, data):
+        def log_error(future):
+            if future.exception() is not None:
+                logger.error(f"Could not store {data!r}: {future.exception()!r}")
+
+        self._writer.submit(apply, data).add_done_callback(log_error)
+
+    def flush(self):
+        """Waits until the websocket events received so far are stored."""
+        self._writer.submit(lambda: None).result()
+
+    # Writes
+
+    def _put_orders(self, orders: Iterable[Dict[str, Any]]):
+        orders = list(orders)
+        if not orders:
+            return
+
+        # NOTE: An event or page may be older than the fills already stored,
+        # the filledSize stored (and the status it implies) is kept then
+        placeholders = ",".join("?" * len(orders))
+        rows = self.db.execute(
+            f"SELECT data FROM orders WHERE id IN ({placeholders})",
+            [o["id"] for o in orders],
+        ).fetchall()
+        stored = {}
+        for (data,) in rows:
+            order = json_loads(data)
+            stored[order["id"]] = Decimal(order.get("filledSize", "0"))
+
+        merged = []
+        for o in orders:
+            filled_size = stored.get(o["id"], Decimal(0))
+            if filled_size > Decimal(o.get("filledSize", "0")):
+                o = {**o, "filledSize": str(filled_size)}
+                if filled_size >= Decimal(o["size"]):
+                    o["status"] = "filled"
+            merged.append(o)
+
+        self.db.executemany(
+            "INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?, ?)",
+            [
+                (o["id"], o["marketId"], o.get("status"), o["createdOn"], json.dumps(o))
+                for o in merged
+            ],
+        )
+
+    def _put_trades(self, trades: Iterable[Dict[str, Any]]) -> int:
+        cursor = self.db.executemany(
+            "INSERT OR IGNORE INTO trades VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    t["id"],
+                    t.get("orderId"),
+                    t["marketId"],
+                    t["timestamp"],
+                    json.dumps(t),
+                )
+                for t in trades
+            ],
+        )
+        return cursor.rowcount
+
+    def _put_checkpoint(self, stream: str, cursor: HistoryCursor):
+        self.db.execute(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)",
+            (stream, cursor.since, cursor.offset),
+        )
+
+    def checkpoint(self, stream: str) -> HistoryCursor:
+        """Where the next sync of ORDERS or TRADES starts."""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT since, offset FROM checkpoints WHERE stream = ?", (stream,)
+            ).fetchone()
+        return HistoryCursor(*row) if row is not None else HistoryCursor()
+
+    def _sync_stream(self, stream: str, page_size: int) -> int:
+        if stream == ORDERS:
+            pager = self.account.orderHistory(
+                pageSize=page_size, cursor=self.checkpoint(stream)
+            )
+            put = self._put_orders
+        else:
+            pager = self.account.tradeHistory(
+                pageSize=page_size, cursor=self.checkpoint(stream)
+            )
+            put = self._put_fills
+
+        count = 0
+        batch: List[Dict[str, Any]] = []
+        for record in pager:
+            batch.append(record)
+            if len(batch) == page_size:
+                self._commit(stream, put, batch, pager.cursor)
+                count += len(batch)
+                batch = []
+        if batch:
+            self._commit(stream, put, batch, pager.cursor)
+            count += len(batch)
+        return count
+
+    def _commit(self, stream, put, batch, cursor: HistoryCursor):
+        # NOTE: Records and checkpoint go in one transaction, a crash loses neither
+        with self._lock, self.db:
+            put(batch)
+            self._put_checkpoint(stream, cursor)
+
+    def _refresh_open_orders(self, page_size: int) -> int:
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT id, createdOn FROM orders WHERE status = 'open'"
+            ).fetchall()
+        stale = dict(rows)
+        if not stale:
+            return 0
+
+        # NOTE: The orders stream only returns orders created after its
+        # checkpoint, so the current state of the stored open ones, which
+        # may have been cancelled or expired meanwhile, is fetched again
+        pager = self.account.orderHistory(pageSize=page_size, since=min(stale.values()))
+        refreshed = []
+        for record in pager:
+            if stale.pop(record["id"], None) is not None:
+                refreshed.append(record)
+            if not stale:
+                break
+
+        with self._lock, self.db:
+            self._put_orders(refreshed)
+        return len(refreshed)
+
+    def sync(self, page_size: int = DEFAULT_SYNC_PAGE_SIZE) -> Dict[str, int]:
+        """Fetches the orders and trades added since the last sync.
+
+        Stored orders that are still open are fetched again first, as
+        their later changes are only seen by the orders stream through
+        `attach`.
+
+        Returns:
+            Dict[str, int]: Records fetched, by stream.
+        """
+        self._refresh_open_orders(page_size)
+        return {
+            ORDERS: self._sync_stream(ORDERS, page_size),
+            TRADES: self._sync_stream(TRADES, page_size),
+        }
+
+    def on_open_orders(self, orders: List[Dict[str, Any]]):
+        with self._lock, self.db:
+            self._put_orders(orders)
+
+    def on_cancels(self, order_ids: List[str]):
+        with self._lock, self.db:
+            self._update_orders(order_ids, lambda order: {"status": "cancelled"})
+
+    def _put_fills(self, trades: List[Dict[str, Any]]):
+        self._put_trades(trades)
+        order_ids = list({t["orderId"] for t in trades if t.get("orderId")})
+        if not order_ids:
+            return
+
+        # NOTE: Totals come from the stored fills, one row per trade id, so a
+        # fill replayed by a sync or the websocket never counts twice
+        placeholders = ",".join("?" * len(order_ids))
+        rows = self.db.execute(
+            f"SELECT data FROM trades WHERE orderId IN ({placeholders})", order_ids
+        ).fetchall()
+        sizes = {order_id: Decimal(0) for order_id in order_ids}
+        for (data,) in rows:
+            trade = json_loads(data)
+            sizes[trade["orderId"]] += Decimal(trade["size"])
+
+        def filled(order):
+            # The order's own filledSize may count fills older than the store
+            filled_size = max(Decimal(order.get("filledSize", "0")), sizes[order["id"]])
+            status = "filled" if filled_size >= Decimal(order["size"]) else None
+            return {"filledSize": str(filled_size), "status": status}
+
+        self._update_orders(order_ids, filled)
+
+    def on_trades(self, trades: List[Dict[str, Any]]):
+        # Trades events of subscribed markets carry no order, only fills are kept
+        fills = [
+            trade
+            for trade in trades
+            if "orderId" in trade
+            if trade.get("accountId", self.account_id) == self.account_id
+        ]
+        if not fills:
+            return
+        with self._lock, self.db:
+            self._put_fills(fills)
+
+    def _update_orders(self, order_ids: List[str], change):
+        placeholders = ",".join("?" * len(order_ids))
+        rows = self.db.execute(
+            f"SELECT data FROM orders WHERE id IN ({placeholders})", order_ids
+        ).fetchall()
+        updated = []
+        for (data,) in rows:
+            order = json_loads(data)
+            for key, value in change(order).items():
+                if value is not None:
+                    order[key] = value
+            updated.append(order)
+        self._put_orders(updated)
+
+    def attach(self, client: WebSocketClient):
+        """Applies the account's websocket order events to the store."""
+
+        async def on_open_orders(data):
+            self._write(self.on_open_orders, data)
+
+        async def on_cancels(data):
+            self._write(self.on_cancels, data)
+
+        async def on_trades(data):
+            self._write(self.on_trades, data)
+
+        client.on(WebSocketClientEvent.OpenOrders, on_open_orders)
+        client.on(WebSocketClientEvent.Cancels, on_cancels)
+        client.on(WebSocketClientEvent.Trades, on_trades)
+
+    # Queries
+
+    def _query(
+        self,
+        table: str,
+        time_column: str,
+        marketId: Optional[str],
+        since: Optional[int],
+        until: Optional[int],
+        limit: Optional[int],
+        extra: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        conditions = []
+        values: List[Any] = []
+        filters = {"marketId": marketId, **extra}
+        for column, value in filters.items():
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                values.append(value)
+        if since is not None:
+            conditions.append(f"{time_column} >= ?")
+            values.append(since)
+        if until is not None:
+            conditions.append(f"{time_column} <= ?")
+            values.append(until)
+
+        sql = f"SELECT data FROM {table}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {time_column}, rowid"
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(limit)
+        with self._lock:
+            rows = self.db.execute(sql, values).fetchall()
+        return [json_loads(data) for (data,) in rows]
+
+    def trades(
+        self,
+        marketId: str = None,
+        since: int = None,
+        until: int = None,
+        orderId: str = None,
+        limit: int = None,
+    ) -> List[Dict[str, Any]]:
+        """Stored fills, oldest first, filtered on the indexed columns."""
+        return self._query(
+            "trades", "timestamp", marketId, since, until, limit, {"orderId": orderId}
+        )
+
+    def orders(
+        self,
+        marketId: str = None,
+        since: int = None,
+        until: int = None,
+        status: str = None,
+        limit: int = None,
+    ) -> List[Dict[str, Any]]:
+        """Stored orders by creation time, oldest first."""
+        return self._query(
+            "orders", "createdOn", marketId, since, until, limit, {"status": status}
+        )
+
+    def count(self, table: str) -> int:
+        with self._lock:
+            return self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
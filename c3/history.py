@@ -0,0 +1,173 @@
+"""Paged history endpoints as iterators that fetch the next page ahead.
+
+    pager = account.tradeHistory(marketId="ETH-USDC")
+    for trade in pager:
+        store(trade)
+    checkpoint = pager.cursor.to_dict()
+
+    # Later, only the trades added since
+    cursor = HistoryCursor.from_dict(checkpoint)
+    for trade in account.tradeHistory(marketId="ETH-USDC", cursor=cursor):
+        store(trade)
+
+History endpoints (ORDER_HISTORY_PATH and TRADE_HISTORY_PATH under the
+account) return records oldest first and take `from`, `to`, `offset` and
+`pageSize` query parameters. At most two pages are held at a time: the one
+being consumed and the one being fetched.
+"""
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from c3.utils.lazy import lazy_import
+
+asyncio = lazy_import("asyncio")
+futures = lazy_import("concurrent.futures")
+
+DEFAULT_PAGE_SIZE = 100
+
+# Paths under v1/accounts/{accountId}, the open orders stay on "orders"
+ORDER_HISTORY_PATH = "orders/history"
+TRADE_HISTORY_PATH = "trades/history"
+
+
+class HistoryCursor:
+    """Position in a history endpoint, just after the last record consumed.
+
+    `since` is the time of that record and `offset` the number of records
+    consumed with exactly that time. Newer records never shift it, so a
+    stored cursor resumes where the previous sync stopped and only returns
+    what was added since. It is only valid with the filters it was made with.
+    """
+
+    __slots__ = ("since", "offset")
+
+    def __init__(self, since: Optional[int] = None, offset: int = 0) -> None:
+        self.since = since
+        self.offset = offset
+
+    def advance(self, timestamp: int):
+        if timestamp == self.since:
+            self.offset += 1
+        else:
+            self.since = timestamp
+            self.offset = 1
+
+    def copy(self) -> "HistoryCursor":
+        return HistoryCursor(self.since, self.offset)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"since": self.since, "offset": self.offset}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HistoryCursor":
+        return cls(data.get("since"), data.get("offset", 0))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, HistoryCursor):
+            return NotImplemented
+        return (self.since, self.offset) == (other.since, other.offset)
+
+    def __repr__(self) -> str:
+        return f"HistoryCursor(since={self.since}, offset={self.offset})"
+
+
+class HistoryPager:
+    """Records of a history endpoint, iterated with `for` or `async for`.
+
+    While the records of a page are consumed the next page is already being
+    fetched, on a worker thread (or the loop's default executor when
+    iterated asynchronously). `cursor` follows the records handed out, and
+    can be passed to a new pager to resume.
+
+    Args:
+        fetch: Sends the request with the given query parameters and
+            returns the response.
+        params: Filters sent with every page request.
+        time_field: Record field holding its time in milliseconds.
+        page_size: Records per request.
+        cursor: Where to start, the beginning of the history if None.
+        prefetch: Fetch the next page while the current one is consumed.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Dict[str, Any]], Any],
+        params: Dict[str, Any],
+        time_field: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: HistoryCursor = None,
+        prefetch: bool = True,
+    ) -> None:
+        self.fetch = fetch
+        self.params = {k: v for k, v in params.items() if v is not None}
+        self.time_field = time_field
+        self.page_size = page_size
+        self.cursor = cursor.copy() if cursor is not None else HistoryCursor()
+        self.prefetch = prefetch
+        self.pages = 0
+
+    def _fetch_page(self, start: HistoryCursor, fetched: int) -> List[Dict[str, Any]]:
+        # NOTE: Pages are offsets from where the iteration started, the cursor
+        # moves while they are consumed
+        params = {
+            **self.params,
+            "offset": start.offset + fetched,
+            "pageSize": self.page_size,
+        }
+        if start.since is not None:
+            params["from"] = start.since
+        response = self.fetch(params)
+        self.pages += 1
+        if isinstance(response, dict):
+            return response.get("data", [])
+        return response
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        start = self.cursor.copy()
+        fetched = 0
+        executor = None
+        if self.prefetch:
+            executor = futures.ThreadPoolExecutor(1, thread_name_prefix="c3-history")
+        try:
+            page = self._fetch_page(start, fetched)
+            while True:
+                fetched += len(page)
+                last = len(page) < self.page_size
+                following = None
+                if not last and executor is not None:
+                    following = executor.submit(self._fetch_page, start, fetched)
+
+                for record in page:
+                    self.cursor.advance(record[self.time_field])
+                    yield record
+
+                if last:
+                    return
+                if following is not None:
+                    page = following.result()
+                else:
+                    page = self._fetch_page(start, fetched)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        start = self.cursor.copy()
+        fetched = 0
+        page = await loop.run_in_executor(None, self._fetch_page, start, fetched)
+        while True:
+            fetched += len(page)
+            last = len(page) < self.page_size
+            following = None
+            if not last and self.prefetch:
+                following = loop.run_in_executor(None, self._fetch_page, start, fetched)
+
+            for record in page:
+                self.cursor.advance(record[self.time_field])
+                yield record
+
+            if last:
+                return
+            if following is None:
+                following = loop.run_in_executor(None, self._fetch_page, start, fetched)
+            page = await following
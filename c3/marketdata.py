@@ -0,0 +1,90 @@
+"""Helpers to turn websocket market data payloads into flat rows.
+
+Prices and sizes arrive as decimal strings. Rows use floats and integer
+millisecond timestamps so they fit fixed width columns.
+"""
+from typing import Any, Dict, Iterator, List, Tuple
+
+SIDE_BID = 0
+SIDE_ASK = 1
+
+_SIDES = {"buy": SIDE_BID, "bid": SIDE_BID, "sell": SIDE_ASK, "ask": SIDE_ASK}
+
+# (name, numpy format) of each row type, in row order
+LEVEL1_FIELDS = [
+    ("timestamp", "<i8"),
+    ("bid_price", "<f8"),
+    ("bid_size", "<f8"),
+    ("ask_price", "<f8"),
+    ("ask_size", "<f8"),
+]
+BOOK_DELTA_FIELDS = [
+    ("timestamp", "<i8"),
+    ("seq", "<i8"),
+    ("side", "u1"),
+    ("price", "<f8"),
+    ("size", "<f8"),
+]
+TRADE_FIELDS = [
+    ("timestamp", "<i8"),
+    ("id", "S40"),
+    ("side", "u1"),
+    ("price", "<f8"),
+    ("size", "<f8"),
+]
+
+Level1Row = Tuple[int, float, float, float, float]
+BookDeltaRow = Tuple[int, int, int, float, float]
+TradeRow = Tuple[int, bytes, int, float, float]
+PriceLevel = Tuple[float, float]
+
+NAN = float("nan")
+
+
+def side_code(side: str) -> int:
+    return _SIDES[side.lower()]
+
+
+def parse_levels(levels: List[List[str]]) -> List[PriceLevel]:
+    """[["1028.21", "0.47"], ...] -> [(1028.21, 0.47), ...]"""
+    return [(float(price), float(size)) for price, size in levels]
+
+
+def _quote(quote: Dict[str, str]) -> PriceLevel:
+    if not quote:
+        return NAN, NAN
+    return float(quote["price"]), float(quote["size"])
+
+
+def level1_row(data: Dict[str, Any]) -> Level1Row:
+    bid_price, bid_size = _quote(data.get("bestBid"))
+    ask_price, ask_size = _quote(data.get("bestAsk"))
+    return data["timestamp"], bid_price, bid_size, ask_price, ask_size
+
+
+def book_delta_rows(data: Dict[str, Any]) -> Iterator[BookDeltaRow]:
+    """One row per changed price level, a size of 0 removes the level."""
+    timestamp = data["timestamp"]
+    seq = data.get("seq", -1)
+    for price, size in data.get("bids", ()):
+        yield timestamp, seq, SIDE_BID, float(price), float(size)
+    for price, size in data.get("asks", ()):
+        yield timestamp, seq, SIDE_ASK, float(price), float(size)
+
+
+def trade_rows(data: List[Dict[str, Any]]) -> Iterator[TradeRow]:
+    for trade in data:
+        yield (
+            trade["timestamp"],
+            str(trade.get("id", "")).encode("utf-8"),
+            side_code(trade["side"]),
+            float(trade["price"]),
+            float(trade["size"]),
+        )
+
+
+def market_of(data: Any) -> str:
+    """Market id of a market data payload, trades come as a list."""
+    if isinstance(data, list):
+        return data[0]["marketId"] if data else None
+    return data.get("marketId")
@@ -0,0 +1,239 @@
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from c3.account import Account
+
+DEFAULT_TTL = 30
+DEFAULT_MARGIN = 5
+
+TicketKey = Tuple[
+    str, str, str, Optional[Decimal], Decimal, Decimal, Decimal, Optional[int]
+]
+
+
+def ticket_key(orderParams: Dict[str, Any]) -> TicketKey:
+    """Everything in orderParams that is part of the signed settlement ticket.
+
+    An order without expiresOn matches the tickets signed with the cache's
+    ttl, one with expiresOn only tickets signed with that same expiry.
+    """
+    price = orderParams.get("price")
+    return (
+        orderParams["marketId"],
+        orderParams["type"],
+        orderParams["side"],
+        Decimal(price).normalize() if price is not None else None,
+        Decimal(orderParams["amount"]).normalize(),
+        Decimal(orderParams.get("maxBorrow", "0")).normalize(),
+        Decimal(orderParams.get("maxRepay", "0")).normalize(),
+        orderParams.get("expiresOn"),
+    )
+
+
+class PresignCache:
+    """Signs orders ahead of time so submitting one is a lookup and a POST.
+
+    Tickets are signed with nonces reserved from the account and a short
+    expiresOn. A ticket that is about to expire, or that `discard` drops
+    when the book moved away, is removed from the cache before its nonce is
+    recycled. Its signature never left the process, so the nonce can sign
+    another ticket. Orders that fail to sign are skipped and reported in
+    `errors`, the rest of the batch is still signed.
+
+    Args:
+        account: Account that signs and sends the orders.
+        ttl: Seconds until a presigned ticket expires on the exchange.
+        margin: Tickets closer than this to expiring are not used.
+        max_tickets: Upper bound on cached tickets, presigning stops there.
+    """
+
+    def __init__(
+        self,
+        account: Account,
+        ttl: int = DEFAULT_TTL,
+        margin: int = DEFAULT_MARGIN,
+        max_tickets: int = 1000,
+    ) -> None:
+        self.account = account
+        self.ttl = ttl
+        self.margin = margin
+        self.max_tickets = max_tickets
+
+        self.tickets: Dict[TicketKey, Dict[str, Any]] = {}
+        self.free_nonces: List[int] = []
+        # Orders of the last presign call that could not be signed
+        self.errors: List[Tuple[Dict[str, Any], Exception]] = []
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.recycled = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return len(self.tickets)
+
+    def _take_nonce(self) -> int:
+        if self.free_nonces:
+            self.recycled += 1
+            return self.free_nonces.pop()
+        return self.account.reserveNonces(1).start
+
+    def presign(self, orders: Iterable[Dict[str, Any]]) -> int:
+        """Signs tickets for orders that are not cached yet.
+
+        Orders with an expiresOn are signed with it, the others expire after
+        the cache's ttl. Orders that fail, e.g. a price off the tick size,
+        are skipped and listed in `errors`.
+
+        Returns:
+            int: Number of new tickets.
+        """
+        expires_on = int(time.time()) + self.ttl
+        signed = 0
+        errors = []
+        for orderParams in orders:
+            key = ticket_key(orderParams)
+            with self._lock:
+                if key in self.tickets or len(self.tickets) >= self.max_tickets:
+                    continue
+                nonce = self._take_nonce()
+
+            try:
+                payload = self.account.prepareOrder(
+                    {"expiresOn": expires_on, **orderParams}, nonce=nonce
+                )
+            except Exception as e:
+                with self._lock:
+                    self.free_nonces.append(nonce)
+                errors.append((orderParams, e))
+                continue
+            except BaseException:
+                with self._lock:
+                    self.free_nonces.append(nonce)
+                raise
+
+            with self._lock:
+                if key in self.tickets:
+                    self.free_nonces.append(nonce)
+                    continue
+                self.tickets[key] = payload
+            signed += 1
+
+        self.errors = errors
+        self.failed += len(errors)
+        return signed
+
+    def presign_grid(
+        self,
+        marketId: str,
+        side: str,
+        prices: Iterable[str],
+        amounts: Iterable[str],
+    ) -> int:
+        """Signs limit orders for every price and amount combination."""
+        amounts = list(amounts)
+        return self.presign(
+            {
+                "marketId": marketId,
+                "type": "limit",
+                "side": side,
+                "price": price,
+                "amount": amount,
+            }
+            for price in prices
+            for amount in amounts
+        )
+
+    def presign_around(
+        self,
+        marketId: str,
+        bestBid: str,
+        bestAsk: str,
+        levels: int,
+        amounts: Iterable[str],
+    ) -> int:
+        """Signs `levels` ticks of bids from bestBid down and asks from bestAsk up."""
+        tick = Decimal(self.account.marketsInfo[marketId]["priceIncrement"])
+        amounts = list(amounts)
+        bid, ask = Decimal(bestBid), Decimal(bestAsk)
+        signed = self.presign_grid(
+            marketId, "buy", (str(bid - i * tick) for i in range(levels)), amounts
+        )
+        signed += self.presign_grid(
+            marketId, "sell", (str(ask + i * tick) for i in range(levels)), amounts
+        )
+        return signed
+
+    def take(self, orderParams: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Removes and returns the usable ticket of an order, if there is one."""
+        key = ticket_key(orderParams)
+        with self._lock:
+            payload = self.tickets.pop(key, None)
+            if payload is None:
+                return None
+            if payload["settlementTicket"]["expiresOn"] - time.time() <= self.margin:
+                self._recycle(payload)
+                return None
+        return payload
+
+    def submit(self, orderParams: Dict[str, Any]):
+        """Posts the presigned ticket of the order, or signs it now on a miss."""
+        payload = self.take(orderParams)
+        if payload is None:
+            self.misses += 1
+            return self.account.submitOrder(orderParams)
+
+        self.hits += 1
+        payload = {
+            **payload,
+            "clientOrderId": orderParams.get("clientOrderId", ""),
+            "sentTime": int(time.time()),
+        }
+        tracer = self.account.tracer
+        trace = (
+            tracer.begin(orderParams["marketId"], orderParams.get("clientOrderId"))
+            if tracer is not None
+            else None
+        )
+        # NOTE: Once posted the nonce is burnt, even if the request failed
+        return self.account.postOrder(payload, trace)
+
+    def _recycle(self, payload: Dict[str, Any]):
+        self.free_nonces.append(payload["settlementTicket"]["nonce"])
+        self.evicted += 1
+
+    def evict(self, now: float = None) -> int:
+        """Drops tickets that expire within the margin and recycles their nonces."""
+        deadline = (time.time() if now is None else now) + self.margin
+        with self._lock:
+            stale = [
+                key
+                for key, payload in self.tickets.items()
+                if payload["settlementTicket"]["expiresOn"] <= deadline
+            ]
+            for key in stale:
+                self._recycle(self.tickets.pop(key))
+        return len(stale)
+
+    def discard(self, marketId: str = None) -> int:
+        """Drops the tickets of a market, or all of them, e.g. after the book moved."""
+        with self._lock:
+            keys = [k for k in self.tickets if marketId is None or k[0] == marketId]
+            for key in keys:
+                self._recycle(self.tickets.pop(key))
+        return len(keys)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "tickets": len(self.tickets),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+            "recycled": self.recycled,
+            "failed": self.failed,
+            "free_nonces": len(self.free_nonces),
+        }
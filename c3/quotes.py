@@ -0,0 +1,234 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from c3.account import Account
+from c3.websocket import WebSocketClient, WebSocketClientEvent
+
+DEFAULT_CANCEL_BATCH = 50
+# Order statuses of openOrders events after which an order no longer rests
+CLOSED_STATUSES = {"filled", "cancelled", "canceled", "expired", "rejected", "closed"}
+
+QuoteKey = Tuple[str, Decimal, Decimal]
+
+
+def quote_key(quote: Dict[str, Any]) -> QuoteKey:
+    return (
+        quote["side"],
+        Decimal(quote["price"]).normalize(),
+        Decimal(quote["amount"]).normalize(),
+    )
+
+
+class QuoteManager:
+    """Keeps the resting limit orders of each market equal to a target set.
+
+    `update` diffs the desired quotes with the orders it placed before and
+    only cancels and creates the difference, so unchanged quotes keep
+    their queue priority. Cancels are batched into cancelOrders calls,
+    cancels and creates are sent concurrently.
+
+    Args:
+        account: Account placing the quotes, switched to a session per thread.
+        max_workers: Requests in flight at once.
+        cancel_batch: Order ids per cancelOrders call.
+        cancel_first: Wait for the cancels before creating, so new quotes
+            never cross or double up with the ones being replaced. Nothing
+            is created when a cancel fails.
+    """
+
+    def __init__(
+        self,
+        account: Account,
+        max_workers: int = 8,
+        cancel_batch: int = DEFAULT_CANCEL_BATCH,
+        cancel_first: bool = True,
+    ) -> None:
+        self.account = account
+        # NOTE: requests.Session is not thread-safe, the workers each use their own
+        account.enable_thread_local_sessions()
+        self.cancel_batch = cancel_batch
+        self.cancel_first = cancel_first
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="c3-quotes")
+
+        # marketId -> quote key -> order id
+        self.orders: Dict[str, Dict[QuoteKey, str]] = {}
+        # order id -> amount not filled yet
+        self.remaining: Dict[str, Decimal] = {}
+        self._lock = threading.Lock()
+
+        # NOTE: The websocket can report a fill or close before the order's
+        # POST returns its id. Events of unknown ids are kept while creates
+        # are in flight and applied when the id is recorded.
+        self._creating = 0
+        self._early_fills: Dict[str, Decimal] = {}
+        self._early_closed: Set[str] = set()
+
+        self.stats = {"requests": 0, "naive_requests": 0, "kept": 0}
+
+    def _create(self, marketId: str, key: QuoteKey, quote: Dict[str, Any], nonce: int):
+        params = {"marketId": marketId, "type": "limit", **quote}
+        with self._lock:
+            self._creating += 1
+        try:
+            response = self.account.postOrder(
+                self.account.prepareOrder(params, nonce=nonce)
+            )
+            order_id = response.get("id") if isinstance(response, dict) else None
+            if order_id is None:
+                raise RuntimeError(f"Order was not created: {response}")
+
+            with self._lock:
+                remaining = key[2] - self._early_fills.pop(order_id, Decimal(0))
+                closed = order_id in self._early_closed
+                self._early_closed.discard(order_id)
+                if remaining > 0 and not closed:
+                    self.orders.setdefault(marketId, {})[key] = order_id
+                    self.remaining[order_id] = remaining
+            return response
+        finally:
+            with self._lock:
+                self._creating -= 1
+                if self._creating == 0:
+                    self._early_fills.clear()
+                    self._early_closed.clear()
+
+    def _cancel(self, marketId: str, batch: List[Tuple[QuoteKey, str]]):
+        response = self.account.cancelOrders([order_id for _, order_id in batch])
+        with self._lock:
+            tracked = self.orders.get(marketId, {})
+            for key, order_id in batch:
+                if tracked.get(key) == order_id:
+                    del tracked[key]
+                    self.remaining.pop(order_id, None)
+        return response
+
+    def update(self, marketId: str, quotes: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Makes the market's resting orders match `quotes`.
+
+        Args:
+            marketId: Market of the quotes.
+            quotes: Desired orders, dicts with side, price and amount and
+                optionally clientOrderId.
+
+        Returns:
+            Dict[str, Any]: kept, cancelled and created counts, the requests
+                sent, the requests a cancel-all and re-post would have sent,
+                and the errors of failed requests.
+        """
+        desired = {quote_key(q): q for q in quotes}
+        with self._lock:
+            current = dict(self.orders.get(marketId, {}))
+
+        to_cancel = [(key, oid) for key, oid in current.items() if key not in desired]
+        to_create = [(key, q) for key, q in desired.items() if key not in current]
+        starts = range(0, len(to_cancel), self.cancel_batch)
+        batches = [to_cancel[start:][: self.cancel_batch] for start in starts]
+
+        cancels = [self.executor.submit(self._cancel, marketId, b) for b in batches]
+        if self.cancel_first and any(f.exception() is not None for f in cancels):
+            # The quotes being replaced may still rest, new ones would double up
+            to_create = []
+
+        # NOTE: Nonces are taken here, signing happens concurrently in the workers
+        nonces = self.account.reserveNonces(len(to_create))
+        creates = [
+            self.executor.submit(self._create, marketId, key, quote, nonce)
+            for (key, quote), nonce in zip(to_create, nonces)
+        ]
+
+        errors = [
+            future.exception()
+            for future in cancels + creates
+            if future.exception() is not None
+        ]
+
+        requests = len(batches) + len(to_create)
+        # Cancel everything in one call, then post every quote again
+        naive_requests = (1 if current else 0) + len(desired)
+        kept = len(current) - len(to_cancel)
+        self.stats["requests"] += requests
+        self.stats["naive_requests"] += naive_requests
+        self.stats["kept"] += kept
+
+        return {
+            "kept": kept,
+            "cancelled": len(to_cancel),
+            "created": len(to_create),
+            "requests": requests,
+            "naive_requests": naive_requests,
+            "errors": errors,
+        }
+
+    def saved_requests(self) -> int:
+        return self.stats["naive_requests"] - self.stats["requests"]
+
+    def forget(self, order_id: str) -> bool:
+        """Stops tracking an order that is gone, e.g. filled or cancelled elsewhere."""
+        with self._lock:
+            self.remaining.pop(order_id, None)
+            for tracked in self.orders.values():
+                for key, tracked_id in tracked.items():
+                    if tracked_id == order_id:
+                        del tracked[key]
+                        return True
+        return False
+
+    def _closed(self, order_id: str):
+        with self._lock:
+            if order_id not in self.remaining and self._creating:
+                self._early_closed.add(order_id)
+                return
+        self.forget(order_id)
+
+    def on_trades(self, trades: List[Dict[str, Any]]):
+        """Forgets the quotes these fills complete."""
+        filled = []
+        with self._lock:
+            for trade in trades:
+                order_id = trade.get("orderId")
+                remaining = self.remaining.get(order_id)
+                if remaining is None:
+                    if self._creating:
+                        self._early_fills[order_id] = self._early_fills.get(
+                            order_id, Decimal(0)
+                        ) + Decimal(trade["size"])
+                    continue
+                remaining -= Decimal(trade["size"])
+                self.remaining[order_id] = remaining
+                if remaining <= 0:
+                    filled.append(order_id)
+        for order_id in filled:
+            self.forget(order_id)
+
+    def on_open_orders(self, orders: List[Dict[str, Any]]):
+        """Forgets the quotes reported as closed."""
+        for order in orders:
+            if order.get("status") in CLOSED_STATUSES:
+                self._closed(order["id"])
+
+    def attach(self, client: WebSocketClient):
+        """Forgets orders reported as cancelled, filled or otherwise closed on
+        the account's websocket."""
+
+        async def on_cancels(data):
+            for item in data if isinstance(data, list) else [data]:
+                self._closed(item["id"] if isinstance(item, dict) else item)
+
+        async def on_trades(data):
+            self.on_trades(data if isinstance(data, list) else [data])
+
+        async def on_open_orders(data):
+            self.on_open_orders(data if isinstance(data, list) else [data])
+
+        client.on(WebSocketClientEvent.Cancels, on_cancels)
+        client.on(WebSocketClientEvent.Trades, on_trades)
+        client.on(WebSocketClientEvent.OpenOrders, on_open_orders)
+
+    def open_orders(self, marketId: str) -> Dict[QuoteKey, str]:
+        with self._lock:
+            return dict(self.orders.get(marketId, {}))
+
+    def close(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,256 @@
+import asyncio
+import glob
+import itertools
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from c3.utils.serialization import json_loads
+from c3.websocket import WebSocketClient
+
+# Segment files start with SEGMENT_MAGIC, followed by records of
+# RECORD_HEADER (receive time in ns since epoch, payload length, flags) and the
+# raw payload. The unused tail of a segment is zero filled, a record with a
+# zero timestamp and length marks the end of a segment that was not closed.
+SEGMENT_MAGIC = b"C3WSREC1"
+RECORD_HEADER = struct.Struct("<qIH")
+SEGMENT_SUFFIX = ".c3rec"
+
+# The frame arrived as str, payload holds its utf-8 encoding
+FLAG_TEXT = 0x1
+
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024
+
+Frame = Union[str, bytes, bytearray, memoryview]
+Record = Tuple[int, int, bytes]
+
+# Tells apart the sessions a process starts within the same second
+_session_ids = itertools.count()
+
+
+class SessionRecorder:
+    """Appends raw websocket frames to memory mapped segment files.
+
+    `record` only timestamps the frame and queues it, encoding and writing
+    happen in a background thread so the live handler is not slowed down.
+    If that thread fails, `record` raises its error instead of queuing.
+
+    Args:
+        directory: Where segment files are created.
+        segment_size: Size of each preallocated segment, a new one is started
+            when a frame does not fit.
+        prefix: File name prefix of the segments.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        prefix: str = "session",
+    ) -> None:
+        self.directory = directory
+        self.segment_size = segment_size
+        self.prefix = prefix
+
+        self.frames = 0
+        self.bytes = 0
+        self.segments: List[str] = []
+
+        self._queue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._offset = 0
+        self.error: Optional[BaseException] = None
+        # NOTE: Segment names never repeat, another recorder started in the
+        # same second, here or in another process, does not overwrite them
+        started = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        self._session = f"{started}-{os.getpid()}-{next(_session_ids)}"
+
+    def start(self):
+        if self._thread is not None:
+            raise RuntimeError("Recorder is already running")
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name="c3-session-recorder", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Writes every queued frame and closes the current segment."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def record(self, frame: Frame, timestamp_ns: int = None):
+        if self.error is not None:
+            raise RuntimeError("Session recorder stopped") from self.error
+        self._queue.put(
+            (time.time_ns() if timestamp_ns is None else timestamp_ns, frame)
+        )
+
+    def _run(self):
+        get = self._queue.get
+        try:
+            while True:
+                item = get()
+                if item is None:
+                    return
+                self._write(*item)
+        except Exception as e:
+            # Raised by the next record() call
+            self.error = e
+        finally:
+            self._close_segment()
+
+    def _write(self, timestamp_ns: int, frame: Frame):
+        if isinstance(frame, str):
+            payload = frame.encode("utf-8")
+            flags = FLAG_TEXT
+        else:
+            payload = frame
+            flags = 0
+
+        length = len(payload)
+        end = self._offset + RECORD_HEADER.size + length
+        if self._mmap is None or end > len(self._mmap):
+            self._open_segment(RECORD_HEADER.size + length)
+            end = self._offset + RECORD_HEADER.size + length
+
+        mm = self._mmap
+        RECORD_HEADER.pack_into(mm, self._offset, timestamp_ns, length, flags)
+        start = self._offset + RECORD_HEADER.size
+        mm[start:end] = payload
+        self._offset = end
+
+        self.frames += 1
+        self.bytes += length
+
+    def _open_segment(self, needed: int):
+        self._close_segment()
+
+        path = os.path.join(
+            self.directory,
+            f"{self.prefix}-{self._session}-{len(self.segments):06d}{SEGMENT_SUFFIX}",
+        )
+        # NOTE: A frame larger than segment_size gets a segment of its own
+        size = max(self.segment_size, len(SEGMENT_MAGIC) + needed)
+        self._file = open(path, "x+b")
+        self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+        self._mmap[: len(SEGMENT_MAGIC)] = SEGMENT_MAGIC
+        self._offset = len(SEGMENT_MAGIC)
+        self.segments.append(path)
+
+    def _close_segment(self):
+        if self._mmap is None:
+            return
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.truncate(self._offset)
+        self._file.close()
+        self._mmap = None
+        self._file = None
+
+
+def read_segment(path: str) -> Iterator[Record]:
+    """Yields (timestamp_ns, flags, payload) for every record of a segment."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[: len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+                raise ValueError(f"{path} is not a session segment")
+
+            offset = len(SEGMENT_MAGIC)
+            header_size = RECORD_HEADER.size
+            unpack_from = RECORD_HEADER.unpack_from
+            while offset + header_size <= size:
+                timestamp_ns, length, flags = unpack_from(mm, offset)
+                if timestamp_ns == 0 and length == 0:
+                    return
+                start = offset + header_size
+                offset = start + length
+                if offset > size:
+                    raise ValueError(f"{path} ends in a truncated record")
+                yield timestamp_ns, flags, mm[start:offset]
+
+
+def session_segments(directory: str, prefix: str = "*") -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, f"{prefix}-*{SEGMENT_SUFFIX}")))
+
+
+def read_session(source: Union[str, Iterable[str]]) -> Iterator[Record]:
+    """Yields the records of a session directory or of a list of segments, in order."""
+    paths = session_segments(source) if isinstance(source, str) else source
+    for path in paths:
+        yield from read_segment(path)
+
+
+class ReplayWebSocketClient(WebSocketClient):
+    """Feeds a recorded session through `handle_message`.
+
+    Listeners are registered with `on` like on a live client.
+
+    Args:
+        source: Session directory or list of segment files.
+        realtime: Keep the recorded spacing between frames, otherwise
+            replay as fast as possible.
+        speed: Realtime speed multiplier, 2.0 replays twice as fast.
+        loads: JSON parser, must accept bytes.
+    """
+
+    def __init__(
+        self,
+        source: Union[str, Iterable[str]],
+        realtime: bool = False,
+        speed: float = 1.0,
+        loads: Callable = json_loads,
+        account_id: str = None,
+    ):
+        super().__init__("", account_id, None, loads=loads)
+        self.source = source
+        self.realtime = realtime
+        self.speed = speed
+        self.replayed = 0
+
+    async def replay(self) -> int:
+        """Replays the whole session, returns the number of frames handled."""
+        handle_message = self.handle_message
+        first_ts = None
+        started = time.perf_counter()
+
+        for timestamp_ns, _, payload in read_session(self.source):
+            if self.realtime:
+                if first_ts is None:
+                    first_ts = timestamp_ns
+                target = (timestamp_ns - first_ts) / 1e9 / self.speed
+                delay = target - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif self.replayed % 1000 == 0:
+                # Let the listener tasks created by emit run
+                await asyncio.sleep(0)
+
+            handle_message(payload)
+            self.replayed += 1
+
+        await asyncio.sleep(0)
+        return self.replayed
+
+    async def run(self):
+        await self.replay()
@@ -0,0 +1,267 @@
+"""Fan-out of one websocket feed to local processes through shared memory.
+
+One process owns the `WebSocketClient` and publishes normalized level1,
+bookDelta and trade updates with `SharedFeedPublisher`. Other processes
+attach a `SharedFeedReader` by name and poll new updates without locks.
+
+Layout of the shared memory block:
+
+    header  magic, capacity, record size, write index
+    slots   `capacity` fixed size records
+
+Every slot starts with a sequence number used as a seqlock: the writer sets
+it to 2 * index + 1 while the slot is being written and to 2 * index + 2
+once it is complete. A reader accepts a slot only if it sees the completed
+sequence of the index it expects both before and after copying it, anything
+else means the writer lapped the reader and the update is counted as lost.
+"""
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Iterator, List, NamedTuple
+
+from c3.marketdata import (
+    NAN,
+    SIDE_ASK,
+    SIDE_BID,
+    book_delta_rows,
+    level1_row,
+    market_of,
+    trade_rows,
+)
+from c3.websocket import WebSocketClient, WebSocketClientEvent
+
+MAGIC = b"C3FEED01"
+HEADER = struct.Struct("<8sQQ")
+WRITE_INDEX = struct.Struct("<Q")
+WRITE_INDEX_OFFSET = HEADER.size
+SLOTS_OFFSET = 64
+
+SLOT_SEQ = struct.Struct("<Q")
+# seq, kind, side, market, timestamp, book seq, price, size, ask price, ask size
+RECORD = struct.Struct("<QBB6x32sqqdddd")
+
+KIND_LEVEL1 = 1
+KIND_BOOK_DELTA = 2
+KIND_TRADE = 3
+
+DEFAULT_CAPACITY = 65536
+
+# Blocks created by publishers of this process, see SharedFeedReader
+_published = set()
+
+
+class FeedUpdate(NamedTuple):
+    """One normalized update. Level1 updates carry the best bid in
+    price/size and the best ask in ask_price/ask_size, book deltas and
+    trades only use price/size."""
+
+    kind: int
+    market: str
+    timestamp: int
+    seq: int
+    side: int
+    price: float
+    size: float
+    ask_price: float
+    ask_size: float
+
+
+class SharedFeedPublisher:
+    """Writes updates into a shared memory ring buffer.
+
+    Args:
+        name: Shared memory name readers attach to.
+        capacity: Number of updates kept, readers further behind lose updates.
+    """
+
+    def __init__(self, name: str, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.name = name
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=True, size=SLOTS_OFFSET + capacity * RECORD.size
+        )
+        _published.add(self.shm._name)
+        self.buf = self.shm.buf
+        HEADER.pack_into(self.buf, 0, MAGIC, capacity, RECORD.size)
+        WRITE_INDEX.pack_into(self.buf, WRITE_INDEX_OFFSET, 0)
+        self.index = 0
+
+    def attach(self, client: WebSocketClient):
+        """Publishes the level1, bookDelta and trades events of a client."""
+
+        async def on_level1(data):
+            self.publish_level1(data)
+
+        async def on_book_delta(data):
+            self.publish_book_delta(data)
+
+        async def on_trades(data):
+            self.publish_trades(data)
+
+        client.on(WebSocketClientEvent.Level1, on_level1)
+        client.on(WebSocketClientEvent.bookDelta, on_book_delta)
+        client.on(WebSocketClientEvent.Trades, on_trades)
+
+    def publish(
+        self,
+        kind: int,
+        market: bytes,
+        timestamp: int,
+        seq: int,
+        side: int,
+        price: float,
+        size: float,
+        ask_price: float = NAN,
+        ask_size: float = NAN,
+    ):
+        buf = self.buf
+        index = self.index
+        offset = SLOTS_OFFSET + (index % self.capacity) * RECORD.size
+
+        # NOTE: The odd sequence is the first field, it is written before the payload
+        RECORD.pack_into(
+            buf,
+            offset,
+            2 * index + 1,
+            kind,
+            side,
+            market,
+            timestamp,
+            seq,
+            price,
+            size,
+            ask_price,
+            ask_size,
+        )
+        SLOT_SEQ.pack_into(buf, offset, 2 * index + 2)
+
+        self.index = index + 1
+        WRITE_INDEX.pack_into(buf, WRITE_INDEX_OFFSET, self.index)
+
+    def publish_level1(self, data: Dict[str, Any]):
+        timestamp, bid_price, bid_size, ask_price, ask_size = level1_row(data)
+        self.publish(
+            KIND_LEVEL1,
+            data["marketId"].encode("utf-8"),
+            timestamp,
+            -1,
+            SIDE_BID,
+            bid_price,
+            bid_size,
+            ask_price,
+            ask_size,
+        )
+
+    def publish_book_delta(self, data: Dict[str, Any]):
+        market = data["marketId"].encode("utf-8")
+        for timestamp, seq, side, price, size in book_delta_rows(data):
+            self.publish(KIND_BOOK_DELTA, market, timestamp, seq, side, price, size)
+
+    def publish_trades(self, data: List[Dict[str, Any]]):
+        if not data:
+            return
+        market = market_of(data).encode("utf-8")
+        for timestamp, _, side, price, size in trade_rows(data):
+            self.publish(KIND_TRADE, market, timestamp, -1, side, price, size)
+
+    def close(self):
+        """Stops publishing and removes the shared memory block."""
+        self.buf = None
+        self.shm.close()
+        self.shm.unlink()
+        _published.discard(self.shm._name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedFeedReader:
+    """Reads updates published by a SharedFeedPublisher, never blocks the writer.
+
+    Args:
+        name: Shared memory name of the publisher.
+        from_start: Read the updates still in the buffer, otherwise start
+            with the next published one.
+    """
+
+    def __init__(self, name: str, from_start: bool = False) -> None:
+        self.shm = shared_memory.SharedMemory(name=name)
+        # NOTE: The publisher owns the block, a reader in another process must
+        # not have the resource tracker unlink it when that process exits
+        if self.shm._name not in _published:
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.buf = self.shm.buf
+
+        magic, self.capacity, record_size = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{name} is not a shared feed")
+
+        write_index = self.write_index()
+        self.position = (
+            max(0, write_index - self.capacity) if from_start else write_index
+        )
+        self.lost = 0
+
+    def write_index(self) -> int:
+        return WRITE_INDEX.unpack_from(self.buf, WRITE_INDEX_OFFSET)[0]
+
+    def poll(self, max_updates: int = None) -> List[FeedUpdate]:
+        """Returns the updates published since the last call."""
+        buf = self.buf
+        capacity = self.capacity
+        write_index = self.write_index()
+
+        if write_index - self.position > capacity:
+            self.lost += write_index - capacity - self.position
+            self.position = write_index - capacity
+        end = write_index
+        if max_updates is not None:
+            end = min(end, self.position + max_updates)
+
+        updates = []
+        unpack_from = RECORD.unpack_from
+        seq_from = SLOT_SEQ.unpack_from
+        for index in range(self.position, end):
+            offset = SLOTS_OFFSET + (index % capacity) * RECORD.size
+            expected = 2 * index + 2
+            record = unpack_from(buf, offset)
+            if record[0] != expected or seq_from(buf, offset)[0] != expected:
+                # Overwritten by a newer update before or while it was read
+                self.lost += 1
+                continue
+            _, kind, side, market, timestamp, seq, *values = record
+            updates.append(
+                FeedUpdate(
+                    kind,
+                    market.rstrip(b"\0").decode("utf-8"),
+                    timestamp,
+                    seq,
+                    side,
+                    *values,
+                )
+            )
+        self.position = end
+        return updates
+
+    def updates(self, poll_interval: float = 0.0005) -> Iterator[FeedUpdate]:
+        """Yields updates as they are published, sleeping while there are none."""
+        while True:
+            updates = self.poll()
+            if not updates:
+                time.sleep(poll_interval)
+            yield from updates
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,19 +1,28 @@
 import base64
-
-from algosdk import abi
+from functools import lru_cache
 
 from c3.signing.types import (
     RequestOperation,
     SignatureRequest,
     SignatureRequestOperationId,
 )
+from c3.utils.lazy import lazy_import
+
+abi = lazy_import("algosdk.abi")
 
 ORDER_ABI_FORMAT = "(byte,byte[32],uint64,uint64,byte,uint64,uint64,byte,uint64,uint64)"
 HEADER_ABI_FORMAT = "(byte[32],byte[32],uint64)"
 
 
+@lru_cache(maxsize=None)
+def abi_type(encoding: str):
+    # NOTE: Parsing the type string costs more than encoding the value,
+    # so each format is parsed once and the ABIType is reused
+    return abi.ABIType.from_string(encoding)
+
+
 def encode_abi_value(value, encoding) -> bytes:
-    return abi.ABIType.from_string(encoding).encode(value)
+    return abi_type(encoding).encode(value)
 
 
 def encode_user_operation_base(request: SignatureRequest) -> bytearray:
@@ -192,6 +201,9 @@ def encode_user_operation(request: SignatureRequest) -> bytearray:
             # If not, we should probably change it on the server side
             # for consistency.
             return encoded_operation
+        case RequestOperation.Delegate:
+            # NOTE: Delegations carry no lease, the bare operation is signed
+            return encoded_operation
         case _:
             headerABIvalue = [
                 base64.b64decode(request.account),
@@ -2,11 +2,16 @@ import base64
 import binascii
 from abc import ABC, abstractmethod
 
-from algosdk import account, mnemonic, util
-from eth_account import Account, messages
-
 from c3.signing.encode import encode_user_operation_base
 from c3.signing.types import SettlementTicket
+from c3.utils.lazy import lazy_import
+
+# NOTE: Chain libraries are heavy to import, they are loaded on first use
+account = lazy_import("algosdk.account")
+mnemonic = lazy_import("algosdk.mnemonic")
+util = lazy_import("algosdk.util")
+eth_account = lazy_import("eth_account")
+messages = lazy_import("eth_account.messages")
 
 
 # Utility function for base64address
@@ -110,7 +115,7 @@ class EVMMessageSigner(MessageSigner):
         super().__init__()
 
     def address(self) -> str:
-        return Account.from_key(self.private_key).address
+        return eth_account.Account.from_key(self.private_key).address
 
     def base64address(self) -> bytes:
         """Encodes Ethereum address into base64."""
@@ -119,7 +124,7 @@ class EVMMessageSigner(MessageSigner):
 
     def sign_message(self, message: bytes) -> str:
         msg = messages.encode_defunct(message)
-        hexBytesSignature = Account.sign_message(
+        hexBytesSignature = eth_account.Account.sign_message(
             msg, private_key=self.private_key
         ).signature
 
@@ -17,8 +17,11 @@ LeaseValue: TypeAlias = (
     bytes  # NOTE: A 32 byte array of random bytes or all zeros for no lease
 )
 
+# NOTE: Shared by every request without a lease, bytes are immutable so it is safe to reuse
+ZERO_LEASE: LeaseValue = bytes(32)
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class OrderData:
     account: AddressBytes
     sell_slot_id: SlotId
@@ -31,7 +34,7 @@ class OrderData:
     nonce: Nonce
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SettlementTicket(OrderData):
     creator: AddressBytes
     signature: Signature
@@ -64,19 +67,19 @@ class SignatureRequestOperationId(IntEnum):
     Settle = 6  # NOTE: This is a special operation ID used for order creation
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class XChainAddress:
     chain_id: ChainId
     address: bytes  # NOTE: 32-byte address, not base64 encoded because each chain has its own bespoke address format
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SignatureRequest:
     op: RequestOperation
     pass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SignatureRequestSingleAsset(SignatureRequest):
     account: AddressBytes
     slot_id: SlotId
@@ -86,7 +89,7 @@ class SignatureRequestSingleAsset(SignatureRequest):
     last_valid: Timestamp
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WithdrawSignatureRequest(SignatureRequestSingleAsset):
     op: RequestOperation.Withdraw
     receiver: XChainAddress
@@ -94,27 +97,27 @@ class WithdrawSignatureRequest(SignatureRequestSingleAsset):
     max_fees: ContractAmount
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LendSignatureRequest(SignatureRequestSingleAsset):
     op: RequestOperation.Lend
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CERedeemRequest(SignatureRequestSingleAsset):
     op: RequestOperation.Redeem
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BorrowSignatureRequest(SignatureRequestSingleAsset):
     op: RequestOperation.Borrow
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RepaySignatureRequest(SignatureRequestSingleAsset):
     op: RequestOperation.Repay
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class OrderSignatureRequest(SignatureRequest):
     op: RequestOperation.Order
     account: AddressBytes
@@ -132,7 +135,7 @@ class OrderSignatureRequest(SignatureRequest):
     last_valid: Timestamp
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LiquidateSignatureRequest(SignatureRequest):
     op: RequestOperation.Liquidate
     account: AddressBytes
@@ -141,7 +144,7 @@ class LiquidateSignatureRequest(SignatureRequest):
     cash: Dict[SlotId, ContractAmount]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DelegateSignatureRequest(SignatureRequest):
     op: RequestOperation.Delegate
     account: AddressBytes
@@ -150,7 +153,7 @@ class DelegateSignatureRequest(SignatureRequest):
     expiration: Timestamp
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AccountMoveSignatureRequest(SignatureRequest):
     op: RequestOperation.AccountMove
     account: AddressBytes
@@ -159,14 +162,14 @@ class AccountMoveSignatureRequest(SignatureRequest):
     cash: Dict[SlotId, ContractAmount]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CancelSignatureRequest(SignatureRequest):
     op: RequestOperation.Cancel
     orders: list[OrderId] = field(default_factory=list)  # array of orderIds
     all_orders_until: Timestamp = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LoginSignatureRequest(SignatureRequest):
     op: RequestOperation.Login
     nonce: str
@@ -0,0 +1,821 @@
+"""In-process stand-in for the C3 REST API and the /v1/ws websocket.
+
+It speaks the subset of the protocol used by this SDK, verifies every
+signature it receives and can inject latency and failures, so that order rate,
+cancel latency and reconnect behaviour can be load tested on a single machine.
+
+    with MockC3Exchange(latency=0.002, failure_rate=0.01) as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+        account.submitOrder({...})
+"""
+import base64
+import gzip
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import re
+import secrets
+import socket
+import struct
+import threading
+import time
+from collections import defaultdict
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+from c3.signing.encode import encode_user_operation, encode_user_operation_base
+from c3.signing.signers import base64address
+from c3.signing.types import (
+    ZERO_LEASE,
+    CancelSignatureRequest,
+    DelegateSignatureRequest,
+    LoginSignatureRequest,
+    OrderSignatureRequest,
+    RequestOperation,
+)
+
+DEFAULT_INSTRUMENTS = [
+    {"id": "ALGO", "asaId": 0, "asaName": "Algorand", "asaDecimals": 6},
+    {"id": "USDC", "asaId": 31566704, "asaName": "USDC", "asaDecimals": 6},
+    {"id": "ETH", "asaId": 887406851, "asaName": "Ethereum", "asaDecimals": 8},
+]
+
+DEFAULT_MARKETS = [
+    {
+        "id": "ALGO-USDC",
+        "baseInstrument": {"id": "ALGO", "asaDecimals": 6},
+        "quoteInstrument": {"id": "USDC", "asaDecimals": 6},
+        "priceIncrement": "0.0001",
+        "quantityIncrement": "1",
+        "minQuantity": "1",
+        "maxQuantity": "1000000",
+    },
+    {
+        "id": "ETH-USDC",
+        "baseInstrument": {"id": "ETH", "asaDecimals": 8},
+        "quoteInstrument": {"id": "USDC", "asaDecimals": 6},
+        "priceIncrement": "0.01",
+        "quantityIncrement": "0.0001",
+        "minQuantity": "0.001",
+        "maxQuantity": "1000",
+    },
+]
+
+LOGIN_MESSAGE = (
+    "Welcome to C3:\n\nClick to sign and accept the C3 Terms of Service "
+    "(https://c3.io/tos)\n\nThis request will not trigger a blockchain "
+    "transaction or cost any gas fees.\n\n"
+)
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+_WS_OP_CONTINUATION = 0x0
+_WS_OP_TEXT = 0x1
+_WS_OP_BINARY = 0x2
+_WS_OP_CLOSE = 0x8
+_WS_OP_PING = 0x9
+_WS_OP_PONG = 0xA
+
+
+class MockHTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def verify_signature(message: bytes, signature: str, address: str) -> bool:
+    """Verifies a signature produced by one of the c3.signing signers."""
+    try:
+        if address.startswith("0x"):
+            from eth_account import Account, messages
+
+            recovered = Account.recover_message(
+                messages.encode_defunct(message),
+                signature=base64.b64decode(signature),
+            )
+            return recovered.lower() == address.lower()
+
+        from algosdk import util
+
+        return util.verify_bytes(message, signature, address)
+    except Exception:
+        return False
+
+
+class MockWebSocket:
+    """Server side of a RFC 6455 connection running on a request handler thread.
+
+    Only what WebSocketClient needs is implemented: text/binary frames,
+    fragmentation, ping/pong and close. Extensions are never negotiated.
+    """
+
+    def __init__(self, handler: BaseHTTPRequestHandler, account_id: str):
+        self.handler = handler
+        self.account_id = account_id
+        self.topics = set()
+        self.connected_at = time.time()
+        self.closed = False
+        self._write_lock = threading.Lock()
+
+    def _read_exact(self, size: int) -> bytes:
+        data = self.handler.rfile.read(size)
+        if len(data) < size:
+            raise ConnectionError("websocket connection closed")
+        return data
+
+    def _read_frame(self):
+        b0, b1 = self._read_exact(2)
+        fin = bool(b0 & 0x80)
+        opcode = b0 & 0x0F
+        length = b1 & 0x7F
+        if length == 126:
+            (length,) = struct.unpack("!H", self._read_exact(2))
+        elif length == 127:
+            (length,) = struct.unpack("!Q", self._read_exact(8))
+
+        mask = self._read_exact(4) if b1 & 0x80 else None
+        payload = self._read_exact(length)
+        if mask and length:
+            # XOR the whole payload at once instead of byte by byte
+            repeated = (mask * (length // 4 + 1))[:length]
+            payload = (
+                int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")
+            ).to_bytes(length, "big")
+
+        return fin, opcode, payload
+
+    def recv(self) -> Optional[Union[str, bytes]]:
+        """Returns the next data message, or None once the peer closed."""
+        message_opcode, chunks = None, []
+        while True:
+            fin, opcode, payload = self._read_frame()
+
+            if opcode == _WS_OP_PING:
+                self._send_frame(_WS_OP_PONG, payload)
+                continue
+            if opcode == _WS_OP_PONG:
+                continue
+            if opcode == _WS_OP_CLOSE:
+                self.close(payload[:2] if len(payload) >= 2 else b"")
+                return None
+
+            if opcode != _WS_OP_CONTINUATION:
+                message_opcode = opcode
+            chunks.append(payload)
+
+            if fin:
+                data = b"".join(chunks)
+                return data.decode("utf-8") if message_opcode == _WS_OP_TEXT else data
+
+    def _send_frame(self, opcode: int, payload: bytes):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+
+        with self._write_lock:
+            if self.closed and opcode != _WS_OP_CLOSE:
+                return
+            self.handler.wfile.write(header + payload)
+
+    def send(self, message: Union[str, bytes, dict]):
+        if isinstance(message, dict):
+            message = json.dumps(message)
+        if isinstance(message, str):
+            self._send_frame(_WS_OP_TEXT, message.encode("utf-8"))
+        else:
+            self._send_frame(_WS_OP_BINARY, bytes(message))
+
+    def close(self, code: bytes = struct.pack("!H", 1000)):
+        if self.closed:
+            return
+        try:
+            self._send_frame(_WS_OP_CLOSE, code)
+        except OSError:
+            pass
+        self.closed = True
+
+    def drop(self):
+        """Kills the TCP connection without a close handshake."""
+        self.closed = True
+        try:
+            self.handler.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class _MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    server: "_MockHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Any):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self, method: str):
+        exchange = self.server.exchange
+        url = urlsplit(self.path)
+        path = url.path.lstrip("/")
+
+        if method == "GET" and path == "v1/ws":
+            return self._serve_websocket(parse_qs(url.query))
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        try:
+            exchange._before_request(method, path)
+            if body and self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            status, response = exchange._handle_rest(
+                method,
+                path,
+                parse_qs(url.query),
+                json.loads(body) if body else None,
+                self.headers.get("Authorization"),
+            )
+        except MockHTTPError as e:
+            status, response = e.status, {"error": e.message}
+        except (ValueError, KeyError, TypeError, gzip.BadGzipFile) as e:
+            # Malformed requests get an answer instead of a dropped connection
+            status, response = 400, {"error": f"Bad request: {e!r}"}
+
+        exchange._count(method, path, status)
+        self._send_json(status, response)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _serve_websocket(self, query: Dict[str, List[str]]):
+        exchange = self.server.exchange
+        key = self.headers.get("Sec-WebSocket-Key")
+        account_id = query.get("accountId", [None])[0]
+        token = query.get("token", [None])[0]
+
+        if key is None or self.headers.get("Upgrade", "").lower() != "websocket":
+            self._send_json(400, {"error": "Expected a websocket upgrade"})
+            return
+        session = exchange._session_for_token(token)
+        if session is None:
+            self._send_json(401, {"error": "Invalid token"})
+            return
+        if session["accountId"] != account_id:
+            self._send_json(403, {"error": f"Token is not valid for {account_id}"})
+            return
+
+        accept = base64.b64encode(
+            hashlib.sha1((key + _WS_GUID).encode("ascii")).digest()
+        ).decode("ascii")
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.close_connection = True
+
+        ws = MockWebSocket(self, account_id)
+        exchange._ws_connected(ws)
+        try:
+            ws.send({"type": "login", "data": {"accountId": account_id}})
+            while not ws.closed:
+                message = ws.recv()
+                if message is None:
+                    break
+                exchange._handle_ws_message(ws, message)
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            ws.closed = True
+            exchange._ws_disconnected(ws)
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    exchange: "MockC3Exchange"
+
+
+class MockC3Exchange:
+    """Lightweight C3 exchange running on a background thread.
+
+    Args:
+        instruments: Instruments served by `v1/instruments`.
+        markets: Markets served by `v1/markets`.
+        latency: Seconds to wait before answering each REST request, or a
+            callable returning that delay.
+        failure_rate: Probability that a REST request fails with
+            `failure_status` instead of being processed.
+        failure_status: HTTP status used for injected failures.
+        verify_signatures: Reject logins, orders and cancels whose signature
+            does not match the creator address.
+        token_ttl: Lifetime of the issued tokens in seconds.
+        seed: Seed for the failure injection random generator.
+    """
+
+    def __init__(
+        self,
+        instruments: List[Dict[str, Any]] = None,
+        markets: List[Dict[str, Any]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Union[float, Callable[[], float]] = 0.0,
+        failure_rate: float = 0.0,
+        failure_status: int = 503,
+        verify_signatures: bool = True,
+        token_ttl: int = 3600,
+        seed: int = None,
+    ):
+        self.instruments = (
+            instruments if instruments is not None else DEFAULT_INSTRUMENTS
+        )
+        self.markets = markets if markets is not None else DEFAULT_MARKETS
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.verify_signatures = verify_signatures
+        self.token_ttl = token_ttl
+
+        self._random = random.Random(seed)
+        self._secret = secrets.token_bytes(32)
+        self._lock = threading.RLock()
+        self._fail_next = []
+
+        self.login_nonces: Dict[str, str] = {}
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.trades: List[Dict[str, Any]] = []
+        self.nonces: Dict[str, set] = defaultdict(set)
+        # Delegated addresses of every account, with their expiration
+        self.delegates: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.balances: Dict[str, Dict[str, Any]] = {}
+        self.websockets: List[MockWebSocket] = []
+        self.ws_connections = 0
+        self.stats: Dict[str, int] = defaultdict(int)
+
+        self._order_sequence = itertools.count(1)
+        self._trade_sequence = itertools.count(1)
+
+        self.httpd = _MockHTTPServer((host, port), _MockRequestHandler)
+        self.httpd.exchange = self
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, name="mock-c3-exchange", daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.drop_websockets()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Failure injection
+
+    def fail_next(self, count: int = 1, status: int = None):
+        """Makes the next `count` REST requests fail with `status`."""
+        with self._lock:
+            self._fail_next.extend([status or self.failure_status] * count)
+
+    def drop_websockets(self):
+        """Drops every websocket connection, as a network failure would."""
+        with self._lock:
+            sockets = list(self.websockets)
+        for ws in sockets:
+            ws.drop()
+
+    def _before_request(self, method: str, path: str):
+        delay = self.latency() if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+
+        with self._lock:
+            if self._fail_next:
+                raise MockHTTPError(self._fail_next.pop(0), "Injected failure")
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                raise MockHTTPError(self.failure_status, "Injected failure")
+
+    def _count(self, method: str, path: str, status: int):
+        # Collapse ids so the stats stay readable: v1/accounts/*/orders
+        route = re.sub(r"^v1/accounts/[^/]+", "v1/accounts/*", path)
+        route = re.sub(r"/markets/[^/]+/", "/markets/*/", route)
+        with self._lock:
+            self.stats[f"{method} {route} {status}"] += 1
+
+    # Auth
+
+    def _account_id(self, address: str) -> str:
+        digest = hashlib.sha256(address.encode("utf-8")).digest()
+        return "C3_" + base64.b32encode(digest).decode("ascii").rstrip("=")[:52]
+
+    def _issue_token(self, account_id: str, address: str) -> str:
+        header = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+        payload = _b64url(
+            json.dumps(
+                {
+                    "accountId": account_id,
+                    "address": address,
+                    "iat": int(time.time()),
+                    "exp": int(time.time()) + self.token_ttl,
+                }
+            ).encode()
+        )
+        signing_input = f"{header}.{payload}".encode("ascii")
+        signature = _b64url(hmac.new(self._secret, signing_input, "sha256").digest())
+        return f"{header}.{payload}.{signature}"
+
+    def _session_for_token(self, token: Optional[str]) -> Optional[Dict[str, Any]]:
+        session = self.sessions.get(token) if token else None
+        if session is None or session["exp"] < time.time():
+            return None
+        return session
+
+    def _authorize(self, authorization: Optional[str]) -> Dict[str, Any]:
+        token = None
+        if authorization and authorization.startswith("Bearer "):
+            token = authorization.removeprefix("Bearer ")
+
+        session = self._session_for_token(token)
+        if session is None:
+            raise MockHTTPError(401, "Invalid or expired token")
+        return session
+
+    def _check_signature(self, message: bytes, signature: str, address: str):
+        if self.verify_signatures and not verify_signature(message, signature, address):
+            raise MockHTTPError(401, "Invalid signature")
+
+    def _check_creator(self, account_id: str, creator: Optional[str]):
+        if not creator:
+            raise MockHTTPError(400, "Missing creator")
+        if self._account_id(creator) == account_id:
+            return
+        with self._lock:
+            expiration = self.delegates[account_id].get(creator)
+        if expiration is None or expiration < time.time():
+            raise MockHTTPError(403, f"{creator} is not a delegate of {account_id}")
+
+    def register_delegation(self, delegation: Dict[str, Any]):
+        """Accepts a delegation signed by the primary key of an account.
+
+        Can be passed as the `register` callback of a DelegatePool. Orders and
+        cancels signed by the delegate are then accepted for the account
+        until the delegation expires.
+        """
+        creator = delegation["creator"]
+        request = DelegateSignatureRequest(
+            op=RequestOperation.Delegate,
+            account=base64address(creator),
+            delegate=base64address(delegation["delegate"]),
+            creation=delegation["creation"],
+            expiration=delegation["expiration"],
+        )
+        self._check_signature(
+            encode_user_operation_base(request), delegation["signature"], creator
+        )
+        with self._lock:
+            self.delegates[self._account_id(creator)][
+                delegation["delegate"]
+            ] = delegation["expiration"]
+
+    # REST
+
+    def _handle_rest(self, method, path, query, body, authorization):
+        parts = path.split("/")
+
+        if method == "GET" and path == "v1/instruments":
+            return 200, self.instruments
+        if method == "GET" and path == "v1/markets":
+            return 200, self.markets
+        if method == "GET" and path == "v1/login/start":
+            return 200, self._login_start(query)
+        if method == "POST" and path == "v1/login/complete":
+            return 200, self._login_complete(body or {})
+
+        if len(parts) >= 4 and parts[:2] == ["v1", "accounts"]:
+            session = self._authorize(authorization)
+            account_id = parts[2]
+            rest = parts[3:]
+            if session["accountId"] != account_id:
+                raise MockHTTPError(403, f"Token is not valid for {account_id}")
+
+            if method == "GET" and rest == ["balance"]:
+                return 200, self.balances.get(account_id, {"instrumentsInfo": []})
+            if method == "GET" and rest == ["orders"]:
+                return 200, self.open_orders(account_id)
+            if method == "GET" and rest == ["orders", "history"]:
+                return 200, self._order_history(account_id, query)
+            if method == "GET" and rest == ["trades", "history"]:
+                return 200, self._trade_history(account_id, query)
+            if method == "DELETE" and rest == ["orders"]:
+                return 200, self._cancel_orders(account_id, None, query)
+            if len(rest) == 3 and rest[0] == "markets" and rest[2] == "orders":
+                if method == "POST":
+                    return 200, self._create_order(account_id, rest[1], body)
+                if method == "DELETE":
+                    return 200, self._cancel_orders(account_id, rest[1], query)
+
+        raise MockHTTPError(404, f"Not found: {method} {path}")
+
+    def _login_start(self, query):
+        address = query.get("address", [None])[0]
+        if not address:
+            raise MockHTTPError(400, "Missing address")
+
+        nonce = LOGIN_MESSAGE + secrets.token_urlsafe(48)
+        with self._lock:
+            self.login_nonces[address] = nonce
+        return {"nonce": nonce}
+
+    def _login_complete(self, body):
+        address = body.get("address")
+        with self._lock:
+            nonce = self.login_nonces.pop(address, None)
+        if nonce is None:
+            raise MockHTTPError(400, "Login was not started")
+
+        message = encode_user_operation(
+            LoginSignatureRequest(op=RequestOperation.Login, nonce=nonce)
+        )
+        self._check_signature(message, body.get("signature"), address)
+
+        account_id = self._account_id(address)
+        token = self._issue_token(account_id, address)
+        with self._lock:
+            self.sessions[token] = {
+                "accountId": account_id,
+                "address": address,
+                "exp": time.time() + self.token_ttl,
+            }
+        return {"accountId": account_id, "token": token}
+
+    def _create_order(self, account_id, market_id, body):
+        if market_id not in {m["id"] for m in self.markets}:
+            raise MockHTTPError(400, f"Unknown market {market_id}")
+
+        ticket = body["settlementTicket"]
+        self._check_creator(account_id, ticket["creator"])
+        request = OrderSignatureRequest(
+            op=RequestOperation.Order,
+            account=ticket["account"],
+            sell_slot_id=ticket["sellSlotId"],
+            buy_slot_id=ticket["buySlotId"],
+            sell_amount=int(ticket["sellAmount"]),
+            buy_amount=int(ticket["buyAmount"]),
+            max_sell_amount_from_pool=int(ticket["maxSellAmountFromPool"]),
+            max_buy_amount_to_pool=int(ticket["maxBuyAmountToPool"]),
+            expires_on=ticket["expiresOn"],
+            nonce=ticket["nonce"],
+            lease=ZERO_LEASE,
+            last_valid=0,
+        )
+        self._check_signature(
+            encode_user_operation(request), ticket["signature"], ticket["creator"]
+        )
+
+        order_id = base64.b64encode(
+            hashlib.new("sha512_256", encode_user_operation_base(request)).digest()
+        ).decode("ascii")
+
+        with self._lock:
+            if ticket["nonce"] in self.nonces[account_id]:
+                raise MockHTTPError(400, f"Nonce {ticket['nonce']} already used")
+            self.nonces[account_id].add(ticket["nonce"])
+
+            order = {
+                "id": order_id,
+                "accountId": account_id,
+                "marketId": market_id,
+                "type": body["type"],
+                "side": body["side"],
+                "size": body["size"],
+                "price": body["price"],
+                "filledSize": "0",
+                "clientOrderId": body.get("clientOrderId", ""),
+                "createdOn": int(time.time() * 1000),
+                "sequence": next(self._order_sequence),
+                "status": "open",
+            }
+            self.orders[order_id] = order
+
+        self.send_to_account(account_id, "openOrders", [order])
+        return order
+
+    def _cancel_orders(self, account_id, market_id, query):
+        signature = query.get("signature", [None])[0]
+        creator = query.get("creator", [None])[0]
+        order_ids = query.get("orders", [])
+        all_orders_until = query.get("allOrdersUntil", [None])[0]
+        self._check_creator(account_id, creator)
+        if market_id is None and not order_ids:
+            raise MockHTTPError(400, "Missing orders")
+        if market_id is not None and not order_ids and all_orders_until is None:
+            raise MockHTTPError(400, "Missing orders or allOrdersUntil")
+        if all_orders_until is not None and not all_orders_until.isdigit():
+            raise MockHTTPError(400, f"Invalid allOrdersUntil {all_orders_until}")
+
+        request = CancelSignatureRequest(
+            op=RequestOperation.Cancel,
+            orders=order_ids,
+            all_orders_until=int(all_orders_until) if all_orders_until else None,
+        )
+        self._check_signature(encode_user_operation(request), signature, creator)
+
+        with self._lock:
+            if order_ids:
+                candidates = [self.orders.get(order_id) for order_id in order_ids]
+            else:
+                candidates = [
+                    order
+                    for order in self.orders.values()
+                    if order["marketId"] == market_id
+                    if order["createdOn"] <= request.all_orders_until
+                ]
+
+            cancelled = []
+            for order in candidates:
+                if order is None or order["accountId"] != account_id:
+                    continue
+                if order["status"] == "open":
+                    order["status"] = "cancelled"
+                    cancelled.append(order["id"])
+
+        if cancelled:
+            self.send_to_account(account_id, "cancels", cancelled)
+        return cancelled
+
+    def _page(
+        self, records: List[Dict[str, Any]], query, time_field: str
+    ) -> List[Dict[str, Any]]:
+        market_id = query.get("marketId", [None])[0]
+        since = int(query.get("from", [0])[0])
+        until = query.get("to", [None])[0]
+        offset = int(query.get("offset", [0])[0])
+        page_size = int(query.get("pageSize", [100])[0])
+
+        # NOTE: Oldest first, ties keep the order records were created in
+        selected = [
+            record
+            for record in records
+            if market_id is None or record["marketId"] == market_id
+            if record[time_field] >= since
+            if until is None or record[time_field] <= int(until)
+        ]
+        selected.sort(key=lambda record: record[time_field])
+        return selected[offset:][:page_size]
+
+    def _order_history(self, account_id, query):
+        is_open = query.get("isOpen", [None])[0]
+        with self._lock:
+            orders = [
+                order
+                for order in self.orders.values()
+                if order["accountId"] == account_id
+                if is_open is None or (order["status"] == "open") == (is_open == "true")
+            ]
+        return self._page(orders, query, "createdOn")
+
+    def _trade_history(self, account_id, query):
+        with self._lock:
+            trades = [t for t in self.trades if t["accountId"] == account_id]
+        return self._page(trades, query, "timestamp")
+
+    def fill(self, order_id: str, size: str = None, price: str = None):
+        """Fills an open order, in full by default, and sends the trade."""
+        with self._lock:
+            order = self.orders[order_id]
+            remaining = Decimal(order["size"]) - Decimal(order["filledSize"])
+            fill_size = Decimal(size) if size is not None else remaining
+            order["filledSize"] = str(Decimal(order["filledSize"]) + fill_size)
+            if fill_size >= remaining:
+                order["status"] = "filled"
+            trade = {
+                "id": str(next(self._trade_sequence)),
+                "orderId": order_id,
+                "accountId": order["accountId"],
+                "marketId": order["marketId"],
+                "side": order["side"],
+                "price": price if price is not None else order["price"],
+                "size": str(fill_size),
+                "timestamp": int(time.time() * 1000),
+            }
+            self.trades.append(trade)
+
+        self.send_to_account(order["accountId"], "trades", [trade])
+        return trade
+
+    def open_orders(self, account_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                order
+                for order in self.orders.values()
+                if order["accountId"] == account_id and order["status"] == "open"
+            ]
+
+    # Websocket
+
+    def _ws_connected(self, ws: MockWebSocket):
+        with self._lock:
+            self.websockets.append(ws)
+            self.ws_connections += 1
+
+    def _ws_disconnected(self, ws: MockWebSocket):
+        with self._lock:
+            if ws in self.websockets:
+                self.websockets.remove(ws)
+
+    def _handle_ws_message(self, ws: MockWebSocket, message: Union[str, bytes]):
+        request = json.loads(message)
+
+        if request.get("type") == "ping":
+            ws.send({"type": "pong", "id": request.get("id")})
+            return
+
+        request_type = request.get("type")
+        topic = request.get("topic")
+        if request_type == "SUBSCRIBE":
+            ws.topics.add(topic)
+            data = {"topic": topic, "subscribed": True}
+        elif request_type == "UNSUBSCRIBE":
+            ws.topics.discard(topic)
+            data = {"topic": topic, "subscribed": False}
+        elif request_type == "LIST_SUBSCRIPTIONS":
+            data = sorted(ws.topics)
+        else:
+            ws.send(
+                {"type": "error", "id": request.get("id"), "data": "Unknown request"}
+            )
+            return
+
+        # LIST_SUBSCRIPTIONS is always answered, like the real server does
+        if request.get("response") or request_type == "LIST_SUBSCRIPTIONS":
+            ws.send({"type": "response", "id": request.get("id"), "data": data})
+
+    def _send_all(self, sockets: List[MockWebSocket], message: Dict[str, Any]):
+        frame = json.dumps(message)
+        for ws in sockets:
+            try:
+                ws.send(frame)
+            except OSError:
+                ws.drop()
+
+    def publish(self, topic: str, subject: str, data: Any):
+        """Sends a market data message to every socket subscribed to `topic`."""
+        with self._lock:
+            sockets = [ws for ws in self.websockets if topic in ws.topics]
+        self._send_all(
+            sockets,
+            {"type": "message", "subject": subject, "topic": topic, "data": data},
+        )
+
+    def send_to_account(self, account_id: str, subject: str, data: Any):
+        """Sends a user event (openOrders, cancels, trades) to an account's sockets."""
+        with self._lock:
+            sockets = [ws for ws in self.websockets if ws.account_id == account_id]
+        self._send_all(
+            sockets,
+            {
+                "type": "message",
+                "subject": subject,
+                "topic": f"userOrderEvents:{account_id}",
+                "data": data,
+            },
+        )
@@ -0,0 +1,206 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from c3.signing.signers import MessageSigner
+from c3.utils.lazy import lazy_import
+
+AES = lazy_import("Crypto.Cipher.AES")
+
+logger = logging.getLogger("token-store")
+
+# Signed once per store to derive the encryption key. Signatures of both
+# signers are deterministic, so the same signer always gets the same key.
+KEY_MESSAGE = b"c3-python-sdk token store v1"
+
+NONCE_SIZE = 12
+TAG_SIZE = 16
+
+
+def jwt_expiry(token: str) -> Optional[int]:
+    """The `exp` claim of a JWT, None when it has none or is not a JWT."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenStore:
+    """Login tokens of one signer, encrypted on disk with AES-GCM.
+
+    A restarted process finds the token of its previous login here and skips
+    login/start and login/complete while the token is valid. The key comes
+    from a signature of the signer, so only the same private key can read
+    the tokens back. Files that fail to decrypt are ignored, files of
+    another signer or chain are removed.
+
+    Args:
+        directory: Where the token files are kept, created if missing.
+        signer: Signer the tokens belong to.
+    """
+
+    def __init__(self, directory: str, signer: MessageSigner) -> None:
+        self.directory = directory
+        self.signer = signer
+        self.address = signer.address()
+        self._key: Optional[bytes] = None
+
+    def _cipher_key(self) -> bytes:
+        if self._key is None:
+            signature = self.signer.sign_message(KEY_MESSAGE)
+            self._key = hashlib.sha256(signature.encode("utf-8")).digest()
+        return self._key
+
+    def path(self, base_url: str, chainId: int) -> str:
+        name = hashlib.sha256(f"{base_url}|{chainId}|{self.address}".encode())
+        return os.path.join(self.directory, name.hexdigest()[:32] + ".token")
+
+    def _associated_data(self, base_url: str, chainId: int) -> bytes:
+        # NOTE: Binds the file to its exchange, a copied file does not decrypt
+        return f"{base_url}|{chainId}|{self.address}".encode("utf-8")
+
+    def save(self, base_url: str, chainId: int, accountId: str, token: str):
+        self._write(
+            base_url,
+            chainId,
+            {
+                "accountId": accountId,
+                "token": token,
+                "expiresAt": jwt_expiry(token),
+                "address": self.address,
+                "chainId": chainId,
+            },
+        )
+
+    def _write(self, base_url: str, chainId: int, record: Dict[str, Any]):
+        data = json.dumps(record).encode("utf-8")
+        nonce = os.urandom(NONCE_SIZE)
+        cipher = AES.new(self._cipher_key(), AES.MODE_GCM, nonce=nonce)
+        cipher.update(self._associated_data(base_url, chainId))
+        ciphertext, tag = cipher.encrypt_and_digest(data)
+
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        path = self.path(base_url, chainId)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(nonce + tag + ciphertext)
+        os.replace(tmp_path, path)
+
+    def load(
+        self, base_url: str, chainId: int, min_ttl: float = 0
+    ) -> Optional[Dict[str, Any]]:
+        """The stored login, if it stays valid for at least `min_ttl` seconds.
+
+        Returns:
+            Optional[Dict[str, Any]]: accountId, token and expiresAt (None
+                when the token does not say), or None.
+        """
+        try:
+            with open(self.path(base_url, chainId), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        tag_end = NONCE_SIZE + TAG_SIZE
+        nonce, tag = data[:NONCE_SIZE], data[NONCE_SIZE:tag_end]
+        ciphertext = data[tag_end:]
+        cipher = AES.new(self._cipher_key(), AES.MODE_GCM, nonce=nonce)
+        cipher.update(self._associated_data(base_url, chainId))
+        try:
+            record = json.loads(cipher.decrypt_and_verify(ciphertext, tag))
+        except ValueError:
+            return None
+
+        # NOTE: A token of another signer would log this one in as someone else
+        owner = (record.get("address"), record.get("chainId"))
+        if owner != (self.address, chainId):
+            self.clear(base_url, chainId)
+            return None
+
+        expires_at = record.get("expiresAt")
+        if expires_at is not None and expires_at - time.time() < min_ttl:
+            return None
+        return record
+
+    def clear(self, base_url: str, chainId: int):
+        try:
+            os.remove(self.path(base_url, chainId))
+        except FileNotFoundError:
+            pass
+
+
+class TokenRefresher:
+    """Logs in again shortly before the account's token expires.
+
+    The new token replaces the old one in the account session (and in the
+    token store, if any), so requests never run into an expired token.
+
+    Args:
+        exchange: C3Exchange the account logged in with.
+        account: Account to keep logged in.
+        token_store: Store updated with every new token.
+        margin: Seconds before expiry to log in again.
+        retry_delay: Seconds to wait before retrying a failed login.
+    """
+
+    def __init__(
+        self,
+        exchange,
+        account,
+        token_store: TokenStore = None,
+        margin: float = 60,
+        retry_delay: float = 5,
+    ) -> None:
+        self.exchange = exchange
+        self.account = account
+        self.token_store = token_store
+        self.margin = margin
+        self.retry_delay = retry_delay
+        self.refreshes = 0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._stopped = True
+
+    def next_refresh_in(self) -> Optional[float]:
+        expires_at = jwt_expiry(self.account.apiToken)
+        if expires_at is None:
+            return None
+        return max(expires_at - self.margin - time.time(), 0)
+
+    def _schedule(self, delay: Optional[float]):
+        with self._lock:
+            if self._stopped or delay is None:
+                return
+            self._timer = threading.Timer(delay, self._refresh)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _refresh(self):
+        try:
+            self.exchange.refreshLogin(self.account, self.token_store)
+        except Exception:
+            logger.exception("Token refresh failed")
+            self._schedule(self.retry_delay)
+            return
+        self.refreshes += 1
+        self._schedule(self.next_refresh_in())
+
+    def start(self):
+        self._stopped = False
+        self._schedule(self.next_refresh_in())
+        return self
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
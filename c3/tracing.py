@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from c3.utils.lazy import lazy_import
+
+# NOTE: Only needed by attach, the websocket client is slow to import
+websocket = lazy_import("c3.websocket")
+
+# Stamps taken by Account.submitOrder, in order, followed by the first
+# websocket event of the order
+SUBMIT = "submit"
+VALIDATE = "validate"
+ENCODE = "encode"
+SIGN = "sign"
+SEND = "send"
+RESPONSE = "response"
+EVENT = "event"
+
+STAGES = (VALIDATE, ENCODE, SIGN, SEND, RESPONSE, EVENT)
+
+# Fields of websocket order and trade events that can identify an order
+EVENT_ORDER_KEYS = ("orderId", "id")
+
+
+class OrderTrace:
+    """Timestamps of one order, in perf_counter nanoseconds."""
+
+    __slots__ = ("market_id", "client_order_id", "order_id", "started_at", "stamps")
+
+    def __init__(self, market_id: str, client_order_id: str = None) -> None:
+        self.market_id = market_id
+        self.client_order_id = client_order_id or None
+        self.order_id: Optional[str] = None
+        self.started_at = time.time()
+        self.stamps: Dict[str, int] = {SUBMIT: time.perf_counter_ns()}
+
+    def stamp(self, stage: str, at_ns: int = None):
+        self.stamps.setdefault(
+            stage, time.perf_counter_ns() if at_ns is None else at_ns
+        )
+
+    def elapsed_us(self) -> Dict[str, float]:
+        """Time from submitOrder being called to every stamped stage."""
+        start = self.stamps[SUBMIT]
+        return {
+            stage: (self.stamps[stage] - start) / 1000
+            for stage in STAGES
+            if stage in self.stamps
+        }
+
+
+class OrderLifecycleTracer:
+    """Follows orders from submitOrder to their first websocket event.
+
+    Pass it as `tracer` to an Account and `attach` it to the WebSocketClient
+    of the same account. Events are matched by order id, or by client order
+    id when the event arrives before the REST response.
+
+    Args:
+        max_traces: Completed traces kept for percentiles.
+        max_pending: Orders waiting for their websocket event, the oldest
+            are completed without an event stamp beyond this.
+    """
+
+    def __init__(self, max_traces: int = 10000, max_pending: int = 10000) -> None:
+        self.completed = deque(maxlen=max_traces)
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[str, OrderTrace]" = OrderedDict()
+        self._by_client_id: Dict[str, OrderTrace] = {}
+        # Events seen before the order id was known, order id -> perf_counter_ns
+        self._early: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, market_id: str, client_order_id: str = None) -> OrderTrace:
+        trace = OrderTrace(market_id, client_order_id)
+        if trace.client_order_id is not None:
+            with self._lock:
+                self._by_client_id[trace.client_order_id] = trace
+        return trace
+
+    def on_response(self, trace: OrderTrace, response: Any):
+        trace.stamp(RESPONSE)
+        order_id = response.get("id") if isinstance(response, dict) else None
+
+        with self._lock:
+            early = self._early.pop(order_id, None) if order_id else None
+            if early is not None:
+                trace.stamp(EVENT, early)
+            if order_id is None or EVENT in trace.stamps:
+                self._complete(trace)
+                return
+
+            trace.order_id = order_id
+            self._pending[order_id] = trace
+            while len(self._pending) > self.max_pending:
+                self._complete(self._pending.popitem(last=False)[1])
+
+    def on_error(self, trace: OrderTrace):
+        with self._lock:
+            self._complete(trace)
+
+    def discard(self, trace: OrderTrace):
+        """Forgets an order that was never sent."""
+        with self._lock:
+            if self._by_client_id.get(trace.client_order_id) is trace:
+                del self._by_client_id[trace.client_order_id]
+
+    def on_event(self, items: Iterable[Dict[str, Any]]):
+        """Stamps the orders referenced by an openOrders or trades event."""
+        now = time.perf_counter_ns()
+        with self._lock:
+            for item in items:
+                order_ids = [item[k] for k in EVENT_ORDER_KEYS if item.get(k)]
+                trace = None
+                for order_id in order_ids:
+                    trace = self._pending.pop(order_id, None)
+                    if trace is not None:
+                        break
+
+                if trace is None:
+                    client_order_id = item.get("clientOrderId")
+                    trace = self._by_client_id.get(client_order_id)
+                    if trace is None:
+                        if order_ids:
+                            self._remember_early(order_ids[0], now)
+                        continue
+                    if RESPONSE not in trace.stamps:
+                        # Response still in flight, it completes the trace
+                        trace.stamp(EVENT, now)
+                        continue
+                    self._pending.pop(trace.order_id, None)
+
+                trace.stamp(EVENT, now)
+                self._complete(trace)
+
+    def _remember_early(self, order_id: str, at_ns: int):
+        self._early[order_id] = at_ns
+        while len(self._early) > self.max_pending:
+            self._early.popitem(last=False)
+
+    def _complete(self, trace: OrderTrace):
+        if trace.client_order_id is not None:
+            if self._by_client_id.get(trace.client_order_id) is trace:
+                del self._by_client_id[trace.client_order_id]
+        self.completed.append(trace)
+
+    def attach(self, client: "websocket.WebSocketClient"):
+        async def on_orders(data):
+            self.on_event(data if isinstance(data, list) else [data])
+
+        client.on(websocket.WebSocketClientEvent.OpenOrders, on_orders)
+        client.on(websocket.WebSocketClientEvent.Trades, on_orders)
+
+    def export(self, percentiles: Iterable[float] = (50, 90, 99)) -> Dict[str, Any]:
+        """Latency from submitOrder to each stage, per market, in microseconds.
+
+        Returns:
+            Dict[str, Any]: {market: {stage: {"count", "p50", ..., "max"}}}
+        """
+        samples: Dict[str, Dict[str, List[float]]] = {}
+        with self._lock:
+            traces = list(self.completed)
+        for trace in traces:
+            market = samples.setdefault(trace.market_id, {})
+            for stage, elapsed in trace.elapsed_us().items():
+                market.setdefault(stage, []).append(elapsed)
+
+        report = {}
+        for market_id, stages in samples.items():
+            report[market_id] = {}
+            for stage, values in stages.items():
+                values.sort()
+                last = len(values) - 1
+                summary = {"count": len(values)}
+                for p in percentiles:
+                    summary[f"p{p:g}"] = values[round(p / 100 * last)]
+                summary["max"] = values[-1]
+                report[market_id][stage] = summary
+        return report
@@ -0,0 +1,47 @@
+import importlib
+import sys
+from typing import Any
+
+
+class LazyModule:
+    """Stands in for a module until one of its attributes is first used."""
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str) -> Any:
+    """Returns `name` if it is already imported, a LazyModule otherwise.
+
+    Signer backends and chain libraries (algosdk, eth_account, pycryptodome)
+    and the transport libraries take most of the SDK import time, so they are
+    only imported the first time they are actually used.
+
+    Args:
+        name (str): Absolute module name, e.g. "algosdk.abi".
+
+    Returns:
+        Any: The module or a proxy that imports it on first attribute access.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
@@ -0,0 +1,261 @@
+import time
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional
+
+ORDER_TYPES = ("limit", "market")
+ORDER_SIDES = ("buy", "sell")
+
+# Error codes
+UNKNOWN_MARKET = "UNKNOWN_MARKET"
+MISSING_FIELD = "MISSING_FIELD"
+INVALID_TYPE = "INVALID_TYPE"
+INVALID_SIDE = "INVALID_SIDE"
+INVALID_NUMBER = "INVALID_NUMBER"
+NOT_POSITIVE = "NOT_POSITIVE"
+TICK_SIZE = "TICK_SIZE"
+LOT_SIZE = "LOT_SIZE"
+DECIMALS = "DECIMALS"
+MIN_QUANTITY = "MIN_QUANTITY"
+MAX_QUANTITY = "MAX_QUANTITY"
+MIN_NOTIONAL = "MIN_NOTIONAL"
+MAX_NOTIONAL = "MAX_NOTIONAL"
+EXPIRED = "EXPIRED"
+
+_ZERO = Decimal(0)
+
+
+class OrderValidationError(ValueError):
+    """An order that the exchange would reject.
+
+    Attributes:
+        market_id: Market of the order.
+        field: Order parameter at fault, e.g. "price".
+        code: One of the error codes of this module, e.g. TICK_SIZE.
+        value: Offending value.
+        limit: Rule the value broke, e.g. the tick size.
+        index: Position of the order in a batch.
+    """
+
+    def __init__(
+        self,
+        market_id: str,
+        field: str,
+        code: str,
+        value: Any = None,
+        limit: Any = None,
+        index: int = None,
+    ):
+        self.market_id = market_id
+        self.field = field
+        self.code = code
+        self.value = value
+        self.limit = limit
+        self.index = index
+        super().__init__(self._message())
+
+    def _message(self) -> str:
+        where = f"order {self.index} " if self.index is not None else ""
+        message = f"{where}{self.market_id}: {self.code} {self.field}={self.value!r}"
+        if self.limit is not None:
+            message += f" (rule {self.limit})"
+        return message
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "marketId": self.market_id,
+            "field": self.field,
+            "code": self.code,
+            "value": self.value,
+            "limit": None if self.limit is None else str(self.limit),
+            "index": self.index,
+        }
+
+
+def _decimal(value: Any) -> Optional[Decimal]:
+    try:
+        number = Decimal(value) if not isinstance(value, float) else Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return number if number.is_finite() else None
+
+
+def _optional_decimal(info: Dict[str, Any], key: str) -> Optional[Decimal]:
+    value = info.get(key)
+    return None if value is None else Decimal(str(value))
+
+
+class MarketRules:
+    """Checks of one market, compiled from its metadata."""
+
+    __slots__ = (
+        "market_id",
+        "price_increment",
+        "quantity_increment",
+        "min_quantity",
+        "max_quantity",
+        "min_notional",
+        "max_notional",
+        "base_step",
+    )
+
+    def __init__(
+        self,
+        market_id: str,
+        market_info: Dict[str, Any],
+        instruments_info: Dict[str, Any],
+    ) -> None:
+        self.market_id = market_id
+        self.price_increment = _optional_decimal(market_info, "priceIncrement")
+        self.quantity_increment = _optional_decimal(market_info, "quantityIncrement")
+        self.min_quantity = _optional_decimal(market_info, "minQuantity")
+        self.max_quantity = _optional_decimal(market_info, "maxQuantity")
+        self.min_notional = _optional_decimal(market_info, "minNotional")
+        self.max_notional = _optional_decimal(market_info, "maxNotional")
+
+        # Smallest base amount representable on chain
+        base = instruments_info.get(market_info["baseInstrument"]["id"], {})
+        self.base_step = (
+            Decimal(1).scaleb(-base["asaDecimals"]) if "asaDecimals" in base else None
+        )
+
+    def errors(
+        self, order: Dict[str, Any], now: int = None
+    ) -> List[OrderValidationError]:
+        market_id = self.market_id
+        errors = []
+
+        def fail(field, code, value=None, limit=None):
+            errors.append(OrderValidationError(market_id, field, code, value, limit))
+
+        order_type = order.get("type")
+        if order_type not in ORDER_TYPES:
+            fail("type", INVALID_TYPE, order_type, ORDER_TYPES)
+        side = order.get("side")
+        if side not in ORDER_SIDES:
+            fail("side", INVALID_SIDE, side, ORDER_SIDES)
+
+        amount = self._positive(order, "amount", fail)
+        if amount is not None:
+            if self.quantity_increment and amount % self.quantity_increment:
+                fail("amount", LOT_SIZE, order["amount"], self.quantity_increment)
+            elif self.base_step and amount % self.base_step:
+                fail("amount", DECIMALS, order["amount"], self.base_step)
+            if self.min_quantity is not None and amount < self.min_quantity:
+                fail("amount", MIN_QUANTITY, order["amount"], self.min_quantity)
+            if self.max_quantity is not None and amount > self.max_quantity:
+                fail("amount", MAX_QUANTITY, order["amount"], self.max_quantity)
+
+        if order_type == "limit":
+            price = self._positive(order, "price", fail)
+            if price is not None:
+                if self.price_increment and price % self.price_increment:
+                    fail("price", TICK_SIZE, order["price"], self.price_increment)
+                if amount is not None:
+                    notional = amount * price
+                    if self.min_notional is not None and notional < self.min_notional:
+                        fail("price", MIN_NOTIONAL, str(notional), self.min_notional)
+                    if self.max_notional is not None and notional > self.max_notional:
+                        fail("price", MAX_NOTIONAL, str(notional), self.max_notional)
+
+        for field in ("maxBorrow", "maxRepay"):
+            if field in order:
+                value = _decimal(order[field])
+                if value is None or value < _ZERO:
+                    fail(field, INVALID_NUMBER, order[field])
+
+        expires_on = order.get("expiresOn")
+        if expires_on is not None:
+            now = int(time.time()) if now is None else now
+            if not isinstance(expires_on, int) or expires_on <= now:
+                fail("expiresOn", EXPIRED, expires_on, now)
+
+        return errors
+
+    @staticmethod
+    def _positive(order: Dict[str, Any], field: str, fail) -> Optional[Decimal]:
+        if field not in order or order[field] is None:
+            fail(field, MISSING_FIELD)
+            return None
+        value = _decimal(order[field])
+        if value is None:
+            fail(field, INVALID_NUMBER, order[field])
+            return None
+        if value <= _ZERO:
+            fail(field, NOT_POSITIVE, order[field])
+            return None
+        return value
+
+
+class OrderValidator:
+    """Pre-trade checks built from the exchange metadata.
+
+    Rules are compiled per market on first use, so orders that the server
+    would reject (unknown market, off the tick or lot grid, size or notional
+    out of bounds) never leave the process.
+
+    Args:
+        instrumentsInfo: Instruments by id, as loaded by C3Exchange.
+        marketsInfo: Markets by id, as loaded by C3Exchange.
+        overrides: Extra market fields by market id, e.g. minNotional.
+    """
+
+    def __init__(
+        self,
+        instrumentsInfo: Dict[str, Any],
+        marketsInfo: Dict[str, Any],
+        overrides: Dict[str, Dict[str, Any]] = None,
+    ) -> None:
+        self.instrumentsInfo = instrumentsInfo
+        self.marketsInfo = marketsInfo
+        self.overrides = overrides or {}
+        self.rules: Dict[str, MarketRules] = {}
+
+    def market_rules(self, market_id: str) -> Optional[MarketRules]:
+        rules = self.rules.get(market_id)
+        if rules is None:
+            market_info = self.marketsInfo.get(market_id)
+            if market_info is None:
+                return None
+            rules = MarketRules(
+                market_id,
+                {**market_info, **self.overrides.get(market_id, {})},
+                self.instrumentsInfo,
+            )
+            self.rules[market_id] = rules
+        return rules
+
+    def errors(
+        self, order: Dict[str, Any], now: int = None
+    ) -> List[OrderValidationError]:
+        """Every rule the order breaks, empty when it is valid."""
+        market_id = order.get("marketId")
+        rules = self.market_rules(market_id)
+        if rules is None:
+            return [
+                OrderValidationError(market_id, "marketId", UNKNOWN_MARKET, market_id)
+            ]
+        return rules.errors(order, now)
+
+    def validate(self, order: Dict[str, Any]):
+        """Raises the first OrderValidationError of an order."""
+        errors = self.errors(order)
+        if errors:
+            raise errors[0]
+
+    def validate_batch(
+        self, orders: Iterable[Dict[str, Any]]
+    ) -> List[OrderValidationError]:
+        """Checks a whole ladder at once.
+
+        Returns:
+            List[OrderValidationError]: Errors of all orders, each with the
+                `index` of its order. Empty when every order is valid.
+        """
+        now = int(time.time())
+        errors = []
+        for index, order in enumerate(orders):
+            for error in self.errors(order, now):
+                error.index = index
+                error.args = (error._message(),)
+                errors.append(error)
+        return errors
@@ -1,12 +1,20 @@
+from __future__ import annotations
+
 import asyncio
+import inspect
+import itertools
 import json
 import logging
 import time
 from enum import Enum
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 from urllib.parse import urlencode, urljoin
 
-import websockets
+from c3.utils.lazy import lazy_import
+from c3.utils.serialization import json_loads
+from c3.websocket_health import ConnectionHealth
+
+websockets = lazy_import("websockets")
 
 logger = logging.getLogger("websocket-client")
 
@@ -49,22 +57,128 @@ async def send_ws_message(websocket: websockets.WebSocketClientProtocol, message
     logger.debug(f"Sending message {str_message}")
     await websocket.send(str_message)
 
-async def send_ping(websocket: websockets.WebSocketClientProtocol):
-    while True:
-        await websocket.ping()
-        await asyncio.sleep(10)  # Send a ping every 10 seconds
+
+class WebSocketRequestError(Exception):
+    def __init__(self, request_id: str, data: Any):
+        super().__init__(f"Request {request_id} failed: {data}")
+        self.request_id = request_id
+        self.data = data
+
+
+class PendingRequests:
+    """Correlates websocket requests with their responses.
+
+    Every request gets a unique id and a future. The future is removed when it
+    resolves, fails or times out, so abandoned requests do not accumulate.
+    """
+
+    def __init__(self, default_timeout: float = 10) -> None:
+        self.default_timeout = default_timeout
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._sequence = itertools.count(1)
+        # NOTE: The creation time keeps ids of different clients apart
+        self._prefix = now_ms()
+
+    def __len__(self) -> int:
+        return len(self._futures)
+
+    def __contains__(self, request_id: str) -> bool:
+        return request_id in self._futures
+
+    def new_id(self, name: str) -> str:
+        return f"{name}-{self._prefix}-{next(self._sequence)}"
+
+    def register(self, request_id: str) -> asyncio.Future:
+        if request_id in self._futures:
+            raise ValueError(f"Request {request_id} is already pending")
+        fut = asyncio.get_running_loop().create_future()
+        self._futures[request_id] = fut
+        return fut
+
+    def resolve(self, request_id: str, result: Any) -> bool:
+        fut = self._futures.pop(request_id, None)
+        if fut is None or fut.done():
+            return False
+        fut.set_result(result)
+        return True
+
+    def reject(self, request_id: str, error: BaseException) -> bool:
+        fut = self._futures.pop(request_id, None)
+        if fut is None or fut.done():
+            return False
+        fut.set_exception(error)
+        return True
+
+    def discard(self, request_id: str):
+        fut = self._futures.pop(request_id, None)
+        if fut is not None:
+            fut.cancel()
+
+    def reject_all(self, error: BaseException):
+        for request_id in list(self._futures):
+            self.reject(request_id, error)
+
+    async def wait(
+        self, request_id: str, fut: asyncio.Future, timeout: float = None
+    ) -> Any:
+        # NOTE: A reply may resolve and pop the request before this runs, so
+        # the future returned by register is awaited, not looked up again
+        try:
+            return await asyncio.wait_for(
+                fut, timeout if timeout is not None else self.default_timeout
+            )
+        finally:
+            self._futures.pop(request_id, None)
 
 class WebSocketClient:
-    def __init__(self, url, account_id, jwt_token):
+    def __init__(
+        self,
+        url,
+        account_id,
+        jwt_token,
+        compression: Optional[str] = "deflate",
+        raw_frames: bool = True,
+        loads: Callable = json_loads,
+        ping_interval: float = 5.0,
+        ping_timeout: float = 10.0,
+        stale_after: Optional[float] = None,
+        reconnect_delay: float = 5.0,
+        recorder=None,
+    ):
+        """
+        Args:
+            url: C3 API url, the websocket url is derived from it.
+            account_id: Account to receive user events for.
+            jwt_token: Token returned by the login.
+            compression: "deflate" to negotiate permessage-deflate, None to disable it.
+            raw_frames: Hand text frames to `loads` as bytes, without decoding
+                them to str first. Needs websockets >= 14, ignored otherwise.
+            loads: JSON parser, must accept str and bytes. Uses orjson when installed.
+            ping_interval: Seconds between heartbeat pings.
+            ping_timeout: Seconds to wait for a pong before reconnecting.
+            stale_after: Reconnect when a subscribed topic has been quiet for
+                this many seconds. None disables stale detection.
+            reconnect_delay: Seconds to wait before reconnecting.
+            recorder: Receives every incoming frame through `record(frame)`,
+                see c3.recorder.SessionRecorder.
+        """
         self.listeners = {}
         self.url = url
         self.jwt_token = jwt_token
         self.socket = None
         self.account_id = account_id
         self.socket_task: Optional[asyncio.Task] = None
+        self.restore_task: Optional[asyncio.Task] = None
         self.running = False
         self.connected = False
-        self.requests: dict = {}
+        self.requests = PendingRequests()
+        self.compression = compression
+        self.raw_frames = raw_frames
+        self.loads = loads
+        self.health = ConnectionHealth(ping_interval, ping_timeout, stale_after)
+        self.subscriptions = set()
+        self.reconnect_delay = reconnect_delay
+        self.recorder = recorder
 
     def bind(self):
         def create_handler(wse: WebSocketClientEvent):
@@ -80,33 +194,39 @@ class WebSocketClient:
         print("handle_login", login_message)
 
     def handle_response(self, response_message: dict):
-        try:
-            logger.debug(f"handle_response: {response_message}")
-            rsp_id = response_message["id"]
-            fut: asyncio.Future = self.requests[rsp_id]
-            if fut is not None:
-                fut.set_result(response_message["data"])
-        except Exception as e:
-            logger.error(e)
+        rsp_id = response_message.get("id")
+        if not self.requests.resolve(rsp_id, response_message.get("data")):
+            logger.debug(f"handle_response: no pending request for {rsp_id}")
+
+    def handle_error(self, error_message: dict):
+        rsp_id = error_message.get("id")
+        error = WebSocketRequestError(rsp_id, error_message.get("data"))
+        if not self.requests.reject(rsp_id, error):
+            logger.error(error)
 
     def handle_ack(self, ack_message):
         print(f"handle_ack {ack_message}")
 
     def handle_event_message(self, event_message):
+        topic = event_message.get("topic")
+        if topic is not None:
+            self.health.record_message(topic)
+
         event_type = event_message.get("subject")
         if event_type is not None:
             self.emit(event_type, event_message.get("data"))
 
-    def handle_message(self, message):
-        if not isinstance(message, str):
-            return
+    def handle_message(self, message: Union[str, bytes, bytearray, memoryview]):
+        # Text and binary frames are parsed as they come, bytes are never decoded to str
         try:
-            obj: dict = json.loads(message)
-            logger.debug(f"Received Message: f{obj}")
-        except json.JSONDecodeError:
+            obj: dict = self.loads(message)
+        except (ValueError, TypeError):
             print("Error: Received message is not valid JSON")
             return
 
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Received Message: {obj}")
+
         message_type = obj["type"]
         if message_type == MessageType.LOGIN.value:
             self.handle_login(obj)
@@ -118,6 +238,11 @@ class WebSocketClient:
             self.handle_response(obj)
         elif message_type == MessageType.ACK.value:
             self.handle_ack(obj)
+        elif message_type == MessageType.ERROR.value:
+            self.handle_error(obj)
+
+    def heartbeat(self):
+        self.health.record_pong()
 
     def on_error(self, ws, error):
         print(f"Error: {error}")
@@ -125,10 +250,13 @@ class WebSocketClient:
     def on_close(self, ws, close_status_code, close_msg):
         print("### closed ###")
         self.connected = False
+        self.health.on_disconnect()
 
     def on_open(self, ws):
         print("Connection opened...")
         self.connected = True
+        self.health.on_connect(self.subscriptions)
+        self.emit(WebSocketClientEvent.Connect.value)
 
     def start(self):
         if self.socket_task is None:
@@ -143,29 +271,104 @@ class WebSocketClient:
         if self.socket_task is not None and not self.socket_task.cancelling():
             self.socket_task.cancel()
 
+    async def receive_raw(self, websocket: websockets.WebSocketClientProtocol):
+        # NOTE: websockets >= 14 can return text frames as undecoded bytes
+        try:
+            while True:
+                yield await websocket.recv(decode=False)
+        except websockets.ConnectionClosedOK:
+            return
+
     async def listen_messages(self, websocket: websockets.WebSocketClientProtocol):
-        async for message in websocket:
+        messages = websocket
+        if self.raw_frames and "decode" in inspect.signature(websocket.recv).parameters:
+            messages = self.receive_raw(websocket)
+
+        recorder = self.recorder
+        async for message in messages:
+            if recorder is not None:
+                recorder.record(message)
             try:
                 self.handle_message(message)
             except Exception as e:
                 logger.error(e)
 
+    async def heartbeat_loop(self, websocket: websockets.WebSocketClientProtocol):
+        """Pings the server and watches subscribed topics, returns when the
+        connection should be dropped and opened again."""
+        health = self.health
+        while True:
+            await asyncio.sleep(health.ping_interval)
+
+            started = time.perf_counter()
+            pong_waiter = await websocket.ping()
+            try:
+                await asyncio.wait_for(pong_waiter, health.ping_timeout)
+            except asyncio.TimeoutError:
+                health.ping_timeouts += 1
+                logger.warning(f"No pong within {health.ping_timeout}s, reconnecting")
+                return
+            health.record_rtt(time.perf_counter() - started)
+
+            stale = health.stale_topics(self.subscriptions)
+            if stale:
+                health.stale_reconnects += 1
+                logger.warning(f"Stale topics {stale}, reconnecting")
+                return
+
+    @staticmethod
+    def _log_task_error(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Task {task.get_name()} failed: {task.exception()!r}")
+
+    async def restore_subscriptions(self):
+        # NOTE: Subscriptions do not survive a reconnect, the server starts from none
+        topics = list(self.subscriptions)
+        results = await asyncio.gather(
+            *(
+                self.request(RequestMethod.SUBSCRIBE, topic=topic)
+                for topic in topics
+            ),
+            return_exceptions=True,
+        )
+        for topic, result in zip(topics, results):
+            if isinstance(result, Exception):
+                logger.error(f"Could not subscribe again to {topic}: {result!r}")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Connection health, RTT histogram and per topic message ages."""
+        return {
+            **self.health.metrics(),
+            "subscriptions": len(self.subscriptions),
+            "pending_requests": len(self.requests),
+        }
+
     async def run_websocket_client(self):
         params = {"accountId": self.account_id, "token": self.jwt_token}
         query_string = urlencode(params)
         uri = urljoin(self.url.replace("http", "ws"), "/v1/ws?" + query_string)
-        reconnect_delay = 5
         while True:
             try:
+                # NOTE: Keepalive pings are sent by heartbeat_loop, not by websockets
                 async with websockets.connect(
-                    uri, ping_timeout=10, ping_interval=1
+                    uri,
+                    ping_interval=None,
+                    ping_timeout=None,
+                    compression=self.compression,
                 ) as websocket:
                     self.socket = websocket
-                    ping_task = asyncio.create_task(send_ping(websocket))
+                    self.on_open(websocket)
+                    heartbeat_task = asyncio.create_task(self.heartbeat_loop(websocket))
                     receive_task = asyncio.create_task(self.listen_messages(websocket))
+                    if self.subscriptions:
+                        self.restore_task = asyncio.create_task(
+                            self.restore_subscriptions()
+                        )
+                        self.restore_task.add_done_callback(self._log_task_error)
                     # Wait for either task to complete
                     done, pending = await asyncio.wait(
-                        [ping_task, receive_task], return_when=asyncio.FIRST_COMPLETED
+                        [heartbeat_task, receive_task],
+                        return_when=asyncio.FIRST_COMPLETED,
                     )
 
                     # If we're here, one of the tasks is done. Cancel the other one.
@@ -177,20 +380,22 @@ class WebSocketClient:
                         if task.exception():
                             print(f"Task raised an exception: {task.exception()}")
 
-            except websockets.exceptions.ConnectionClosed as e:
+                    self.requests.reject_all(ConnectionError("websocket disconnected"))
+                    self.on_close(websocket, websocket.close_code, websocket.close_reason)
+
+            except websockets.ConnectionClosed as e:
                 logger.error(e)
                 await asyncio.sleep(5)
             except Exception as e:
                 print(f"Error running websocket: {e}")
-            print(f"Attempting to reconnect in {reconnect_delay} seconds...")
-            await asyncio.sleep(reconnect_delay)
+            if self.connected:
+                self.on_close(self.socket, None, None)
+            print(f"Attempting to reconnect in {self.reconnect_delay} seconds...")
+            await asyncio.sleep(self.reconnect_delay)
 
     async def run(self):
         await self.run_websocket_client()
 
-    def connected(self):
-        return self.connected
-
     def check_socket_connection(self):
         if self.socket is None:
             raise Exception("socket is not initialized")
@@ -198,41 +403,77 @@ class WebSocketClient:
         if not self.connected:
             raise Exception("socket is not connected")
 
-    async def subscribe_to_market(self, market_id: str, topic: TopicType):
-        topic = f"{topic.value}:{market_id}"
-        subscription_message = {
-            "id": f"subscribe-${now_ms()}",
+    async def request(
+        self, method: RequestMethod, timeout: float = None, **fields
+    ) -> Any:
+        """Sends a request and waits for the response with the same id.
+
+        Raises:
+            asyncio.TimeoutError: No response within `timeout` seconds.
+            WebSocketRequestError: The server answered with an error.
+            ConnectionError: The connection dropped while waiting.
+        """
+        request_id = self.requests.new_id(method.value.lower())
+        message = {
+            "id": request_id,
             "method": f"{MessageType.REQUEST.value}",
-            "type": f"{RequestMethod.SUBSCRIBE.value}",
-            "response": False,
-            "topic": topic,
+            "type": f"{method.value}",
+            "response": True,
+            **fields,
         }
-        await send_ws_message(self.socket, subscription_message)
 
-    async def unsubscribe_from_market(self, market_id: str, topic: TopicType):
+        fut = self.requests.register(request_id)
+        try:
+            await send_ws_message(self.socket, message)
+        except BaseException:
+            self.requests.discard(request_id)
+            raise
+        response = await self.requests.wait(request_id, fut, timeout)
+
+        if method == RequestMethod.SUBSCRIBE:
+            self.subscriptions.add(fields["topic"])
+            self.health.watch(fields["topic"])
+        elif method == RequestMethod.UNSUBSCRIBE:
+            self.subscriptions.discard(fields["topic"])
+            self.health.forget(fields["topic"])
+        return response
+
+    async def subscribe(
+        self, topics: Iterable[str], timeout: float = None
+    ) -> List[Any]:
+        """Subscribes to many topics at once, the requests are in flight concurrently."""
+        return await asyncio.gather(
+            *(
+                self.request(RequestMethod.SUBSCRIBE, timeout, topic=topic)
+                for topic in topics
+            )
+        )
+
+    async def unsubscribe(
+        self, topics: Iterable[str], timeout: float = None
+    ) -> List[Any]:
+        return await asyncio.gather(
+            *(
+                self.request(RequestMethod.UNSUBSCRIBE, timeout, topic=topic)
+                for topic in topics
+            )
+        )
+
+    async def subscribe_to_market(
+        self, market_id: str, topic: TopicType, timeout: float = None
+    ):
         topic = f"{topic.value}:{market_id}"
-        unsubscription_message = {
-            "id": f"unsubscribe-${now_ms()}",
-            "method": f"{MessageType.REQUEST.value}",
-            "type": f"{RequestMethod.UNSUBSCRIBE.value}",
-            "response": False,
-            "topic": topic,
-        }
-        await send_ws_message(self.socket, unsubscription_message)
+        return await self.request(RequestMethod.SUBSCRIBE, timeout, topic=topic)
 
-    async def list_subscriptions(self):
-        list_subscription_message = {
-            "id": f"listSubscriptions-{now_ms()}",
-            "method": f"{MessageType.REQUEST.value}",
-            "type": f"{RequestMethod.LIST_SUBSCRIPTIONS.value}",
-            "response": False,
-        }
-        fut = asyncio.Future()
-        self.requests[list_subscription_message["id"]] = fut
-        await send_ws_message(self.socket, list_subscription_message)
+    async def unsubscribe_from_market(
+        self, market_id: str, topic: TopicType, timeout: float = None
+    ):
+        topic = f"{topic.value}:{market_id}"
+        return await self.request(RequestMethod.UNSUBSCRIBE, timeout, topic=topic)
+
+    async def list_subscriptions(self, timeout: float = None):
         try:
-            result = await asyncio.wait_for(fut, timeout=10)
-            return result
+            return await self.request(RequestMethod.LIST_SUBSCRIPTIONS, timeout)
         except asyncio.TimeoutError:
             print("List subscription request timed out")
             return None
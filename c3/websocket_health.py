@@ -0,0 +1,138 @@
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class RollingHistogram:
+    """Keeps the last `size` samples and answers percentile queries on them."""
+
+    def __init__(self, size: int = 1024) -> None:
+        self.samples = deque(maxlen=size)
+        self.total = 0
+
+    def add(self, value: float):
+        self.samples.append(value)
+        self.total += 1
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.samples:
+            return {"count": 0, "total": self.total}
+
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {
+            "count": len(ordered),
+            "total": self.total,
+            "min": ordered[0],
+            "mean": sum(ordered) / len(ordered),
+            "p50": ordered[round(0.5 * last)],
+            "p90": ordered[round(0.9 * last)],
+            "p99": ordered[round(0.99 * last)],
+            "max": ordered[-1],
+            "last": self.samples[-1],
+        }
+
+
+class ConnectionHealth:
+    """Heartbeat and feed freshness state of one WebSocketClient.
+
+    Args:
+        ping_interval: Seconds between pings.
+        ping_timeout: Seconds to wait for a pong before the connection is
+            considered dead.
+        stale_after: Seconds without a message after which a subscribed
+            topic is stale. None disables stale detection.
+        window: Number of RTT samples kept in the histogram.
+    """
+
+    def __init__(
+        self,
+        ping_interval: float = 5.0,
+        ping_timeout: float = 10.0,
+        stale_after: Optional[float] = None,
+        window: int = 1024,
+    ) -> None:
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.stale_after = stale_after
+
+        self.rtt = RollingHistogram(window)
+        self.last_message_at: Dict[str, float] = {}
+        self.message_counts: Dict[str, int] = {}
+        self.last_pong_at: Optional[float] = None
+        self.connected_at: Optional[float] = None
+
+        self.connects = 0
+        self.ping_timeouts = 0
+        self.stale_reconnects = 0
+
+    def on_connect(self, topics: Iterable[str] = ()):
+        now = time.monotonic()
+        self.connected_at = now
+        self.connects += 1
+        for topic in topics:
+            self.last_message_at[topic] = now
+
+    def on_disconnect(self):
+        self.connected_at = None
+
+    def record_message(self, topic: str):
+        self.last_message_at[topic] = time.monotonic()
+        self.message_counts[topic] = self.message_counts.get(topic, 0) + 1
+
+    def record_rtt(self, seconds: float):
+        self.rtt.add(seconds)
+        self.last_pong_at = time.monotonic()
+
+    def record_pong(self):
+        self.last_pong_at = time.monotonic()
+
+    def watch(self, topic: str):
+        # NOTE: A new topic gets a full stale_after period to deliver a first message
+        self.last_message_at.setdefault(topic, time.monotonic())
+
+    def forget(self, topic: str):
+        self.last_message_at.pop(topic, None)
+        self.message_counts.pop(topic, None)
+
+    def stale_topics(self, topics: Iterable[str], now: float = None) -> List[str]:
+        if self.stale_after is None:
+            return []
+
+        now = time.monotonic() if now is None else now
+        return [
+            topic
+            for topic in topics
+            if now - self.last_message_at.get(topic, now) > self.stale_after
+        ]
+
+    def metrics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "connected": self.connected_at is not None,
+            "uptime": now - self.connected_at if self.connected_at else 0.0,
+            "connects": self.connects,
+            "ping_timeouts": self.ping_timeouts,
+            "stale_reconnects": self.stale_reconnects,
+            "rtt": self.rtt.summary(),
+            "since_last_pong": (
+                now - self.last_pong_at if self.last_pong_at is not None else None
+            ),
+            "topics": {
+                topic: {
+                    "messages": self.message_counts.get(topic, 0),
+                    "since_last_message": now - last,
+                }
+                for topic, last in self.last_message_at.items()
+            },
+        }
@@ -0,0 +1,420 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from c3.marketdata import market_of
+from c3.websocket import TopicType, WebSocketClient, WebSocketClientEvent
+from c3.websocket_health import RollingHistogram
+
+logger = logging.getLogger("websocket-pool")
+
+# Events of a market, taken only from the shard the market is assigned to.
+# Trades are also the account's fills, which reach every connection.
+MARKET_EVENTS = {
+    WebSocketClientEvent.Level1.value,
+    WebSocketClientEvent.level2Depth20.value,
+    WebSocketClientEvent.bookDelta.value,
+    WebSocketClientEvent.Trades.value,
+}
+# Events about one connection, dispatched from every shard with its index
+CONNECTION_EVENTS = {
+    WebSocketClientEvent.Connect.value,
+}
+
+METRICS_INTERVAL = 1.0
+# Seconds a worker process has to apply a subscribe or unsubscribe
+COMMAND_TIMEOUT = 10.0
+
+Dispatch = Callable[[str, tuple, float], None]
+
+
+async def subscribe_topics(client: WebSocketClient, topics: Iterable[str]):
+    # NOTE: Before the socket is up the topics are left for restore_subscriptions
+    if client.connected:
+        await client.subscribe(topics)
+    else:
+        client.subscriptions.update(topics)
+
+
+async def unsubscribe_topics(client: WebSocketClient, topics: Iterable[str]):
+    if client.connected:
+        await client.unsubscribe(topics)
+    else:
+        client.subscriptions.difference_update(topics)
+
+
+class _DispatchingClient(WebSocketClient):
+    """WebSocketClient that hands every event to a callback instead of listeners."""
+
+    def __init__(self, dispatch: Dispatch, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dispatch = dispatch
+
+    def emit(self, event_name: str, *args, **kwargs):
+        self.dispatch(event_name, args, time.time())
+
+
+class _ClientShard:
+    """Shard running its WebSocketClient on the pool's event loop."""
+
+    def __init__(self, dispatch: Dispatch, url, account_id, jwt_token, **kwargs):
+        self.client = _DispatchingClient(dispatch, url, account_id, jwt_token, **kwargs)
+
+    def start(self):
+        self.client.start()
+
+    def stop(self):
+        self.client.stop()
+
+    async def subscribe(self, topics: List[str]):
+        await subscribe_topics(self.client, topics)
+
+    async def unsubscribe(self, topics: List[str]):
+        await unsubscribe_topics(self.client, topics)
+
+    def health(self) -> Dict[str, Any]:
+        return self.client.metrics()
+
+
+def _shard_worker(url, account_id, jwt_token, kwargs, commands, events):
+    asyncio.run(
+        _shard_worker_main(url, account_id, jwt_token, kwargs, commands, events)
+    )
+
+
+async def _shard_worker_main(url, account_id, jwt_token, kwargs, commands, events):
+    def dispatch(event_name, args, received_at):
+        events.put((event_name, args, received_at))
+
+    client = _DispatchingClient(dispatch, url, account_id, jwt_token, **kwargs)
+    client.start()
+
+    async def push_metrics():
+        while True:
+            events.put(("__metrics__", (client.metrics(),), time.time()))
+            await asyncio.sleep(METRICS_INTERVAL)
+
+    metrics_task = asyncio.create_task(push_metrics())
+    try:
+        while True:
+            command, topics, sequence = await asyncio.to_thread(commands.get)
+            try:
+                if command == "subscribe":
+                    await subscribe_topics(client, topics)
+                elif command == "unsubscribe":
+                    await unsubscribe_topics(client, topics)
+                elif command == "stop":
+                    return
+            except Exception as e:
+                logger.error(f"{command} {topics} failed: {e!r}")
+            events.put(("__done__", (sequence,), time.time()))
+    finally:
+        metrics_task.cancel()
+        client.stop()
+
+
+class _ProcessShard:
+    """Shard running its WebSocketClient in a worker process.
+
+    Frames are parsed in the worker, events come back through a queue and
+    are dispatched on the pool's event loop.
+    """
+
+    def __init__(self, dispatch: Dispatch, url, account_id, jwt_token, **kwargs):
+        context = multiprocessing.get_context("spawn")
+        self.dispatch = dispatch
+        self.commands = context.Queue()
+        self.events = context.Queue()
+        self.process = context.Process(
+            target=_shard_worker,
+            args=(url, account_id, jwt_token, kwargs, self.commands, self.events),
+            daemon=True,
+        )
+        self.reader: Optional[threading.Thread] = None
+        self.last_health: Dict[str, Any] = {}
+        self._sequence = itertools.count()
+        self._pending: Dict[int, asyncio.Future] = {}
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self.process.start()
+        self.reader = threading.Thread(
+            target=self._read_events,
+            args=(loop,),
+            name="websocket-pool-reader",
+            daemon=True,
+        )
+        self.reader.start()
+
+    def _read_events(self, loop: asyncio.AbstractEventLoop):
+        while True:
+            item = self.events.get()
+            if item is None:
+                return
+            event_name, args, received_at = item
+            if event_name == "__metrics__":
+                self.last_health = args[0]
+            elif event_name == "__done__":
+                loop.call_soon_threadsafe(self._done, args[0])
+            else:
+                loop.call_soon_threadsafe(self.dispatch, event_name, args, received_at)
+
+    def _done(self, sequence: int):
+        fut = self._pending.pop(sequence, None)
+        if fut is not None and not fut.done():
+            fut.set_result(None)
+
+    async def _command(self, command: str, topics: List[str]):
+        # NOTE: Returns once the worker applied it, as for in-process shards
+        sequence = next(self._sequence)
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[sequence] = fut
+        self.commands.put((command, topics, sequence))
+        try:
+            await asyncio.wait_for(fut, COMMAND_TIMEOUT)
+        finally:
+            self._pending.pop(sequence, None)
+
+    def stop(self):
+        self.commands.put(("stop", None, None))
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.events.put(None)
+
+    async def subscribe(self, topics: List[str]):
+        await self._command("subscribe", topics)
+
+    async def unsubscribe(self, topics: List[str]):
+        await self._command("unsubscribe", topics)
+
+    def health(self) -> Dict[str, Any]:
+        return self.last_health
+
+
+class WebSocketPool:
+    """Spreads market subscriptions over several websocket connections.
+
+    Every market lives on one shard, so a noisy market only delays the
+    markets sharing its connection. Listeners registered with `on` receive
+    the events of all shards, each market's from its own shard only.
+    Connect listeners get the index of the shard that connected. `rebalance` moves markets between shards
+    based on the message rates seen since the previous call.
+
+    Args:
+        url: C3 API url, as for WebSocketClient.
+        account_id: Account of the connections.
+        jwt_token: Token returned by the login.
+        shards: Number of connections.
+        processes: Run each connection in its own worker process so frames
+            are parsed in parallel.
+        imbalance: Rebalance only when the busiest shard receives more than
+            this many times the average rate.
+        rebalance_interval: Seconds between automatic rebalances, None to
+            only rebalance when `rebalance` is called.
+        **client_kwargs: Passed to every WebSocketClient.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        account_id: str,
+        jwt_token: str,
+        shards: int = 2,
+        processes: bool = False,
+        imbalance: float = 1.5,
+        rebalance_interval: Optional[float] = None,
+        **client_kwargs,
+    ):
+        shard_type = _ProcessShard if processes else _ClientShard
+        self.shards = [
+            shard_type(self._dispatcher(i), url, account_id, jwt_token, **client_kwargs)
+            for i in range(shards)
+        ]
+        self.imbalance = imbalance
+        self.rebalance_interval = rebalance_interval
+        self.listeners: Dict[str, Set[Callable]] = {}
+
+        self.assignment: Dict[str, int] = {}
+        self.market_topics: Dict[str, Set[str]] = {}
+        self.counts: Dict[str, int] = {}
+        self.rates: Dict[str, float] = {}
+        self._counted_since = time.monotonic()
+        self._rebalance_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        # Event timestamp to receive time, and receive time to dispatch, in ms
+        self.feed_lag = [RollingHistogram() for _ in range(shards)]
+        self.dispatch_lag = [RollingHistogram() for _ in range(shards)]
+
+    def _dispatcher(self, index: int) -> Dispatch:
+        def dispatch(event_name: str, args: tuple, received_at: float):
+            self._dispatch(index, event_name, args, received_at)
+
+        return dispatch
+
+    def _dispatch(self, index: int, event_name: str, args: tuple, received_at: float):
+        now = time.time()
+        if event_name in MARKET_EVENTS:
+            data = args[0] if args else None
+            market = market_of(data) if data else None
+            # NOTE: Fills reach every shard and a moved market is briefly on
+            # two, only the shard it is assigned to (or shard 0) passes it on
+            if self.assignment.get(market, 0) != index:
+                return
+            if market is not None:
+                self.counts[market] = self.counts.get(market, 0) + 1
+                timestamp = (
+                    data[0].get("timestamp")
+                    if isinstance(data, list)
+                    else data.get("timestamp")
+                )
+                if timestamp is not None:
+                    self.feed_lag[index].add(received_at * 1000 - timestamp)
+        elif event_name in CONNECTION_EVENTS:
+            args = (*args, index)
+        elif index != 0:
+            # User order events reach every connection of the account
+            return
+        self.dispatch_lag[index].add((now - received_at) * 1000)
+
+        for listener in self.listeners.get(event_name, ()):
+            asyncio.create_task(listener(*args))
+
+    def on(self, event: WebSocketClientEvent, handler=None):
+        def set_handler(h):
+            self.listeners.setdefault(event.value, set()).add(h)
+            return h
+
+        if handler is None:
+            return set_handler
+        set_handler(handler)
+
+    def start(self):
+        for shard in self.shards:
+            shard.start()
+        if self.rebalance_interval is not None:
+            self._rebalance_task = asyncio.create_task(self._run_rebalancer())
+
+    def stop(self):
+        if self._rebalance_task is not None:
+            self._rebalance_task.cancel()
+            self._rebalance_task = None
+        for shard in self.shards:
+            shard.stop()
+
+    async def _run_rebalancer(self):
+        while True:
+            await asyncio.sleep(self.rebalance_interval)
+            try:
+                await self.rebalance()
+            except Exception as e:
+                logger.error(f"Rebalance failed: {e!r}")
+
+    def shard_of(self, market_id: str) -> Optional[int]:
+        return self.assignment.get(market_id)
+
+    def _shard_loads(self, rates: Dict[str, float]) -> List[Tuple[float, int]]:
+        loads = [[0.0, 0] for _ in self.shards]
+        for market, index in self.assignment.items():
+            loads[index][0] += rates.get(market, 0.0)
+            loads[index][1] += 1
+        return [tuple(load) for load in loads]
+
+    async def subscribe_to_market(self, market_id: str, topic: TopicType):
+        """Subscribes to a market topic on the shard of the market. New
+        markets go to the shard with the lowest rate, then fewest markets."""
+        topic = f"{topic.value}:{market_id}"
+        async with self._lock:
+            index = self.assignment.get(market_id)
+            if index is None:
+                loads = self._shard_loads(self.rates)
+                index = min(range(len(self.shards)), key=lambda i: loads[i])
+                self.assignment[market_id] = index
+            self.market_topics.setdefault(market_id, set()).add(topic)
+            await self.shards[index].subscribe([topic])
+
+    async def unsubscribe_from_market(self, market_id: str, topic: TopicType):
+        topic = f"{topic.value}:{market_id}"
+        async with self._lock:
+            index = self.assignment.get(market_id)
+            if index is None:
+                return
+            topics = self.market_topics[market_id]
+            topics.discard(topic)
+            if not topics:
+                del self.market_topics[market_id]
+                del self.assignment[market_id]
+            await self.shards[index].unsubscribe([topic])
+
+    def _measure_rates(self) -> Dict[str, float]:
+        now = time.monotonic()
+        elapsed = max(now - self._counted_since, 1e-9)
+        self.rates = {
+            market: self.counts.get(market, 0) / elapsed for market in self.assignment
+        }
+        self.counts = {}
+        self._counted_since = now
+        return self.rates
+
+    async def rebalance(self) -> List[Tuple[str, int, int]]:
+        """Moves markets so every shard gets a similar message rate.
+
+        Returns:
+            List[Tuple[str, int, int]]: (market, from shard, to shard) of
+                every market moved.
+        """
+        async with self._lock:
+            rates = self._measure_rates()
+            shard_rates = [load[0] for load in self._shard_loads(rates)]
+            mean = sum(shard_rates) / len(shard_rates)
+            if mean == 0 or max(shard_rates) <= self.imbalance * mean:
+                return []
+
+            # Busiest markets first, each to the least loaded shard, staying put on ties
+            plan = {}
+            loads = [0.0] * len(self.shards)
+            for market in sorted(self.assignment, key=lambda m: -rates[m]):
+                current = self.assignment[market]
+                best = min(range(len(loads)), key=lambda i: (loads[i], i != current))
+                plan[market] = best
+                loads[best] += rates[market]
+
+            moves = []
+            for market, target in plan.items():
+                source = self.assignment[market]
+                if source == target:
+                    continue
+                topics = list(self.market_topics[market])
+                # NOTE: Subscribe before unsubscribing so the market is never
+                # uncovered. Events are taken from the assigned shard only, so
+                # the overlap is not dispatched twice.
+                await self.shards[target].subscribe(topics)
+                self.assignment[market] = target
+                await self.shards[source].unsubscribe(topics)
+                moves.append((market, source, target))
+
+            if moves:
+                logger.info(f"Rebalanced {moves}")
+            return moves
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        """Markets, message rate, lag and connection health of every shard."""
+        shards = []
+        for index, shard in enumerate(self.shards):
+            markets = sorted(m for m, i in self.assignment.items() if i == index)
+            shards.append(
+                {
+                    "shard": index,
+                    "markets": markets,
+                    "rate": sum(self.rates.get(m, 0.0) for m in markets),
+                    "feed_lag_ms": self.feed_lag[index].summary(),
+                    "dispatch_lag_ms": self.dispatch_lag[index].summary(),
+                    "health": shard.health(),
+                }
+            )
+        return shards
@@ -0,0 +1,329 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from c3.websocket import TopicType, WebSocketClientEvent
+from c3.websocket_health import RollingHistogram
+from c3.websocket_pool import _DispatchingClient, subscribe_topics, unsubscribe_topics
+
+logger = logging.getLogger("websocket-threaded")
+
+DEFAULT_QUEUE_SIZE = 65536
+
+
+class ThreadedEvent(NamedTuple):
+    name: str
+    data: Any
+    # time.perf_counter_ns when the loop thread handed the event over
+    queued_ns: int
+
+
+class SpscQueue:
+    """Bounded queue between exactly one producer and one consumer thread.
+
+    Built on deque.append and deque.popleft, which are atomic, so neither
+    side takes a lock. The consumer only blocks on an Event when the queue
+    is empty, and the producer only sets it when the consumer is waiting.
+    When full the oldest item is dropped, a slow consumer sees fresh data
+    and `dropped` says how much it missed.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_QUEUE_SIZE) -> None:
+        self.capacity = capacity
+        self.items = deque(maxlen=capacity)
+        self.dropped = 0
+        self.closed = False
+        self._waiting = False
+        self._ready = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def put(self, item: Any):
+        if len(self.items) == self.capacity:
+            self.dropped += 1
+        self.items.append(item)
+        if self._waiting:
+            self._ready.set()
+
+    def get(self, timeout: float = None) -> Any:
+        """Next item, waits for one when empty.
+
+        Raises:
+            TimeoutError: Nothing arrived within `timeout` seconds.
+            EOFError: The queue is closed and drained.
+        """
+        try:
+            return self.items.popleft()
+        except IndexError:
+            pass
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._waiting = True
+            self._ready.clear()
+            try:
+                # NOTE: Checked again after announcing the wait, so an item put
+                # in between is either seen here or wakes the wait below
+                return self.items.popleft()
+            except IndexError:
+                pass
+            if self.closed:
+                self._waiting = False
+                raise EOFError("Queue is closed")
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                self._waiting = False
+                raise TimeoutError("No item within the timeout")
+            self._ready.wait(remaining)
+            self._waiting = False
+            try:
+                return self.items.popleft()
+            except IndexError:
+                pass
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+
+class EventStream:
+    """Blocking iterator over the events of a ThreadedWebSocketClient.
+
+    Must be consumed by a single thread. Iteration ends when the client stops.
+    """
+
+    def __init__(self, names: Optional[set], capacity: int) -> None:
+        self.names = names
+        self.queue = SpscQueue(capacity)
+        # Time from the loop thread handing an event over to the consumer
+        # taking it, in microseconds
+        self.latency_us = RollingHistogram()
+
+    def get(self, timeout: float = None) -> ThreadedEvent:
+        event = self.queue.get(timeout)
+        self.latency_us.add((time.perf_counter_ns() - event.queued_ns) / 1000)
+        return event
+
+    def __iter__(self) -> Iterator[ThreadedEvent]:
+        while True:
+            try:
+                yield self.get()
+            except EOFError:
+                return
+
+    @property
+    def dropped(self) -> int:
+        return self.queue.dropped
+
+
+class ThreadedWebSocketClient:
+    """WebSocketClient for synchronous code.
+
+    The asyncio loop and the connection run in a background thread. Decoded
+    events are handed to consumer threads through bounded single-producer,
+    single-consumer queues: `events` returns a blocking iterator, and
+    handlers registered with `on` are plain functions called on a callback
+    thread of their own. Subscriptions block until the server answers.
+
+    Args:
+        url: C3 API url, as for WebSocketClient.
+        account_id: Account to receive user events for.
+        jwt_token: Token returned by the login.
+        queue_size: Capacity of every consumer queue.
+        **client_kwargs: Passed to WebSocketClient.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        account_id: str,
+        jwt_token: str,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        **client_kwargs,
+    ) -> None:
+        self.client = _DispatchingClient(
+            self._dispatch, url, account_id, jwt_token, **client_kwargs
+        )
+        self.queue_size = queue_size
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+
+        # NOTE: Replaced, never mutated, so the loop thread can read it unlocked
+        self.streams: List[EventStream] = []
+        self.handlers: Dict[str, List[Callable]] = {}
+        self._callbacks: Optional[EventStream] = None
+        self._callback_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # Loop thread
+
+    def _dispatch(self, event_name: str, args: tuple, received_at: float):
+        event = ThreadedEvent(
+            event_name, args[0] if args else None, time.perf_counter_ns()
+        )
+        for stream in self.streams:
+            if stream.names is None or event_name in stream.names:
+                stream.queue.put(event)
+
+    def _run_loop(self, ready: threading.Event):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self.client.start)
+        self.loop.call_soon(ready.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
+
+    def start(self):
+        if self.thread is not None:
+            raise RuntimeError("Client is already running")
+        ready = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run_loop, args=(ready,), name="c3-websocket", daemon=True
+        )
+        self.thread.start()
+        ready.wait()
+        return self
+
+    def stop(self, timeout: float = 5):
+        if self.thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.client.stop)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+        self.thread = None
+
+        for stream in self.streams:
+            stream.queue.close()
+        if self._callback_thread is not None:
+            self._callback_thread.join(timeout)
+            self._callback_thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _call(self, coroutine, timeout: float = None) -> Any:
+        if self.loop is None or self.thread is None:
+            coroutine.close()
+            raise RuntimeError("Client is not running")
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        return future.result(timeout)
+
+    # Consumers
+
+    def _add_stream(self, names: Optional[set], queue_size: int = None):
+        stream = EventStream(names, queue_size or self.queue_size)
+        with self._lock:
+            self.streams = self.streams + [stream]
+        return stream
+
+    def events(
+        self, *events: WebSocketClientEvent, queue_size: int = None
+    ) -> EventStream:
+        """A blocking iterator over the given events, or all events.
+
+        Only events dispatched after this call are seen. The stream must be
+        consumed by one thread.
+        """
+        names = {event.value for event in events} if events else None
+        return self._add_stream(names, queue_size)
+
+    def remove_stream(self, stream: EventStream):
+        with self._lock:
+            self.streams = [s for s in self.streams if s is not stream]
+        stream.queue.close()
+
+    def on(self, event: WebSocketClientEvent, handler: Callable = None):
+        """Calls `handler(data)` on the callback thread for every such event."""
+
+        def set_handler(h):
+            with self._lock:
+                self.handlers[event.value] = self.handlers.get(event.value, []) + [h]
+                start_callbacks = self._callbacks is None
+                if start_callbacks:
+                    self._callbacks = EventStream(None, self.queue_size)
+                    self.streams = self.streams + [self._callbacks]
+
+            if start_callbacks:
+                self._callback_thread = threading.Thread(
+                    target=self._run_callbacks,
+                    args=(self._callbacks,),
+                    name="c3-websocket-callbacks",
+                    daemon=True,
+                )
+                self._callback_thread.start()
+            return h
+
+        if handler is None:
+            return set_handler
+        set_handler(handler)
+
+    def _run_callbacks(self, stream: EventStream):
+        for event in stream:
+            for handler in self.handlers.get(event.name, ()):
+                try:
+                    handler(event.data)
+                except Exception:
+                    logger.exception(f"Handler of {event.name} failed")
+
+    # Requests
+
+    def subscribe(self, topics: Iterable[str], timeout: float = None):
+        """Subscribes to topics, now or as soon as the connection is up."""
+        return self._call(subscribe_topics(self.client, list(topics)), timeout)
+
+    def unsubscribe(self, topics: Iterable[str], timeout: float = None):
+        return self._call(unsubscribe_topics(self.client, list(topics)), timeout)
+
+    def subscribe_to_market(
+        self, market_id: str, topic: TopicType, timeout: float = None
+    ):
+        return self.subscribe([f"{topic.value}:{market_id}"], timeout)
+
+    def unsubscribe_from_market(
+        self, market_id: str, topic: TopicType, timeout: float = None
+    ):
+        return self.unsubscribe([f"{topic.value}:{market_id}"], timeout)
+
+    def list_subscriptions(self, timeout: float = None):
+        return self._call(self.client.list_subscriptions(timeout), timeout)
+
+    @property
+    def connected(self) -> bool:
+        return self.client.connected
+
+    def wait_connected(self, timeout: float = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.client.connected:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        """Connection health, and queue depth, drops and handoff latency per stream."""
+        return {
+            **self.client.metrics(),
+            "streams": [
+                {
+                    "events": sorted(stream.names) if stream.names else None,
+                    "queued": len(stream.queue),
+                    "dropped": stream.dropped,
+                    "handoff_us": stream.latency_us.summary(),
+                }
+                for stream in self.streams
+            ],
+        }
@@ -0,0 +1,81 @@
+import pytest
+from algosdk import account as algo_account
+
+from c3.account_manager import AccountManager
+from c3.c3exchange import C3Exchange
+from c3.signing.signers import AlgorandMessageSigner, EVMMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.utils.constants import LocalHostConstants
+
+evm_signer = EVMMessageSigner(
+    "0x4c0883a69102937d6231471b5dbb6204fe5129617082792ae468d01a3f362318"
+)
+
+
+def algorand_signer():
+    private_key, _ = algo_account.generate_account()
+    return AlgorandMessageSigner(private_key)
+
+
+def order(marketId, price):
+    return {
+        "marketId": marketId,
+        "type": "limit",
+        "side": "buy",
+        "amount": "0.1",
+        "price": price,
+    }
+
+
+def test_accounts_share_session_and_act_together():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        manager = AccountManager(c3_client, max_workers=8, validate=True)
+        signers = {f"algo-{i}": algorand_signer() for i in range(5)}
+        errors = manager.login_all({**signers, "evm": {"signer": evm_signer}})
+        assert errors == {}
+        assert len(manager) == 6
+        assert len({manager[name].accountId for name in manager.accounts}) == 6
+        # Every worker thread sends on its own session
+        sessions = manager.map(lambda a: a.session)
+        assert all(
+            s is not a.session
+            for a, s in zip(manager.accounts.values(), sessions.values())
+        )
+        # ... and they all share the connection pool of one adapter
+        assert all(
+            s.get_adapter(server.base_url) is manager.adapter for s in sessions.values()
+        )
+        assert len({id(a.validator) for a in manager.accounts.values()}) == 1
+
+        manager.route("ETH-USDC", "evm")
+        manager.submitOrder(order("ETH-USDC", "1028.30"))
+        manager.submitOrder(order("ETH-USDC", "1028.25"), account="algo-0")
+        manager.submitOrder(order("ETH-USDC", "1028.20"), account="algo-1")
+        for name, a in manager.accounts.items():
+            expected = 0 if name not in ("evm", "algo-0", "algo-1") else 1
+            assert len(server.open_orders(a.accountId)) == expected
+
+        balances = manager.balances()
+        assert set(balances) == set(manager.accounts)
+        assert not any(isinstance(b, Exception) for b in balances.values())
+
+        cancelled = manager.cancel_all(["ETH-USDC"])
+        assert len(cancelled["evm"]["ETH-USDC"]) == 1
+        assert cancelled["algo-2"]["ETH-USDC"] == []
+        for a in manager.accounts.values():
+            assert server.open_orders(a.accountId) == []
+        manager.close()
+
+
+def test_failed_login_is_reported():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        manager = AccountManager(c3_client)
+        manager.validator
+        server.fail_next(1)
+        errors = manager.login_all({"a": algorand_signer()})
+        assert set(errors) == {"a"}
+        assert len(manager) == 0
+        with pytest.raises(KeyError, match="No account"):
+            manager.submitOrder(order("ETH-USDC", "1028.30"))
@@ -0,0 +1,98 @@
+import gc
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from c3.c3exchange import C3Exchange
+from c3.signing.signers import AlgorandMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.utils.constants import LocalHostConstants
+
+signer = AlgorandMessageSigner(
+    "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+)
+
+ORDERS = 2000
+THREADS = 32
+
+
+def order(i):
+    return {
+        "marketId": "ETH-USDC",
+        "type": "limit",
+        "side": "buy" if i % 2 else "sell",
+        "amount": "0.1",
+        "price": f"{1000 + (i % 100) * 0.05:.2f}",
+        "clientOrderId": str(i),
+    }
+
+
+def test_concurrent_submit_orders_never_reuse_a_nonce():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer, thread_safe=True)
+        first_nonce = account.lastNonceStored
+
+        with ThreadPoolExecutor(THREADS) as executor:
+            responses = list(
+                executor.map(account.submitOrder, map(order, range(ORDERS)))
+            )
+
+        assert sorted(int(r["clientOrderId"]) for r in responses) == list(range(ORDERS))
+        assert server.stats["POST v1/accounts/*/markets/*/orders 400"] == 0
+        # The exchange saw every nonce exactly once
+        nonces = server.nonces[account.accountId]
+        assert nonces == set(range(first_nonce, first_nonce + ORDERS))
+        assert account.lastNonceStored == first_nonce + ORDERS
+        account.close()
+
+
+def test_threads_get_their_own_session():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer, thread_safe=True)
+        shared = c3_client.login(signer)
+
+        sessions = {}
+
+        def run(name):
+            account.getBalance()
+            sessions[name] = (account.session, shared.session)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(own) for own, _ in sessions.values()}) == 4
+        assert len({id(common) for _, common in sessions.values()}) == 1
+        account.close()
+
+
+def test_sessions_of_finished_threads_are_closed():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer, thread_safe=True)
+
+        threads = [threading.Thread(target=account.getBalance) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        gc.collect()
+        assert account._thread_sessions == set()
+        account.getBalance()
+        assert len(account._thread_sessions) == 1
+        account.close()
+
+
+def test_bootstrap_fetches_use_their_own_sessions():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        c3_client.login(signer)
+        assert c3_client.instrumentsInfo and c3_client.marketsInfo
+
+        assert c3_client._local is not None
+        assert c3_client.session is not c3_client._session
+        c3_client.close()
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import unittest
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from c3.bars import MINUTE, SECOND, BarAggregator, BarSeries  # noqa: E402
+from c3.websocket import WebSocketClient  # noqa: E402
+
+START_MS = 1700766000000  # 2023-11-23T19:00:00Z
+
+
+def trade(timestamp, price, size, side="buy", id="1"):
+    return {
+        "id": id,
+        "marketId": "ETH-USDC",
+        "price": price,
+        "size": size,
+        "side": side,
+        "timestamp": timestamp,
+    }
+
+
+class TestBarSeries(unittest.TestCase):
+    def test_ohlcv(self):
+        series = BarSeries(SECOND, capacity=8)
+        series.add(START_MS + 10, 100.0, 1.0, buy=True)
+        series.add(START_MS + 20, 103.0, 2.0)
+        series.add(START_MS + 30, 99.0, 1.0, buy=True)
+        series.add(START_MS + 1500, 101.0, 4.0)
+
+        bars = series.view()
+        self.assertEqual(len(series), 2)
+        self.assertEqual(list(bars["start"]), [START_MS, START_MS + SECOND])
+        self.assertEqual(list(bars["open"]), [100.0, 101.0])
+        self.assertEqual(list(bars["high"]), [103.0, 101.0])
+        self.assertEqual(list(bars["low"]), [99.0, 101.0])
+        self.assertEqual(list(bars["close"]), [99.0, 101.0])
+        self.assertEqual(list(bars["volume"]), [4.0, 4.0])
+        self.assertEqual(list(bars["buy_volume"]), [2.0, 0.0])
+        self.assertEqual(list(bars["trades"]), [3, 1])
+        self.assertAlmostEqual(bars["vwap"][0], (100 + 206 + 99) / 4)
+        self.assertEqual(series.last()["close"], 101.0)
+
+    def test_ring_views_do_not_copy(self):
+        series = BarSeries(SECOND, capacity=4)
+        for i in range(10):
+            series.add(START_MS + i * SECOND, 100.0 + i, 1.0)
+
+        bars = series.view()
+        self.assertEqual(list(bars["close"]), [106.0, 107.0, 108.0, 109.0])
+        self.assertEqual(list(series.view(2)["close"]), [108.0, 109.0])
+        for name, view in bars.items():
+            self.assertTrue(np.shares_memory(view, series.columns[name]))
+            self.assertTrue(view.flags.c_contiguous)
+            self.assertFalse(view.flags.writeable)
+
+    def test_late_trades(self):
+        series = BarSeries(SECOND, capacity=4)
+        series.add(START_MS, 100.0, 1.0)
+        series.add(START_MS + SECOND, 100.0, 1.0)
+        series.add(START_MS + 500, 110.0, 1.0)
+        series.add(START_MS - 10 * SECOND, 90.0, 1.0)
+
+        bars = series.view()
+        self.assertEqual(list(bars["high"]), [110.0, 100.0])
+        self.assertEqual(list(bars["trades"]), [2, 1])
+        self.assertEqual(series.late, 1)
+
+
+class TestBarAggregator(unittest.TestCase):
+    def test_resolutions(self):
+        aggregator = BarAggregator((SECOND, MINUTE), capacity=16)
+        aggregator.on_trades(
+            [trade(START_MS + i * 400, str(100 + i), "0.5") for i in range(6)]
+        )
+        self.assertEqual(len(aggregator.series("ETH-USDC", SECOND)), 3)
+        minute = aggregator.bars("ETH-USDC", MINUTE)
+        self.assertEqual(list(minute["trades"]), [6])
+        self.assertEqual(list(minute["close"]), [105.0])
+        self.assertEqual(list(minute["volume"]), [3.0])
+
+    def test_attach(self):
+        aggregator = BarAggregator((SECOND,))
+        client = WebSocketClient("ws://localhost", "account", "token")
+        aggregator.attach(client)
+
+        async def receive():
+            message = {
+                "type": "message",
+                "subject": "trades",
+                "data": [trade(START_MS, "100", "1")],
+            }
+            client.handle_message(json.dumps(message))
+            await asyncio.sleep(0)
+
+        asyncio.run(receive())
+        self.assertEqual(list(aggregator.bars("ETH-USDC", SECOND)["close"]), [100.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
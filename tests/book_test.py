@@ -0,0 +1,129 @@
+import asyncio
+import json
+import math
+import random
+import unittest
+
+from c3.book import BookAnalytics, OrderBook
+from c3.marketdata import SIDE_ASK, SIDE_BID
+from c3.websocket import WebSocketClient
+
+
+def delta(bids=(), asks=(), seq=0, market_id="ETH-USDC"):
+    return {
+        "marketId": market_id,
+        "seq": seq,
+        "timestamp": 1700767680000 + seq,
+        "bids": [[str(p), str(s)] for p, s in bids],
+        "asks": [[str(p), str(s)] for p, s in asks],
+    }
+
+
+def expected_metrics(book: OrderBook, levels: int, depth_bps):
+    """Metrics computed from scratch, what BookAnalytics keeps incrementally."""
+    bids = book.top(SIDE_BID, book.depth(SIDE_BID))
+    asks = book.top(SIDE_ASK, book.depth(SIDE_ASK))
+    bid_depth = sum(size for _, size in bids[:levels])
+    ask_depth = sum(size for _, size in asks[:levels])
+    metrics = {"bid_depth": bid_depth, "ask_depth": ask_depth}
+    if bid_depth + ask_depth:
+        metrics["imbalance"] = (bid_depth - ask_depth) / (bid_depth + ask_depth)
+    for bps in depth_bps:
+        bid_limit = bids[0][0] * (1 - bps / 10000) if bids else 0
+        ask_limit = asks[0][0] * (1 + bps / 10000) if asks else 0
+        metrics[f"bid_depth_{bps}bps"] = sum(s for p, s in bids if p >= bid_limit)
+        metrics[f"ask_depth_{bps}bps"] = sum(s for p, s in asks if p <= ask_limit)
+    return metrics
+
+
+class TestOrderBook(unittest.TestCase):
+    def test_levels_are_sorted_best_first(self):
+        book = OrderBook("ETH-USDC")
+        book.apply(
+            delta(bids=[(100, 1), (102, 2), (101, 3)], asks=[(104, 1), (103, 2)])
+        )
+        self.assertEqual(book.top(SIDE_BID, 2), [(102.0, 2.0), (101.0, 3.0)])
+        self.assertEqual(book.best(SIDE_ASK), (103.0, 2.0))
+
+        self.assertEqual(book.set(SIDE_BID, 102.0, 0.0), (0, 2.0))
+        self.assertEqual(book.set(SIDE_BID, 99.0, 0.0), (-1, 0.0))
+        self.assertEqual(book.best(SIDE_BID), (101.0, 3.0))
+        book.apply(delta(asks=[(103, 0), (104, 0)]))
+        self.assertTrue(math.isnan(book.best(SIDE_ASK)[0]))
+
+
+class TestBookAnalytics(unittest.TestCase):
+    def test_metrics(self):
+        analytics = BookAnalytics(depth_levels=2, depth_bps=(100,))
+        analytics.on_book_delta(
+            delta(bids=[(100, 1), (99, 3), (90, 5)], asks=[(101, 3), (102, 1)])
+        )
+        metrics = analytics.metrics("ETH-USDC")
+        self.assertEqual(metrics["spread"], 1.0)
+        self.assertEqual(metrics["mid"], 100.5)
+        self.assertEqual(metrics["microprice"], (100 * 3 + 101 * 1) / 4)
+        self.assertEqual(metrics["imbalance"], 0.0)
+        self.assertEqual(metrics["bid_depth_100bps"], 4.0)
+        self.assertEqual(metrics["ask_depth_100bps"], 4.0)
+
+    def test_incremental_matches_recomputed(self):
+        rng = random.Random(7)
+        analytics = BookAnalytics(
+            depth_levels=3, depth_bps=(10, 50), resync_every=10**9
+        )
+        for seq in range(2000):
+            sides = {"bids": [], "asks": []}
+            for _ in range(rng.randint(1, 4)):
+                side = rng.choice(["bids", "asks"])
+                offset = rng.randint(0, 20) * 0.05
+                price = round(1000 - offset if side == "bids" else 1000.05 + offset, 2)
+                size = rng.choice([0, 0, rng.randint(1, 50) / 10])
+                sides[side].append((price, size))
+            analytics.on_book_delta(delta(sides["bids"], sides["asks"], seq))
+
+            metrics = analytics.metrics("ETH-USDC")
+            for name, value in expected_metrics(
+                analytics.book("ETH-USDC"), 3, (10, 50)
+            ).items():
+                self.assertAlmostEqual(metrics[name], value, places=6, msg=name)
+
+    def test_subscriptions_fire_on_threshold(self):
+        analytics = BookAnalytics()
+        calls = []
+        analytics.subscribe(
+            lambda market_id, metrics: calls.append(metrics["mid"]),
+            {"mid": 0.5},
+            market_id="ETH-USDC",
+        )
+        analytics.on_book_delta(delta(bids=[(100, 1)], asks=[(101, 1)], seq=1))
+        analytics.on_book_delta(delta(bids=[(100.4, 1)], seq=2))
+        analytics.on_book_delta(delta(asks=[(101, 0), (102, 1)], seq=3))
+        analytics.on_book_delta(delta(bids=[(5, 1)], seq=5, market_id="ALGO-USDC"))
+        self.assertEqual(calls, [100.5, 101.2])
+
+        with self.assertRaises(ValueError):
+            analytics.subscribe(print, {"unknown": 1})
+
+    def test_attach_starts_over_on_connect(self):
+        analytics = BookAnalytics()
+        client = WebSocketClient("ws://localhost", "account", "token")
+        analytics.attach(client)
+
+        async def receive():
+            message = {
+                "type": "message",
+                "subject": "bookDelta",
+                "data": delta(bids=[(100, 1)], asks=[(101, 1)]),
+            }
+            client.handle_message(json.dumps(message))
+            await asyncio.sleep(0)
+            self.assertEqual(analytics.metrics("ETH-USDC")["spread"], 1.0)
+            client.on_open(None)
+            await asyncio.sleep(0)
+
+        asyncio.run(receive())
+        self.assertIsNone(analytics.book("ETH-USDC"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import tempfile
+import unittest
+
+import pytest
+
+from c3.marketdata import SIDE_ASK, SIDE_BID, book_delta_rows, level1_row
+
+np = pytest.importorskip("numpy")
+
+from c3.capture import BOOK_DELTA, LEVEL1, TRADES, ColumnarCapture, load  # noqa: E402
+
+HOUR_MS = 3600 * 1000
+START_MS = 1700766000000  # 2023-11-23T19:00:00Z
+
+
+def level1(timestamp, bid="1028.21", ask="1028.25"):
+    return {
+        "marketId": "ETH-USDC",
+        "timestamp": timestamp,
+        "bestBid": {"price": bid, "size": "1.5"},
+        "bestAsk": {"price": ask, "size": "2.5"},
+    }
+
+
+class TestMarketData(unittest.TestCase):
+    def test_rows(self):
+        self.assertEqual(
+            level1_row(level1(START_MS)), (START_MS, 1028.21, 1.5, 1028.25, 2.5)
+        )
+        delta = {
+            "marketId": "ETH-USDC",
+            "seq": 3,
+            "timestamp": START_MS,
+            "bids": [["1028.21", "0"]],
+            "asks": [["1028.25", "0.5"]],
+        }
+        self.assertEqual(
+            list(book_delta_rows(delta)),
+            [
+                (START_MS, 3, SIDE_BID, 1028.21, 0.0),
+                (START_MS, 3, SIDE_ASK, 1028.25, 0.5),
+            ],
+        )
+
+
+class TestColumnarCapture(unittest.TestCase):
+    def test_partitions_chunks_and_rotation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            capture = ColumnarCapture(directory, chunk_rows=100)
+            timestamps = [START_MS + i * 30_000 for i in range(250)]
+            for timestamp in timestamps:
+                capture.on_level1(level1(timestamp))
+            capture.on_trades(
+                [
+                    {
+                        "id": "T1",
+                        "marketId": "ALGO-USDC",
+                        "price": "0.1741",
+                        "size": "10",
+                        "side": "sell",
+                        "timestamp": START_MS,
+                    }
+                ]
+            )
+            capture.on_book_delta(
+                {
+                    "marketId": "ETH-USDC",
+                    "seq": 1,
+                    "timestamp": START_MS,
+                    "bids": [["1028.21", "1"], ["1028.20", "2"]],
+                    "asks": [],
+                }
+            )
+            capture.close()
+
+            # 120 rows per hour window, written in chunks of at most 100 rows
+            self.assertEqual(capture.rows, 253)
+            rows = load(directory, LEVEL1, "ETH-USDC")
+            self.assertEqual(rows["timestamp"].tolist(), timestamps)
+            self.assertTrue(np.all(rows["bid_price"] == 1028.21))
+
+            second_hour = load(
+                directory,
+                LEVEL1,
+                "ETH-USDC",
+                start_ms=START_MS + HOUR_MS,
+                end_ms=START_MS + 2 * HOUR_MS,
+            )
+            self.assertEqual(len(second_hour), 120)
+
+            trades = load(directory, TRADES, "ALGO-USDC")
+            self.assertEqual(trades["id"].tolist(), [b"T1"])
+            self.assertEqual(trades["side"].tolist(), [SIDE_ASK])
+            self.assertEqual(
+                load(directory, BOOK_DELTA, "ETH-USDC")["size"].tolist(), [1.0, 2.0]
+            )
+            self.assertEqual(len(load(directory, LEVEL1, "BTC-USDC")), 0)
+
+    def test_reopened_window_does_not_overwrite(self):
+        with tempfile.TemporaryDirectory() as directory:
+            capture = ColumnarCapture(directory)
+            capture.on_level1(level1(START_MS))
+            capture.on_level1(level1(START_MS + HOUR_MS))
+            capture.on_level1(level1(START_MS + 1))
+            capture.close()
+            self.assertEqual(len(capture.chunks), 3)
+            self.assertEqual(len(load(directory, LEVEL1, "ETH-USDC")), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import time
+
+import pytest
+from algosdk import account as algo_account
+
+from c3.c3exchange import C3Exchange
+from c3.delegates import NONCE_STRIDE, DelegatePool
+from c3.signing.encode import encode_user_operation_base
+from c3.signing.signers import AlgorandMessageSigner
+from c3.signing.types import DelegateSignatureRequest, RequestOperation
+from c3.testing.mock_exchange import MockC3Exchange, verify_signature
+from c3.utils.constants import LocalHostConstants
+
+signer = AlgorandMessageSigner(
+    "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+)
+
+
+def delegate_signers(count):
+    return [
+        AlgorandMessageSigner(algo_account.generate_account()[0]) for _ in range(count)
+    ]
+
+
+def order(price):
+    return {
+        "marketId": "ETH-USDC",
+        "type": "limit",
+        "side": "buy",
+        "amount": "0.1",
+        "price": price,
+    }
+
+
+def test_orders_spread_over_delegated_keys():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+        pool = DelegatePool(
+            account, delegate_signers(4), register=server.register_delegation
+        )
+        assert len(server.delegates[account.accountId]) == 4
+
+        prices = [f"{1000 + i * 0.05:.2f}" for i in range(40)]
+        responses = pool.submitOrders([order(p) for p in prices])
+        assert not any(isinstance(r, Exception) for r in responses)
+        assert [r["price"] for r in responses] == prices
+        pool.submitOrder(order("999.00"))
+        assert len(server.open_orders(account.accountId)) == 41
+
+        payloads = pool.prepareOrders([order("998.00")] * 8)
+        tickets = [p["settlementTicket"] for p in payloads]
+        assert {t["account"] for t in tickets} == {account.base64address.decode()}
+        creators = {key.address: key.stream for key in pool.keys}
+        assert set(t["creator"] for t in tickets) == set(creators)
+        # Every key keeps to its own nonce stream
+        for ticket in tickets:
+            assert ticket["nonce"] % NONCE_STRIDE == creators[ticket["creator"]]
+        assert [s["signed"] for s in pool.stats()] == [13, 12, 12, 12]
+        pool.close()
+
+
+def test_delegations_are_signed_by_the_primary_and_renewed():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+        pool = DelegatePool(account, delegate_signers(2), lifetime=100, renew_before=10)
+
+        for key in pool.keys:
+            delegation = key.delegation
+            request = DelegateSignatureRequest(
+                op=RequestOperation.Delegate,
+                account=account.base64address,
+                delegate=key.account.signer.base64address(),
+                creation=delegation["creation"],
+                expiration=delegation["expiration"],
+            )
+            message = encode_user_operation_base(request)
+            assert verify_signature(message, delegation["signature"], signer.address())
+
+        now = int(time.time())
+        assert pool.renew(now) == []
+        renewed = pool.renew(now + 95)
+        assert [d["expiration"] for d in renewed] == [now + 195] * 2
+
+        # Orders never outlive the delegation that signed them
+        payload = pool.prepareOrder(dict(order("1000.00"), expiresOn=now + 10**6))
+        assert payload["settlementTicket"]["expiresOn"] == now + 195
+
+        pool.keys[0].expiration = pool.keys[1].expiration = now + 30
+        with pytest.raises(RuntimeError, match="expired"):
+            pool.submitOrder(order("1000.00"))
+        pool.close()
+
+
+def test_signing_in_worker_processes():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer, validate=True)
+        pool = DelegatePool(
+            account,
+            delegate_signers(2),
+            register=server.register_delegation,
+            processes=True,
+        )
+
+        prices = [f"{1000 + i * 0.05:.2f}" for i in range(10)]
+        responses = pool.submitOrders([order(p) for p in prices] + [order("1000.001")])
+        assert [r["price"] for r in responses[:-1]] == prices
+        # Invalid orders are rejected before they reach a worker
+        assert "TICK_SIZE" in str(responses[-1])
+        assert len(server.open_orders(account.accountId)) == 10
+        assert sum(s["signed"] for s in pool.stats()) == 10
+        pool.close()
+
+
+def test_delegation_matches_the_encoding_vector():
+    # Same delegation as test_encode_delegate in encoding_test
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+        pool = DelegatePool(account, [signer], lifetime=432100 - 123456)
+
+        delegation = pool.delegate(pool.keys[0], now=123456)
+        assert delegation["expiration"] == 432100
+        expected = "3WGn56p+Xi3ZRatxYdlJiqID8+dXEEbzFWNn+YVab7BDBVo2f8sTNHUhHvhaP8DIgH+ZBmkQRMvxylpNTlB5Ag=="
+        assert delegation["signature"] == expected
+        pool.close()
+
+
+def test_nonce_streams_do_not_depend_on_the_pool_size(monkeypatch):
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now)
+        large = DelegatePool(account, delegate_signers(5))
+        monkeypatch.setattr(time, "time", lambda: now + 0.001)
+        small = DelegatePool(account, delegate_signers(2))
+
+        # A smaller pool made later still starts above the larger one
+        assert small.keys[0].reserveNonces(1).start > max(
+            key.reserveNonces(1).start for key in large.keys
+        )
+
+        # Later reservations of every key stay disjoint
+        reserved = [set(key.reserveNonces(50)) for key in large.keys + small.keys]
+        assert len(set().union(*reserved)) == sum(map(len, reserved))
+
+        # Pools made in the same millisecond, while the others are open or
+        # after they closed, never take a nonce used before
+        same_ms = DelegatePool(account, delegate_signers(2))
+        assert not set(same_ms.keys[0].reserveNonces(50)) & set().union(*reserved)
+        for pool in (same_ms, small, large):
+            pool.close()
+        reopened = DelegatePool(account, delegate_signers(7))
+        for key in reopened.keys:
+            assert not set(key.reserveNonces(50)) & set().union(*reserved)
+        reopened.close()
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import tempfile
+
+from c3.c3exchange import C3Exchange
+from c3.fills_store import ORDERS, TRADES, FillsStore
+from c3.history import HistoryCursor
+from c3.signing.signers import AlgorandMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.utils.constants import LocalHostConstants
+from c3.websocket import WebSocketClient
+
+signer = AlgorandMessageSigner(
+    "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+)
+
+
+def order(i, marketId="ETH-USDC"):
+    return {
+        "marketId": marketId,
+        "type": "limit",
+        "side": "buy",
+        "amount": "1",
+        "price": f"{1000 + i}.00",
+        "clientOrderId": str(i),
+    }
+
+
+def test_sync_only_fetches_new_records():
+    with MockC3Exchange() as server, tempfile.TemporaryDirectory() as directory:
+        account = C3Exchange(server.base_url, constants=LocalHostConstants).login(
+            signer
+        )
+        ids = [account.submitOrder(order(i))["id"] for i in range(12)]
+        for order_id in ids[:5]:
+            server.fill(order_id)
+
+        path = os.path.join(directory, "fills.sqlite")
+        store = FillsStore(path, account)
+        assert store.sync(page_size=5) == {ORDERS: 12, TRADES: 5}
+        assert store.checkpoint(TRADES) != HistoryCursor()
+        store.close()
+
+        account.submitOrder(order(12, "ALGO-USDC"))
+        server.fill(ids[5], size="0.5")
+        requests = server.stats["GET v1/accounts/*/trades/history 200"]
+
+        # A new process picks up at the stored checkpoints
+        store = FillsStore(path, account)
+        assert store.sync(page_size=5) == {ORDERS: 1, TRADES: 1}
+        assert server.stats["GET v1/accounts/*/trades/history 200"] == requests + 1
+        assert store.count("trades") == 6
+        assert [o["clientOrderId"] for o in store.orders(marketId="ALGO-USDC")] == [
+            "12"
+        ]
+        assert len(store.orders(status="filled")) == 5
+        assert [t["orderId"] for t in store.trades(since=0, limit=2)] == ids[:2]
+        assert store.trades(orderId=ids[5])[0]["size"] == "0.5"
+        plan = store.db.execute(
+            "EXPLAIN QUERY PLAN SELECT data FROM trades"
+            " WHERE marketId = ? AND timestamp >= ?",
+            ("ETH-USDC", 0),
+        ).fetchall()
+        assert "trades_market_time" in str(plan)
+        store.close()
+
+
+def test_websocket_events_update_the_store():
+    with MockC3Exchange() as server:
+        account = C3Exchange(server.base_url, constants=LocalHostConstants).login(
+            signer
+        )
+        store = FillsStore(":memory:", account)
+        client = WebSocketClient(server.base_url, account.accountId, "token")
+        store.attach(client)
+
+        def receive(subject, data):
+            message = {"type": "message", "subject": subject, "data": data}
+            client.handle_message(json.dumps(message))
+
+        async def events():
+            first = account.submitOrder(order(1))
+            second = account.submitOrder(order(2))
+            receive("openOrders", [first, second])
+            await asyncio.sleep(0)
+
+            trade = server.fill(first["id"], size="0.4")
+            receive("trades", [trade])
+            # Seen twice, e.g. by a sync and the websocket, counted once
+            receive("trades", [trade])
+            # Market trades have no order and are not fills of the account
+            market_trade = {k: v for k, v in trade.items() if k != "orderId"}
+            receive("trades", [{**market_trade, "id": "market"}])
+            receive("cancels", [second["id"]])
+            await asyncio.sleep(0)
+            return first, second
+
+        first, second = asyncio.run(events())
+        store.flush()
+        orders = {o["id"]: o for o in store.orders()}
+        assert orders[first["id"]]["filledSize"] == "0.4"
+        assert orders[first["id"]]["status"] == "open"
+        assert orders[second["id"]]["status"] == "cancelled"
+        assert store.count("trades") == 1
+
+        store.on_trades([server.fill(first["id"])])
+        assert store.orders(status="filled")[0]["filledSize"] == "1.0"
+
+
+def test_fills_replayed_across_a_checkpoint_count_once():
+    with MockC3Exchange() as server:
+        account = C3Exchange(server.base_url, constants=LocalHostConstants).login(
+            signer
+        )
+        store = FillsStore(":memory:", account)
+        placed = account.submitOrder(order(1))
+        first = server.fill(placed["id"], size="0.3")
+
+        # The order arrives already counting the fill, then the fill itself
+        store.on_open_orders([dict(server.orders[placed["id"]])])
+        store.on_trades([first])
+        assert store.orders()[0]["filledSize"] == "0.3"
+
+        second = server.fill(placed["id"], size="0.2")
+        store.on_trades([second])
+        # A sync from before both fills replays them
+        store.sync()
+        store.on_trades([first, second])
+        assert store.count("trades") == 2
+        assert store.orders()[0]["filledSize"] == "0.5"
+        assert store.orders()[0]["status"] == "open"
+        store.close()
+
+
+def test_sync_refreshes_orders_closed_while_detached():
+    with MockC3Exchange() as server:
+        account = C3Exchange(server.base_url, constants=LocalHostConstants).login(
+            signer
+        )
+        store = FillsStore(":memory:", account)
+        placed = [account.submitOrder(order(i)) for i in range(3)]
+        store.sync()
+
+        # Cancelled and filled with no websocket attached
+        account.cancelOrders([placed[0]["id"]])
+        server.fill(placed[1]["id"])
+        store.sync()
+        statuses = {o["id"]: o["status"] for o in store.orders()}
+        assert [statuses[o["id"]] for o in placed] == ["cancelled", "filled", "open"]
+
+        # An older openOrders event does not lower the fills already stored
+        store.on_open_orders([placed[1]])
+        stored = store.orders(status="filled")
+        assert [(o["id"], o["filledSize"]) for o in stored] == [(placed[1]["id"], "1")]
+        store.close()
@@ -0,0 +1,92 @@
+import asyncio
+
+from c3.c3exchange import C3Exchange
+from c3.history import HistoryCursor, HistoryPager
+from c3.signing.signers import AlgorandMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.utils.constants import LocalHostConstants
+
+signer = AlgorandMessageSigner(
+    "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+)
+
+HISTORY_ROUTE = "GET v1/accounts/*/orders/history 200"
+
+
+def order(i, marketId="ETH-USDC"):
+    return {
+        "marketId": marketId,
+        "type": "limit",
+        "side": "buy",
+        "amount": "1",
+        "price": f"{1000 + i}.00",
+        "clientOrderId": str(i),
+    }
+
+
+def test_pages_are_fetched_as_records_are_consumed():
+    with MockC3Exchange() as server:
+        account = C3Exchange(server.base_url, constants=LocalHostConstants).login(
+            signer
+        )
+        for i in range(25):
+            account.submitOrder(order(i))
+
+        pager = account.orderHistory(pageSize=10)
+        orders = list(pager)
+        assert [o["clientOrderId"] for o in orders] == [str(i) for i in range(25)]
+        assert pager.pages == 3
+        assert server.stats[HISTORY_ROUTE] == 3
+        # The open orders route is not paged
+        open_orders = account.get(f"v1/accounts/{account.accountId}/orders")
+        assert len(open_orders) == 25
+
+        # Stop half way, then resume from the cursor
+        pager = account.orderHistory(pageSize=10, prefetch=False)
+        first = [o for _, o in zip(range(12), pager)]
+        rest = list(account.orderHistory(pageSize=10, cursor=pager.cursor))
+        assert [o["id"] for o in first + rest] == [o["id"] for o in orders]
+
+        # A stored cursor only returns what was added since
+        pager = account.orderHistory(pageSize=10)
+        list(pager)
+        checkpoint = pager.cursor.to_dict()
+        for i in range(25, 28):
+            account.submitOrder(order(i, "ALGO-USDC"))
+        resumed = account.orderHistory(cursor=HistoryCursor.from_dict(checkpoint))
+        assert [o["clientOrderId"] for o in resumed] == ["25", "26", "27"]
+
+
+def test_trade_history_async():
+    with MockC3Exchange() as server:
+        account = C3Exchange(server.base_url, constants=LocalHostConstants).login(
+            signer
+        )
+        for i in range(7):
+            server.fill(account.submitOrder(order(i))["id"])
+
+        async def collect():
+            return [trade async for trade in account.tradeHistory(pageSize=3)]
+
+        trades = asyncio.run(collect())
+        assert [t["price"] for t in trades] == [f"{1000 + i}.00" for i in range(7)]
+        assert server.stats["GET v1/accounts/*/trades/history 200"] == 3
+        assert server.open_orders(account.accountId) == []
+
+
+def test_cursor_advances_per_record():
+    pages = [[{"t": 1}, {"t": 2}], [{"t": 2}, {"t": 2}], [{"t": 3}]]
+    requests = []
+
+    def fetch(params):
+        requests.append(params)
+        return pages[len(requests) - 1]
+
+    pager = HistoryPager(fetch, {"marketId": None}, "t", page_size=2)
+    cursors = []
+    for _ in pager:
+        cursors.append(pager.cursor.to_dict()["offset"])
+    assert cursors == [1, 1, 2, 3, 1]
+    assert pager.cursor == HistoryCursor(3, 1)
+    assert [r["offset"] for r in requests] == [0, 2, 4]
+    assert "marketId" not in requests[0]
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative `-X importtime` budget per module, in microseconds. Before the
+# chain libraries were made lazy `import c3.c3exchange` took about 1 second.
+IMPORT_TIME_BUDGET_US = int(os.environ.get("C3_IMPORT_TIME_BUDGET_US", 150_000))
+
+HEAVY_MODULES = ["algosdk", "eth_account", "web3", "Crypto", "requests", "websockets"]
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(*args):
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_time_us(module):
+    """Cumulative import time of `module` in a fresh interpreter."""
+    stderr = run_python("-X", "importtime", "-c", f"import {module}").stderr
+
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        if name.strip() == module:
+            return int(cumulative)
+
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+@pytest.mark.parametrize("module", ["c3.c3exchange", "c3.websocket"])
+def test_import_time_budget(module):
+    elapsed = import_time_us(module)
+    assert (
+        elapsed < IMPORT_TIME_BUDGET_US
+    ), f"import {module} took {elapsed}us, budget is {IMPORT_TIME_BUDGET_US}us"
+
+
+@pytest.mark.parametrize("module", ["c3.c3exchange", "c3.websocket"])
+def test_heavy_dependencies_not_imported(module):
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    loaded = run_python("-c", code).stdout.strip()
+    assert loaded == "", f"import {module} loaded {loaded}"
@@ -0,0 +1,133 @@
+import pytest
+import requests
+
+from c3.c3exchange import C3Exchange
+from c3.signing.signers import AlgorandMessageSigner, EVMMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.utils.constants import LocalHostConstants
+
+algorand_signer = AlgorandMessageSigner(
+    "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+)
+evm_signer = EVMMessageSigner("0x" + "11" * 32)
+
+ORDER_PARAMS = {
+    "marketId": "ETH-USDC",
+    "type": "limit",
+    "side": "buy",
+    "amount": "0.1",
+    "price": "1028.33",
+}
+
+
+@pytest.mark.parametrize("signer", [algorand_signer, evm_signer])
+def test_order_roundtrip(signer):
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+
+        order = account.submitOrder(ORDER_PARAMS)
+        assert order["marketId"] == "ETH-USDC"
+        assert server.open_orders(account.accountId) == [order]
+
+        assert account.cancelOrders([order["id"]]) == [order["id"]]
+        assert server.open_orders(account.accountId) == []
+
+        account.submitOrder(ORDER_PARAMS)
+        assert len(account.cancelMarketOrders("ETH-USDC")) == 1
+
+
+def test_rejects_bad_signature():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(algorand_signer)
+        account.signer = EVMMessageSigner("0x" + "22" * 32)
+
+        with pytest.raises(Exception, match="401"):
+            account.submitOrder(ORDER_PARAMS)
+
+
+def test_rejects_orders_for_another_account():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(algorand_signer)
+        other = c3_client.login(evm_signer)
+        account.accountId = other.accountId
+
+        with pytest.raises(Exception, match="403"):
+            account.submitOrder(ORDER_PARAMS)
+        assert server.open_orders(other.accountId) == []
+
+
+def test_failure_injection():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(algorand_signer)
+
+        server.fail_next(1, status=503)
+        with pytest.raises(Exception, match="503"):
+            account.getBalance()
+        assert account.getBalance() is not None
+
+
+def test_rejects_tokens_of_another_account():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(algorand_signer)
+        order = account.submitOrder(ORDER_PARAMS)
+        other = c3_client.login(evm_signer)
+        other.accountId = account.accountId
+
+        with pytest.raises(Exception, match="403"):
+            other.getBalance()
+        with pytest.raises(Exception, match="403"):
+            other.cancelOrders([order["id"]])
+
+        response = requests.get(
+            server.base_url + "v1/ws",
+            params={"accountId": account.accountId, "token": other.apiToken},
+            headers={
+                "Upgrade": "websocket",
+                "Connection": "Upgrade",
+                "Sec-WebSocket-Key": "dGhlIHNhbXBsZSBub25jZQ==",
+                "Sec-WebSocket-Version": "13",
+            },
+        )
+        assert response.status_code == 403
+        assert server.open_orders(account.accountId) == [order]
+
+
+def test_rejects_cancels_signed_by_another_key():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(algorand_signer)
+        order = account.submitOrder(ORDER_PARAMS)
+
+        # A valid signature, but not from the account or one of its delegates
+        account.signer = evm_signer
+        account.address = evm_signer.address()
+        with pytest.raises(Exception, match="403"):
+            account.cancelOrders([order["id"]])
+        with pytest.raises(Exception, match="403"):
+            account.cancelMarketOrders("ETH-USDC")
+        assert server.open_orders(account.accountId) == [order]
+
+
+def test_malformed_requests_get_a_400():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(algorand_signer)
+        orders_url = (
+            f"{server.base_url}v1/accounts/{account.accountId}/markets/ETH-USDC/orders"
+        )
+
+        response = requests.post(orders_url, data=b"{", headers=account.headers)
+        assert response.status_code == 400
+        response = requests.post(orders_url, json={}, headers=account.headers)
+        assert response.status_code == 400
+        response = requests.delete(
+            orders_url,
+            params={"creator": account.address, "signature": "AA=="},
+            headers=account.headers,
+        )
+        assert response.status_code == 400
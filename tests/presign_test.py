@@ -0,0 +1,95 @@
+import time
+
+from c3.c3exchange import C3Exchange
+from c3.presign import PresignCache
+from c3.signing.signers import AlgorandMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.utils.constants import LocalHostConstants
+
+signer = AlgorandMessageSigner(
+    "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+)
+
+
+def order(price, amount="0.1", side="buy"):
+    return {
+        "marketId": "ETH-USDC",
+        "type": "limit",
+        "side": side,
+        "amount": amount,
+        "price": price,
+    }
+
+
+def test_presigned_orders_are_accepted():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+        cache = PresignCache(account, ttl=60)
+
+        signed = cache.presign_around(
+            "ETH-USDC", "1028.30", "1028.35", 3, ["0.1", "0.2"]
+        )
+        assert signed == 12
+        # Equal prices written differently hit the same ticket
+        response = cache.submit(order("1028.300"))
+        assert response["marketId"] == "ETH-USDC"
+        response = cache.submit(dict(order("1028.36", side="sell"), clientOrderId="q1"))
+        assert response["clientOrderId"] == "q1"
+        assert (cache.hits, cache.misses) == (2, 0)
+
+        # Not in the grid, signed on the spot
+        cache.submit(order("1000.00"))
+        assert cache.misses == 1
+        assert len(server.open_orders(account.accountId)) == 3
+
+
+def test_expired_tickets_recycle_nonces():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+        cache = PresignCache(account, ttl=10, margin=5)
+
+        cache.presign_grid("ETH-USDC", "buy", ["1028.30", "1028.29"], ["0.1"])
+        nonces = {p["settlementTicket"]["nonce"] for p in cache.tickets.values()}
+        assert cache.evict(now=time.time() + 6) == 2
+        assert len(cache) == 0
+
+        # The recycled nonces sign new tickets that the exchange accepts
+        cache.presign_grid("ETH-USDC", "buy", ["1028.28", "1028.27"], ["0.1"])
+        assert {
+            p["settlementTicket"]["nonce"] for p in cache.tickets.values()
+        } == nonces
+        assert cache.recycled == 2
+        cache.submit(order("1028.28"))
+        cache.submit(order("1028.27"))
+        assert cache.hits == 2
+        assert len(server.open_orders(account.accountId)) == 2
+
+        cache.presign_grid("ETH-USDC", "sell", ["1030.00"], ["0.1"])
+        assert cache.discard("ETH-USDC") == 1
+        assert cache.stats()["free_nonces"] == 1
+
+
+def test_failed_levels_and_explicit_expiry():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer, validate=True)
+        cache = PresignCache(account, ttl=60)
+
+        # The level off the tick size is skipped, the others are signed
+        signed = cache.presign_grid(
+            "ETH-USDC", "buy", ["1028.30", "1028.295", "1028.25"], ["0.1"]
+        )
+        assert signed == 2
+        assert [params["price"] for params, _ in cache.errors] == ["1028.295"]
+        assert cache.stats()["failed"] == 1
+        # Its nonce signed the next level
+        assert cache.recycled == 1
+
+        # A given expiresOn is signed as it is, and only matches its own tickets
+        expires_on = int(time.time()) + 600
+        cache.presign([dict(order("1028.20"), expiresOn=expires_on)])
+        assert cache.take(order("1028.20")) is None
+        payload = cache.take(dict(order("1028.20"), expiresOn=expires_on))
+        assert payload["settlementTicket"]["expiresOn"] == expires_on
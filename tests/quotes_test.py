@@ -0,0 +1,164 @@
+from decimal import Decimal
+
+from c3.c3exchange import C3Exchange
+from c3.quotes import QuoteManager
+from c3.signing.signers import AlgorandMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.utils.constants import LocalHostConstants
+
+signer = AlgorandMessageSigner(
+    "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+)
+
+
+def ladder(bid, ask, levels=5, amount="0.1"):
+    quotes = []
+    for i in range(levels):
+        quotes.append(
+            {"side": "buy", "price": f"{bid - i * 0.05:.2f}", "amount": amount}
+        )
+        quotes.append(
+            {"side": "sell", "price": f"{ask + i * 0.05:.2f}", "amount": amount}
+        )
+    return quotes
+
+
+def test_update_sends_only_the_difference():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+        quotes = QuoteManager(account, max_workers=4)
+
+        result = quotes.update("ETH-USDC", ladder(1028.30, 1028.35))
+        assert (result["created"], result["cancelled"], result["errors"]) == (10, 0, [])
+        first_ids = set(quotes.open_orders("ETH-USDC").values())
+        assert {o["id"] for o in server.open_orders(account.accountId)} == first_ids
+
+        # Same ladder, nothing to send
+        result = quotes.update("ETH-USDC", ladder(1028.30, 1028.35))
+        assert (result["requests"], result["kept"]) == (0, 10)
+
+        # Book moved one tick up: the far bid and the near ask go, two new ones come
+        result = quotes.update("ETH-USDC", ladder(1028.35, 1028.40))
+        assert (result["cancelled"], result["created"], result["kept"]) == (2, 2, 8)
+        assert result["requests"] == 3
+        assert result["naive_requests"] == 11
+
+        open_orders = server.open_orders(account.accountId)
+        assert len(open_orders) == 10
+        assert {o["id"] for o in open_orders} == set(
+            quotes.open_orders("ETH-USDC").values()
+        )
+        assert len(first_ids & {o["id"] for o in open_orders}) == 8
+        assert quotes.saved_requests() == (10 + 11 + 11) - (10 + 0 + 3)
+        quotes.close()
+
+
+def test_cancel_batches_and_failed_creates():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+        quotes = QuoteManager(account, cancel_batch=3)
+
+        quotes.update("ETH-USDC", ladder(1028.30, 1028.35, levels=4))
+        result = quotes.update("ETH-USDC", [])
+        assert result["cancelled"] == 8
+        assert result["requests"] == 3
+        assert server.open_orders(account.accountId) == []
+        assert quotes.open_orders("ETH-USDC") == {}
+
+        server.fail_next(1)
+        result = quotes.update("ETH-USDC", ladder(1028.30, 1028.35, levels=1))
+        assert len(result["errors"]) == 1
+        assert len(quotes.open_orders("ETH-USDC")) == 1
+
+        # The failed quote is retried on the next update
+        result = quotes.update("ETH-USDC", ladder(1028.30, 1028.35, levels=1))
+        assert (result["created"], result["kept"], result["errors"]) == (1, 1, [])
+        quotes.close()
+
+
+def test_filled_and_closed_quotes_are_forgotten():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+        quotes = QuoteManager(account)
+        # Workers post on sessions of their own
+        worker_session = quotes.executor.submit(lambda: account.session).result()
+        assert worker_session is not account.session
+
+        quotes.update("ETH-USDC", ladder(1028.30, 1028.35, levels=2))
+        tracked = quotes.open_orders("ETH-USDC")
+        bid, ask, far_bid, far_ask = (
+            tracked[(side, Decimal(price), Decimal("0.1"))]
+            for side, price in [
+                ("buy", "1028.30"),
+                ("sell", "1028.35"),
+                ("buy", "1028.25"),
+                ("sell", "1028.40"),
+            ]
+        )
+
+        # A partial fill keeps the quote, the rest of it completes the order
+        quotes.on_trades([server.fill(bid, size="0.04")])
+        assert bid in quotes.open_orders("ETH-USDC").values()
+        quotes.on_trades([server.fill(bid)])
+        assert bid not in quotes.open_orders("ETH-USDC").values()
+
+        quotes.on_open_orders([{"id": ask, "status": "filled"}])
+        quotes.on_open_orders([{"id": far_bid, "status": "open"}])
+        assert set(quotes.open_orders("ETH-USDC").values()) == {far_bid, far_ask}
+
+        # Only the filled quotes are created again
+        result = quotes.update("ETH-USDC", ladder(1028.30, 1028.35, levels=2))
+        assert (result["created"], result["kept"]) == (2, 2)
+        quotes.close()
+
+
+def test_events_before_the_order_response_are_applied():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+        quotes = QuoteManager(account, max_workers=1)
+        post_order = account.postOrder
+
+        # The websocket beats the response: the bid fills, the ask is cancelled
+        def post_then_report(payload):
+            response = post_order(payload)
+            if response["side"] == "buy":
+                quotes.on_trades([server.fill(response["id"])])
+            else:
+                quotes.on_open_orders([{"id": response["id"], "status": "cancelled"}])
+            return response
+
+        account.postOrder = post_then_report
+        result = quotes.update("ETH-USDC", ladder(1028.30, 1028.35, levels=1))
+        assert (result["created"], result["errors"]) == (2, [])
+        assert quotes.open_orders("ETH-USDC") == {}
+        assert quotes.remaining == {}
+        quotes.close()
+
+
+def test_error_bodies_and_failed_cancels_create_nothing():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+        quotes = QuoteManager(account)
+        post_order = account.postOrder
+
+        account.postOrder = lambda payload: {"error": "Could not parse JSON"}
+        result = quotes.update("ETH-USDC", ladder(1028.30, 1028.35, levels=1))
+        assert len(result["errors"]) == 2
+        assert quotes.open_orders("ETH-USDC") == {}
+
+        account.postOrder = post_order
+        quotes.update("ETH-USDC", ladder(1028.30, 1028.35, levels=1))
+        resting = quotes.open_orders("ETH-USDC")
+
+        # The old quotes may still rest, so the new ones are not sent
+        server.fail_next(1)
+        result = quotes.update("ETH-USDC", ladder(1028.40, 1028.45, levels=1))
+        assert (result["created"], len(result["errors"])) == (0, 1)
+        assert quotes.open_orders("ETH-USDC") == resting
+        assert len(server.open_orders(account.accountId)) == 2
+        quotes.close()
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from c3.recorder import (
+    FLAG_TEXT,
+    ReplayWebSocketClient,
+    SessionRecorder,
+    read_session,
+    session_segments,
+)
+from c3.websocket import WebSocketClientEvent
+
+
+def level1_frame(i: int) -> str:
+    return json.dumps(
+        {
+            "type": "message",
+            "subject": "level1",
+            "topic": "level1:ETH-USDC",
+            "data": {"marketId": "ETH-USDC", "seq": i},
+        }
+    )
+
+
+class TestSessionRecorder(unittest.TestCase):
+    def test_roundtrip_across_segments(self):
+        frames = [level1_frame(i) for i in range(500)]
+        frames[10] = frames[10].encode("utf-8")
+
+        with tempfile.TemporaryDirectory() as directory:
+            with SessionRecorder(directory, segment_size=4096) as recorder:
+                for frame in frames:
+                    recorder.record(frame)
+
+            self.assertGreater(len(recorder.segments), 1)
+            self.assertEqual(session_segments(directory), recorder.segments)
+
+            records = list(read_session(directory))
+            self.assertEqual(len(records), len(frames))
+            timestamps = [ts for ts, _, _ in records]
+            self.assertEqual(timestamps, sorted(timestamps))
+            for frame, (_, flags, payload) in zip(frames, records):
+                if isinstance(frame, str):
+                    self.assertEqual(flags, FLAG_TEXT)
+                    frame = frame.encode("utf-8")
+                else:
+                    self.assertEqual(flags, 0)
+                self.assertEqual(payload, frame)
+
+    def test_frame_larger_than_segment(self):
+        frame = b"x" * 10_000
+        with tempfile.TemporaryDirectory() as directory:
+            with SessionRecorder(directory, segment_size=1024) as recorder:
+                recorder.record(b"small")
+                recorder.record(frame)
+            payloads = [payload for _, _, payload in read_session(directory)]
+        self.assertEqual(payloads, [b"small", frame])
+
+    def test_recorders_started_together_keep_their_segments(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first, second = SessionRecorder(directory), SessionRecorder(directory)
+            with first, second:
+                first.record(b"first")
+                second.record(b"second")
+            self.assertEqual(len(session_segments(directory)), 2)
+            payloads = [payload for _, _, payload in read_session(directory)]
+        self.assertEqual(sorted(payloads), [b"first", b"second"])
+
+    def test_writer_error_stops_recording(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = SessionRecorder(directory)
+            recorder.start()
+            recorder.record(object())
+            recorder._thread.join()
+            with self.assertRaises(RuntimeError):
+                recorder.record(b"frame")
+            recorder.stop()
+
+
+class TestReplay(unittest.IsolatedAsyncioTestCase):
+    async def test_replay_emits_events(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with SessionRecorder(directory) as recorder:
+                for i in range(2500):
+                    recorder.record(level1_frame(i))
+
+            client = ReplayWebSocketClient(directory)
+            received = []
+
+            @client.on(WebSocketClientEvent.Level1)
+            async def on_level1(data):
+                received.append(data["seq"])
+
+            self.assertEqual(await client.replay(), 2500)
+            await asyncio.sleep(0)
+        self.assertEqual(received, list(range(2500)))
+
+    async def test_realtime_keeps_spacing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with SessionRecorder(directory) as recorder:
+                start = time.time_ns()
+                for i in range(5):
+                    recorder.record(level1_frame(i), start + i * 50_000_000)
+
+            client = ReplayWebSocketClient(directory, realtime=True, speed=2.0)
+            started = time.perf_counter()
+            await client.replay()
+            elapsed = time.perf_counter() - started
+
+        # 200ms recorded at twice the speed
+        self.assertGreaterEqual(elapsed, 0.1)
+        self.assertLess(elapsed, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+
+import c3.utils.serialization as serialization
+from c3.c3exchange import C3Exchange
+from c3.signing.signers import AlgorandMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.utils.constants import LocalHostConstants
+from c3.utils.serialization import OrderPayloadEncoder, json_dumps
+
+signer = AlgorandMessageSigner(
+    "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+)
+
+ORDER = {
+    "marketId": "ETH-USDC",
+    "type": "limit",
+    "side": "buy",
+    "amount": "0.1",
+    "price": "1028.33",
+    "clientOrderId": 'é\\"',
+}
+
+
+def test_fragments_match_json(monkeypatch):
+    # The fragment path is the one taken without orjson
+    monkeypatch.setattr(serialization, "orjson", None)
+    with MockC3Exchange() as server:
+        account = C3Exchange(server.base_url, constants=LocalHostConstants).login(
+            signer
+        )
+        payload = account.prepareOrder(ORDER)
+    encoder = OrderPayloadEncoder()
+    for _ in range(2):
+        assert json.loads(encoder.encode(payload)) == payload
+    assert (
+        encoder.encode(payload) == json.dumps(payload, separators=(",", ":")).encode()
+    )
+
+    # Anything else goes through json_dumps
+    odd = {**payload, "sentTime": 1.5}
+    assert json.loads(encoder.encode(odd)) == odd
+    assert json.loads(encoder.encode({"a": [1]})) == {"a": [1]}
+
+
+def test_compressed_requests(capsys):
+    with MockC3Exchange() as server:
+        account = C3Exchange(server.base_url, constants=LocalHostConstants).login(
+            signer
+        )
+        account.gzip_threshold = 0
+        ids = [
+            account.submitOrder({**ORDER, "clientOrderId": str(i)})["id"]
+            for i in range(3)
+        ]
+        # Cancels keep their query parameters, only bodies are compressed
+        assert account.cancelOrders(ids) == ids
+        assert server.open_orders(account.accountId) == []
+    # Cancels are no longer printed
+    assert str(ids[0]) not in capsys.readouterr().out
+
+
+def test_custom_serializer():
+    calls = []
+
+    def serializer(payload):
+        calls.append(payload)
+        return json_dumps(payload)
+
+    with MockC3Exchange() as server:
+        account = C3Exchange(server.base_url, constants=LocalHostConstants).login(
+            signer
+        )
+        account.serializer = serializer
+        response = account.submitOrder(ORDER)
+    assert calls[0]["settlementTicket"]["nonce"] > 0
+    assert response["clientOrderId"] == ORDER["clientOrderId"]
@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import unittest
+
+from c3.marketdata import SIDE_ASK, SIDE_BID
+from c3.shared_feed import (
+    KIND_BOOK_DELTA,
+    KIND_LEVEL1,
+    KIND_TRADE,
+    SharedFeedPublisher,
+    SharedFeedReader,
+)
+
+TIMESTAMP = 1700767680021
+
+
+def feed_name(test: str) -> str:
+    return f"c3test-{test}-{os.getpid()}"
+
+
+def read_in_child(name, count, queue):
+    with SharedFeedReader(name, from_start=True) as reader:
+        updates = []
+        for update in reader.updates():
+            updates.append(tuple(update))
+            if len(updates) == count:
+                break
+        queue.put((updates, reader.lost))
+
+
+class TestSharedFeed(unittest.TestCase):
+    def test_normalized_updates(self):
+        with SharedFeedPublisher(feed_name("normalized"), capacity=16) as publisher:
+            reader = SharedFeedReader(publisher.name)
+            publisher.publish_level1(
+                {
+                    "marketId": "ETH-USDC",
+                    "timestamp": TIMESTAMP,
+                    "bestBid": {"price": "1028.21", "size": "1.5"},
+                    "bestAsk": {"price": "1028.25", "size": "2.5"},
+                }
+            )
+            publisher.publish_book_delta(
+                {
+                    "marketId": "ETH-USDC",
+                    "seq": 7,
+                    "timestamp": TIMESTAMP,
+                    "bids": [["1028.20", "0"]],
+                    "asks": [["1028.26", "3"]],
+                }
+            )
+            publisher.publish_trades(
+                [
+                    {
+                        "id": "T1",
+                        "marketId": "ALGO-USDC",
+                        "price": "0.1741",
+                        "size": "10",
+                        "side": "sell",
+                        "timestamp": TIMESTAMP,
+                    }
+                ]
+            )
+
+            level1, bid, ask, trade = reader.poll()
+            reader.close()
+
+        self.assertEqual(
+            level1,
+            (
+                KIND_LEVEL1,
+                "ETH-USDC",
+                TIMESTAMP,
+                -1,
+                SIDE_BID,
+                1028.21,
+                1.5,
+                1028.25,
+                2.5,
+            ),
+        )
+        self.assertEqual(
+            bid[:7], (KIND_BOOK_DELTA, "ETH-USDC", TIMESTAMP, 7, SIDE_BID, 1028.20, 0.0)
+        )
+        self.assertEqual(ask[4:7], (SIDE_ASK, 1028.26, 3.0))
+        self.assertEqual(
+            trade[:7], (KIND_TRADE, "ALGO-USDC", TIMESTAMP, -1, SIDE_ASK, 0.1741, 10.0)
+        )
+
+    def test_slow_reader_counts_lost_updates(self):
+        with SharedFeedPublisher(feed_name("lost"), capacity=8) as publisher:
+            with SharedFeedReader(publisher.name) as reader:
+                for i in range(20):
+                    publisher.publish(
+                        KIND_TRADE, b"ETH-USDC", TIMESTAMP + i, -1, SIDE_BID, 1.0, 1.0
+                    )
+
+                updates = reader.poll()
+                self.assertEqual(reader.lost, 12)
+                self.assertEqual(
+                    [u.timestamp - TIMESTAMP for u in updates], list(range(12, 20))
+                )
+                self.assertEqual(reader.poll(), [])
+
+    def test_reader_in_another_process(self):
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        with SharedFeedPublisher(feed_name("process"), capacity=1024) as publisher:
+            child = context.Process(
+                target=read_in_child, args=(publisher.name, 500, queue)
+            )
+            child.start()
+            for i in range(500):
+                publisher.publish(
+                    KIND_BOOK_DELTA,
+                    b"ETH-USDC",
+                    TIMESTAMP,
+                    i,
+                    SIDE_BID,
+                    1028.0 + i,
+                    1.0,
+                )
+            updates, lost = queue.get(timeout=30)
+            child.join(timeout=30)
+
+        self.assertEqual(lost, 0)
+        self.assertEqual([u[3] for u in updates], list(range(500)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import time
+
+import pytest
+
+from c3.c3exchange import C3Exchange
+from c3.signing.signers import AlgorandMessageSigner, EVMMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.token_store import TokenStore, jwt_expiry
+from c3.utils.constants import LocalHostConstants
+
+signer = AlgorandMessageSigner(
+    "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+)
+evm_signer = EVMMessageSigner(
+    "0x4c0883a69102937d6231471b5dbb6204fe5129617082792ae468d01a3f362318"
+)
+
+
+def logins(server):
+    return server.stats["POST v1/login/complete 200"]
+
+
+def test_stored_token_skips_login(tmp_path):
+    with MockC3Exchange() as server:
+        store = TokenStore(str(tmp_path), signer)
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer, token_store=store)
+        assert logins(server) == 1
+        assert jwt_expiry(account.apiToken) > time.time()
+
+        # A restarted worker reuses the session
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        restarted = c3_client.login(
+            signer, token_store=TokenStore(str(tmp_path), signer)
+        )
+        assert logins(server) == 1
+        assert restarted.apiToken == account.apiToken
+        assert restarted.accountId == account.accountId
+        assert restarted.getBalance() is not None
+
+        # Tokens about to expire are not reused
+        c3_client.login(signer, token_store=store, refresh_margin=7200)
+        assert logins(server) == 2
+
+
+def test_token_file_is_encrypted_per_signer(tmp_path):
+    with MockC3Exchange() as server:
+        store = TokenStore(str(tmp_path), evm_signer)
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(evm_signer, token_store=store)
+
+        chainId = LocalHostConstants.ETH_CHAIN_ID
+        path = store.path(server.base_url, chainId)
+        with open(path, "rb") as f:
+            assert account.apiToken.encode() not in f.read()
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+        # Another key cannot read it, a tampered file is ignored
+        other = TokenStore(str(tmp_path), signer)
+        os.replace(path, other.path(server.base_url, chainId))
+        assert other.load(server.base_url, chainId) is None
+        os.replace(other.path(server.base_url, chainId), path)
+        assert store.load(server.base_url, chainId)["token"] == account.apiToken
+        with open(path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 1]))
+        assert store.load(server.base_url, chainId) is None
+
+
+def test_refresher_logs_in_before_expiry(tmp_path):
+    with MockC3Exchange(token_ttl=3) as server:
+        store = TokenStore(str(tmp_path), signer)
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer, token_store=store, refresh_margin=0)
+        first_token = account.apiToken
+
+        refresher = c3_client.keepLoggedIn(account, store, margin=2)
+        deadline = time.time() + 5
+        while refresher.refreshes == 0 and time.time() < deadline:
+            time.sleep(0.05)
+        refresher.stop()
+
+        assert refresher.refreshes >= 1
+        assert account.apiToken != first_token
+        stored = store.load(server.base_url, LocalHostConstants.ALGORAND_CHAIN_ID)
+        assert stored["token"] == account.apiToken
+        time.sleep(1.5)
+        assert account.getBalance() is not None
+
+
+def test_tokens_of_another_signer_are_discarded(tmp_path):
+    store = TokenStore(str(tmp_path), signer)
+    chainId = LocalHostConstants.ALGORAND_CHAIN_ID
+    record = {"accountId": "account", "token": "token", "expiresAt": None}
+
+    store._write("http://c3", chainId, {**record, "address": evm_signer.address()})
+    assert store.load("http://c3", chainId) is None
+    assert not os.path.exists(store.path("http://c3", chainId))
+
+    # Written before the owner was stored
+    store._write("http://c3", chainId, record)
+    assert store.load("http://c3", chainId) is None
+
+    store.save("http://c3", chainId, "account", "token")
+    assert store.load("http://c3", chainId)["accountId"] == "account"
+
+
+def test_login_rejects_the_store_of_another_signer(tmp_path):
+    with MockC3Exchange() as server:
+        store = TokenStore(str(tmp_path), signer)
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer, token_store=store)
+
+        with pytest.raises(ValueError, match="Token store"):
+            c3_client.login(evm_signer, token_store=store)
+        with pytest.raises(ValueError, match="Token store"):
+            c3_client.refreshLogin(
+                c3_client.login(evm_signer), TokenStore(str(tmp_path), signer)
+            )
+        assert logins(server) == 2
+        chainId = LocalHostConstants.ALGORAND_CHAIN_ID
+        assert store.load(server.base_url, chainId)["token"] == account.apiToken
@@ -0,0 +1,110 @@
+import asyncio
+import unittest
+
+from c3.c3exchange import C3Exchange
+from c3.signing.signers import AlgorandMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.tracing import EVENT, RESPONSE, STAGES, SUBMIT, OrderLifecycleTracer
+from c3.utils.constants import LocalHostConstants
+from c3.websocket import WebSocketClient
+
+ORDER_PARAMS = {
+    "marketId": "ETH-USDC",
+    "type": "limit",
+    "side": "buy",
+    "amount": "0.1",
+    "price": "1028.33",
+}
+
+
+class TestOrderLifecycleTracer(unittest.TestCase):
+    def test_event_after_response(self):
+        tracer = OrderLifecycleTracer()
+        trace = tracer.begin("ETH-USDC")
+        tracer.on_response(trace, {"id": "O1"})
+        tracer.on_event([{"id": "O1", "marketId": "ETH-USDC"}])
+        self.assertEqual(list(tracer.completed), [trace])
+        self.assertLess(trace.stamps[RESPONSE], trace.stamps[EVENT])
+
+    def test_event_before_response(self):
+        tracer = OrderLifecycleTracer()
+
+        by_client_id = tracer.begin("ETH-USDC", "c1")
+        tracer.on_event([{"id": "O1", "clientOrderId": "c1"}])
+        self.assertEqual(len(tracer.completed), 0)
+        tracer.on_response(by_client_id, {"id": "O1"})
+
+        by_order_id = tracer.begin("ETH-USDC")
+        tracer.on_event([{"id": "O2"}])
+        tracer.on_response(by_order_id, {"id": "O2"})
+
+        self.assertEqual(list(tracer.completed), [by_client_id, by_order_id])
+        for trace in tracer.completed:
+            self.assertIn(EVENT, trace.stamps)
+
+    def test_trades_match_on_order_id(self):
+        tracer = OrderLifecycleTracer()
+        trace = tracer.begin("ETH-USDC")
+        tracer.on_response(trace, {"id": "O1"})
+        tracer.on_event([{"id": "T1", "orderId": "O1"}])
+        self.assertIn(EVENT, trace.stamps)
+
+
+class TestSubmitOrderTracing(unittest.IsolatedAsyncioTestCase):
+    async def test_submit_order_to_open_orders_event(self):
+        signer = AlgorandMessageSigner(
+            "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+        )
+        tracer = OrderLifecycleTracer()
+        with MockC3Exchange() as server:
+            c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+            account = await asyncio.to_thread(c3_client.login, signer)
+            account.tracer = tracer
+
+            client = WebSocketClient(
+                server.base_url, account.accountId, account.apiToken
+            )
+            tracer.attach(client)
+            client.start()
+            try:
+                while not client.connected:
+                    await asyncio.sleep(0.01)
+
+                for i in range(5):
+                    params = dict(ORDER_PARAMS, clientOrderId=f"c{i}" if i % 2 else "")
+                    await asyncio.to_thread(account.submitOrder, params)
+                while len(tracer.completed) < 5:
+                    await asyncio.sleep(0.01)
+            finally:
+                client.stop()
+
+        for trace in tracer.completed:
+            self.assertEqual(set(trace.stamps), {SUBMIT, *STAGES})
+        report = tracer.export()
+        self.assertEqual(list(report), ["ETH-USDC"])
+        self.assertEqual(set(report["ETH-USDC"]), set(STAGES))
+        self.assertEqual(report["ETH-USDC"][EVENT]["count"], 5)
+
+    def test_failed_orders_leave_no_trace_behind(self):
+        signer = AlgorandMessageSigner(
+            "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+        )
+        tracer = OrderLifecycleTracer()
+        with MockC3Exchange() as server:
+            c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+            account = c3_client.login(signer)
+            account.tracer = tracer
+
+            # Rejected by the exchange, then failing to sign
+            server.fail_next(1)
+            with self.assertRaises(Exception):
+                account.submitOrder(dict(ORDER_PARAMS, clientOrderId="c1"))
+            account.signer = None
+            with self.assertRaises(AttributeError):
+                account.submitOrder(dict(ORDER_PARAMS, clientOrderId="c2"))
+
+        self.assertEqual(tracer._by_client_id, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
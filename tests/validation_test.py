@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+from c3.account import Account
+from c3.signing.signers import AlgorandMessageSigner
+from c3.testing.mock_exchange import DEFAULT_INSTRUMENTS, DEFAULT_MARKETS
+from c3.utils.constants import LocalHostConstants
+from c3.validation import (
+    EXPIRED,
+    LOT_SIZE,
+    MAX_QUANTITY,
+    MIN_NOTIONAL,
+    MIN_QUANTITY,
+    MISSING_FIELD,
+    NOT_POSITIVE,
+    TICK_SIZE,
+    UNKNOWN_MARKET,
+    OrderValidationError,
+    OrderValidator,
+)
+
+INSTRUMENTS_INFO = {i["id"]: i for i in DEFAULT_INSTRUMENTS}
+MARKETS_INFO = {m["id"]: m for m in DEFAULT_MARKETS}
+
+VALID_ORDER = {
+    "marketId": "ETH-USDC",
+    "type": "limit",
+    "side": "buy",
+    "amount": "0.1",
+    "price": "1028.33",
+}
+
+validator = OrderValidator(INSTRUMENTS_INFO, MARKETS_INFO)
+
+
+def codes(order):
+    return [(e.field, e.code) for e in validator.errors(order)]
+
+
+def test_valid_orders():
+    assert codes(VALID_ORDER) == []
+    market_order = {"marketId": "ALGO-USDC", "type": "market", "side": "sell"}
+    assert codes({**market_order, "amount": "5"}) == []
+
+
+@pytest.mark.parametrize(
+    "changes, expected",
+    [
+        ({"marketId": "BTC-USDC"}, [("marketId", UNKNOWN_MARKET)]),
+        ({"price": "1028.333"}, [("price", TICK_SIZE)]),
+        ({"amount": "0.10005"}, [("amount", LOT_SIZE)]),
+        ({"amount": "0.0005"}, [("amount", MIN_QUANTITY)]),
+        ({"amount": "1001"}, [("amount", MAX_QUANTITY)]),
+        ({"amount": "-1"}, [("amount", NOT_POSITIVE)]),
+        ({"price": None}, [("price", MISSING_FIELD)]),
+        ({"expiresOn": 1}, [("expiresOn", EXPIRED)]),
+    ],
+)
+def test_rules(changes, expected):
+    assert codes({**VALID_ORDER, **changes}) == expected
+
+
+def test_min_notional_override():
+    strict = OrderValidator(
+        INSTRUMENTS_INFO, MARKETS_INFO, {"ETH-USDC": {"minNotional": "500"}}
+    )
+    [error] = strict.errors(VALID_ORDER)
+    assert (error.code, error.value, str(error.limit)) == (
+        MIN_NOTIONAL,
+        "102.833",
+        "500",
+    )
+
+
+def test_batch_reports_order_index():
+    ladder = [dict(VALID_ORDER, price=f"{1028.33 - i * 0.005:.3f}") for i in range(4)]
+    errors = validator.validate_batch(ladder)
+    assert [(e.index, e.code) for e in errors] == [(1, TICK_SIZE), (3, TICK_SIZE)]
+    assert errors[0].to_dict()["index"] == 1
+    assert "order 1" in str(errors[0])
+
+
+def test_submit_order_rejects_before_sending():
+    account = Account(
+        signer=AlgorandMessageSigner(
+            "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+        ),
+        instrumentsInfo=INSTRUMENTS_INFO,
+        marketsInfo=MARKETS_INFO,
+        accountId="C3_TEST",
+        apiToken="token",
+        # Nothing listens here, a request would fail with a connection error
+        base_url="http://127.0.0.1:9/",
+        constants=LocalHostConstants,
+        validate=True,
+    )
+    nonce = account.lastNonceStored
+
+    with pytest.raises(OrderValidationError) as raised:
+        account.submitOrder({**VALID_ORDER, "price": "1028.333"})
+    assert raised.value.code == TICK_SIZE
+    assert isinstance(raised.value, ValueError)
+    assert account.lastNonceStored == nonce
+
+
+def test_validation_is_opt_in():
+    account = Account(
+        signer=AlgorandMessageSigner(
+            "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+        ),
+        instrumentsInfo=INSTRUMENTS_INFO,
+        marketsInfo=MARKETS_INFO,
+        accountId="C3_TEST",
+        constants=LocalHostConstants,
+    )
+    # Orders go to the exchange as given
+    assert account.validator is None
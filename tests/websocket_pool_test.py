@@ -0,0 +1,130 @@
+import asyncio
+import unittest
+
+from c3.c3exchange import C3Exchange
+from c3.signing.signers import AlgorandMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.utils.constants import LocalHostConstants
+from c3.websocket import TopicType, WebSocketClientEvent
+from c3.websocket_pool import WebSocketPool
+
+MARKETS = ["ETH-USDC", "ALGO-USDC", "BTC-USDC", "AVAX-USDC"]
+
+
+def level1(market, timestamp):
+    return {
+        "marketId": market,
+        "timestamp": timestamp,
+        "bestBid": {"price": "1", "size": "1"},
+        "bestAsk": {"price": "2", "size": "1"},
+    }
+
+
+async def wait_for(predicate, timeout=10):
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+class TestWebSocketPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        signer = AlgorandMessageSigner(
+            "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+        )
+        self.server = MockC3Exchange()
+        self.server.start()
+        c3_client = C3Exchange(self.server.base_url, constants=LocalHostConstants)
+        self.account = await asyncio.to_thread(c3_client.login, signer)
+
+    async def asyncTearDown(self):
+        self.server.stop()
+
+    def subscribed(self):
+        return {topic for ws in self.server.websockets for topic in ws.topics}
+
+    async def run_pool(self, processes: bool):
+        pool = WebSocketPool(
+            self.server.base_url,
+            self.account.accountId,
+            self.account.apiToken,
+            shards=2,
+            processes=processes,
+        )
+        received = []
+        fills = []
+        connected = []
+
+        @pool.on(WebSocketClientEvent.Level1)
+        async def on_level1(data):
+            received.append(data["marketId"])
+
+        @pool.on(WebSocketClientEvent.Trades)
+        async def on_trades(data):
+            fills.extend(data)
+
+        @pool.on(WebSocketClientEvent.Connect)
+        async def on_connect(shard):
+            connected.append(shard)
+
+        pool.start()
+        try:
+            for market in MARKETS:
+                await pool.subscribe_to_market(market, TopicType.level1)
+            await wait_for(lambda: len(self.subscribed()) == len(MARKETS))
+            self.assertEqual(sorted(pool.shard_of(m) for m in MARKETS), [0, 0, 1, 1])
+            await wait_for(lambda: len(connected) == 2)
+            self.assertEqual(sorted(connected), [0, 1])
+
+            # The account's fills reach both connections but are dispatched once
+            for market in MARKETS:
+                fill = {"id": market, "marketId": market, "timestamp": 0}
+                self.server.send_to_account(self.account.accountId, "trades", [fill])
+            await wait_for(lambda: len(fills) == len(MARKETS))
+            await asyncio.sleep(0.1)
+            self.assertEqual(sorted(f["id"] for f in fills), sorted(MARKETS))
+
+            # ETH-USDC and BTC-USDC share shard 0 and are the busy ones
+            noisy = [m for m in MARKETS if pool.shard_of(m) == 0]
+            pool._measure_rates()
+            for i in range(50):
+                for market in noisy:
+                    self.server.publish(f"level1:{market}", "level1", level1(market, i))
+            for market in MARKETS:
+                self.server.publish(f"level1:{market}", "level1", level1(market, 0))
+            await wait_for(lambda: len(received) == 50 * len(noisy) + len(MARKETS))
+
+            moves = await pool.rebalance()
+            self.assertEqual(len(moves), 2)
+
+            # Moved markets are dispatched once, during and after the move
+            received.clear()
+            for market in MARKETS:
+                self.server.publish(f"level1:{market}", "level1", level1(market, 0))
+            await wait_for(lambda: len(received) == len(MARKETS))
+            await asyncio.sleep(0.1)
+            self.assertEqual(sorted(received), sorted(MARKETS))
+            self.assertNotEqual(pool.shard_of(noisy[0]), pool.shard_of(noisy[1]))
+
+            metrics = pool.metrics()
+            self.assertEqual(sum(len(m["markets"]) for m in metrics), len(MARKETS))
+            self.assertGreater(metrics[0]["feed_lag_ms"]["count"], 0)
+
+            # Moved markets are subscribed on exactly one connection
+            def subscribed_topics():
+                return sum(len(ws.topics) for ws in self.server.websockets)
+
+            await wait_for(lambda: subscribed_topics() == len(MARKETS))
+        finally:
+            pool.stop()
+
+    async def test_in_process_shards(self):
+        await self.run_pool(processes=False)
+
+    async def test_process_shards(self):
+        await self.run_pool(processes=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
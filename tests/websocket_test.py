@@ -5,7 +5,14 @@ import unittest
 
 from c3.c3exchange import C3Exchange
 from c3.signing.signers import AlgorandMessageSigner
-from c3.websocket import WebSocketClient, WebSocketClientEvent
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.utils.constants import LocalHostConstants
+from c3.websocket import (
+    PendingRequests,
+    TopicType,
+    WebSocketClient,
+    WebSocketClientEvent,
+)
 
 
 class TestWebSockets(unittest.IsolatedAsyncioTestCase):
@@ -68,5 +75,134 @@ class TestWebSockets(unittest.IsolatedAsyncioTestCase):
             --retry
 
 
+class TestHandleMessage(unittest.IsolatedAsyncioTestCase):
+    async def test_accepts_text_and_binary_frames(self):
+        client = WebSocketClient("http://localhost:3000/", "C3_ACCOUNT", "token")
+        received = []
+
+        @client.on(WebSocketClientEvent.Level1)
+        async def handle_level1(data):
+            received.append(data)
+
+        frame = (
+            '{"type": "message", "subject": "level1", "data": {"marketId": "ETH-USDC"}}'
+        )
+        for message in (
+            frame,
+            frame.encode("utf-8"),
+            bytearray(frame.encode("utf-8")),
+            memoryview(frame.encode("utf-8")),
+        ):
+            client.handle_message(message)
+        client.handle_message(b"not json")
+        await asyncio.sleep(0)
+
+        self.assertEqual(received, [{"marketId": "ETH-USDC"}] * 4)
+
+
+class TestRequests(unittest.IsolatedAsyncioTestCase):
+    async def test_timed_out_requests_are_removed(self):
+        requests = PendingRequests(default_timeout=0.01)
+        request_id = requests.new_id("subscribe")
+        fut = requests.register(request_id)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await requests.wait(request_id, fut)
+        self.assertEqual(len(requests), 0)
+        self.assertFalse(requests.resolve(request_id, "late response"))
+
+    async def test_reply_before_wait(self):
+        requests = PendingRequests()
+        request_id = requests.new_id("subscribe")
+        fut = requests.register(request_id)
+
+        self.assertTrue(requests.resolve(request_id, "fast response"))
+        self.assertEqual(await requests.wait(request_id, fut), "fast response")
+        self.assertEqual(len(requests), 0)
+
+    async def test_subscribe_many_topics(self):
+        signer = AlgorandMessageSigner(
+            "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+        )
+        with MockC3Exchange() as server:
+            c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+            account = await asyncio.to_thread(c3_client.login, signer)
+            client = WebSocketClient(
+                server.base_url, account.accountId, account.apiToken
+            )
+            client.start()
+            try:
+                while client.socket is None:
+                    await asyncio.sleep(0.01)
+
+                topics = [f"level1:MARKET-{i}" for i in range(50)]
+                responses = await client.subscribe(topics, timeout=5)
+                self.assertEqual([r["topic"] for r in responses], topics)
+
+                await client.subscribe_to_market("ETH-USDC", TopicType.bookDelta)
+                subscriptions = await client.list_subscriptions()
+                self.assertEqual(len(subscriptions), 51)
+
+                await client.unsubscribe(topics)
+                self.assertEqual(
+                    await client.list_subscriptions(), ["bookDelta:ETH-USDC"]
+                )
+                self.assertEqual(len(client.requests), 0)
+            finally:
+                client.stop()
+
+
+class TestHealth(unittest.IsolatedAsyncioTestCase):
+    async def test_stale_topic_forces_reconnect(self):
+        signer = AlgorandMessageSigner(
+            "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+        )
+        with MockC3Exchange() as server:
+            c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+            account = await asyncio.to_thread(c3_client.login, signer)
+            client = WebSocketClient(
+                server.base_url,
+                account.accountId,
+                account.apiToken,
+                ping_interval=0.05,
+                stale_after=0.3,
+                reconnect_delay=0.05,
+            )
+            connects = []
+
+            @client.on(WebSocketClientEvent.Connect)
+            async def on_connect():
+                connects.append(time.monotonic())
+
+            client.start()
+            try:
+                while not client.connected:
+                    await asyncio.sleep(0.01)
+                await client.subscribe_to_market("ETH-USDC", TopicType.level1)
+
+                # A live topic keeps the connection up
+                for _ in range(10):
+                    server.publish(
+                        "level1:ETH-USDC", "level1", {"marketId": "ETH-USDC"}
+                    )
+                    await asyncio.sleep(0.05)
+                self.assertEqual(client.health.stale_reconnects, 0)
+                self.assertGreater(client.metrics()["rtt"]["count"], 0)
+
+                # A quiet one gets the socket replaced and the topic subscribed again
+                while len(connects) < 2:
+                    await asyncio.sleep(0.01)
+                while not any(ws.topics for ws in server.websockets):
+                    await asyncio.sleep(0.01)
+
+                metrics = client.metrics()
+                self.assertEqual(metrics["stale_reconnects"], 1)
+                self.assertEqual(metrics["connects"], 2)
+                self.assertEqual(metrics["topics"]["level1:ETH-USDC"]["messages"], 10)
+                self.assertEqual(client.subscriptions, {"level1:ETH-USDC"})
+            finally:
+                client.stop()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from c3.c3exchange import C3Exchange
+from c3.signing.signers import AlgorandMessageSigner
+from c3.testing.mock_exchange import MockC3Exchange
+from c3.utils.constants import LocalHostConstants
+from c3.websocket import TopicType, WebSocketClientEvent
+from c3.websocket_threaded import SpscQueue, ThreadedWebSocketClient
+
+signer = AlgorandMessageSigner(
+    "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8DoQe/884Qvh1w3RjnS8CZZ+TWMJulDV8d3IZkElUxuA=="
+)
+
+
+def level1(i):
+    return {
+        "marketId": "ETH-USDC",
+        "timestamp": i,
+        "bestBid": {"price": "1", "size": "1"},
+        "bestAsk": {"price": "2", "size": "1"},
+    }
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def subscribed(server):
+    return {topic for ws in server.websockets for topic in ws.topics}
+
+
+def test_spsc_queue_drops_oldest_and_wakes_consumer():
+    queue = SpscQueue(3)
+    for i in range(5):
+        queue.put(i)
+    assert (len(queue), queue.dropped) == (3, 2)
+    assert [queue.get() for _ in range(3)] == [2, 3, 4]
+    with pytest.raises(TimeoutError):
+        queue.get(timeout=0.01)
+
+    queue = SpscQueue(1024)
+    received = []
+
+    def consume():
+        try:
+            while True:
+                received.append(queue.get())
+        except EOFError:
+            pass
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+    for i in range(1000):
+        queue.put(i)
+        if i % 100 == 0:
+            time.sleep(0.001)
+    wait_for(lambda: len(received) == 1000)
+    queue.close()
+    consumer.join(timeout=5)
+    assert received == list(range(1000))
+
+
+def test_threaded_client_from_synchronous_code():
+    with MockC3Exchange() as server:
+        c3_client = C3Exchange(server.base_url, constants=LocalHostConstants)
+        account = c3_client.login(signer)
+
+        client = ThreadedWebSocketClient(
+            server.base_url, account.accountId, account.apiToken
+        )
+        callbacks = []
+        client.on(WebSocketClientEvent.OpenOrders, callbacks.append)
+
+        with client:
+            stream = client.events(WebSocketClientEvent.Level1)
+            client.subscribe_to_market("ETH-USDC", TopicType.level1, timeout=10)
+            assert client.wait_connected(timeout=10)
+            wait_for(lambda: "level1:ETH-USDC" in subscribed(server))
+
+            for i in range(100):
+                server.publish("level1:ETH-USDC", "level1", level1(i))
+            events = [stream.get(timeout=10) for _ in range(100)]
+            assert [e.data["timestamp"] for e in events] == list(range(100))
+            assert {e.name for e in events} == {"level1"}
+
+            account.submitOrder(
+                {
+                    "marketId": "ETH-USDC",
+                    "type": "limit",
+                    "side": "buy",
+                    "amount": "0.1",
+                    "price": "1000.00",
+                }
+            )
+            wait_for(lambda: len(callbacks) == 1)
+            assert callbacks[0][0]["marketId"] == "ETH-USDC"
+
+            metrics = client.metrics()
+            assert metrics["streams"][1]["handoff_us"]["count"] == 100
+            assert metrics["streams"][1]["dropped"] == 0
+
+        # Stopping the client ends the iteration
+        assert list(stream) == []
+        with pytest.raises(RuntimeError):
+            client.subscribe(["level1:BTC-USDC"])